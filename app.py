@@ -7,24 +7,45 @@ GET  /v1/jobs/{job_id}  → status, result (pdf_url oder download)
 GET  /v1/jobs/{job_id}/result  → PDF-Download (wenn done)
 
 Auth: X-API-Key Header (API_KEY in .env)
+Jobs: job_store.py (SQLite im WAL-Modus, JOB_STORE / JOB_DB_PATH in .env) –
+      überleben Neustarts und funktionieren mit uvicorn --workers N.
+      job_executor.py begrenzt parallele Pipelines (JOB_CONCURRENCY), Rest wartet FIFO.
+Cache: result_cache.py – gleiche Dateien (SHA-256) + Modelle + Prompts → fertige PDF sofort.
+       page_cache.py – bereits extrahierte Seiten ohne erneuten Gemini-Call (Treffer pro Job im Status).
 """
 
 import os
 import tempfile
 import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import BackgroundTasks, Depends, HTTPException, Header
+from fastapi import Depends, HTTPException, Header
 from fastapi.responses import FileResponse
 
 load_dotenv()
 
 from fastapi import FastAPI
 
-app = FastAPI(title="Wissensbasis-Pipeline", version="1.0")
+from job_executor import JobExecutor
+from job_store import get_job_store
+from page_cache import get_page_cache
+from result_cache import ResultCache
 
-jobs: dict[str, dict] = {}  # job_id -> {status, error?, result_path?}
+jobs = get_job_store()  # job_id -> {status, error?, result_path?, progress?}
+executor = JobExecutor()
+result_cache = ResultCache() if os.environ.get("RESULT_CACHE", "1") != "0" else None
+page_cache = get_page_cache()
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI):
+    yield
+    executor.shutdown(wait=False)
+
+
+app = FastAPI(title="Wissensbasis-Pipeline", version="1.0", lifespan=_lifespan)
 
 
 def _verify_api_key(x_api_key: str = Header(..., alias="X-API-Key")):
@@ -38,40 +59,55 @@ def _verify_api_key(x_api_key: str = Header(..., alias="X-API-Key")):
 
 def _run_pipeline(job_id: str, file_urls: list[str]):
     try:
-        jobs[job_id]["status"] = "processing"
+        jobs.update(job_id, status="processing")
         out_dir = Path(tempfile.mkdtemp(prefix=f"job_{job_id}_"))
         from pipeline_universal import run_universal_pipeline
-        pdf_path = run_universal_pipeline(file_urls, out_dir)
-        jobs[job_id]["status"] = "done"
-        jobs[job_id]["result_path"] = str(pdf_path)
+        pdf_path = run_universal_pipeline(
+            file_urls,
+            out_dir,
+            on_stage=lambda stage, **info: jobs.set_stage(job_id, stage, **info),
+            cpu_executor=executor.cpu_pool,
+            result_cache=result_cache,
+            page_cache=page_cache,
+        )
+        jobs.update(job_id, status="done", result_path=str(pdf_path))
     except Exception as e:
-        jobs[job_id]["status"] = "failed"
-        jobs[job_id]["error"] = str(e)
+        jobs.update(job_id, status="failed", error=str(e))
 
 
 @app.post("/v1/jobs")
 async def create_job(
     body: dict,
-    background_tasks: BackgroundTasks,
     _: str = Depends(_verify_api_key),
 ):
-    """Startet Pipeline. Body: { "file_urls": ["url1", "url2", ...] }"""
+    """
+    Startet Pipeline. Body: { "file_urls": ["url1", "url2", ...] }
+    Der Ergebnis-Cache wird erst nach dem Download geprüft – mit selbst berechneten Hashes,
+    nie mit Hashes vom Client (sonst käme jeder, der sie kennt, an fremde Ergebnisse).
+    """
     urls = body.get("file_urls") or []
     if not urls or not isinstance(urls, list):
         raise HTTPException(400, "file_urls (Liste von URLs) erforderlich")
     job_id = str(uuid.uuid4())[:12]
-    jobs[job_id] = {"status": "pending", "file_urls": urls}
-    background_tasks.add_task(_run_pipeline, job_id, urls)
-    return {"job_id": job_id, "status": "pending"}
+    jobs.create(job_id, status="pending", file_urls=urls)
+    executor.submit(_run_pipeline, job_id, urls)
+    return {"job_id": job_id, "status": "pending", "queue_position": jobs.queue_position(job_id)}
 
 
 @app.get("/v1/jobs/{job_id}")
 async def get_job(job_id: str, _: str = Depends(_verify_api_key)):
     """Status und ggf. Ergebnis-Info."""
-    if job_id not in jobs:
+    j = jobs.get(job_id)
+    if j is None:
         raise HTTPException(404, "Job nicht gefunden")
-    j = jobs[job_id]
     out = {"job_id": job_id, "status": j["status"]}
+    if j["status"] == "pending":
+        out["queue_position"] = jobs.queue_position(job_id)
+    if j.get("progress"):
+        out["stage"] = j["progress"].get("stage")
+        for key in ("page_cache", "dedupe"):
+            if j["progress"].get(key):
+                out[key] = j["progress"][key]
     if j.get("error"):
         out["error"] = j["error"]
     if j.get("result_path"):
@@ -82,9 +118,9 @@ async def get_job(job_id: str, _: str = Depends(_verify_api_key)):
 @app.get("/v1/jobs/{job_id}/result")
 async def get_job_result(job_id: str, _: str = Depends(_verify_api_key)):
     """PDF-Download (nur wenn status=done)."""
-    if job_id not in jobs:
+    j = jobs.get(job_id)
+    if j is None:
         raise HTTPException(404, "Job nicht gefunden")
-    j = jobs[job_id]
     if j["status"] != "done":
         raise HTTPException(409, f"Job noch nicht fertig: {j['status']}")
     path = j.get("result_path")
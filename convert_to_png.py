@@ -17,6 +17,11 @@ Optional: Mit installiertem LibreOffice (headless) können ODT, RTF, DOC, XLS
   zu PDF und dann zu PNG konvertiert werden – siehe _convert_via_libreoffice.
 
 Ausgabe: Liste von PNG-Bytes (jeweils ein Bild), plus optional Dateiname für Kontext.
+Streaming: iter_pngs / iter_segments erzeugen die PNGs lazy (Speicher ~ Batchgröße statt Jobgröße).
+Seitenbilder gehen kompakt raus (image_optimize: Zuschnitt, Graustufen/Palette, IMAGE_OPTIMIZE).
+Text-Passthrough: files_to_segments liefert für text-native Formate direkt den Text
+(kein Rendern + Bild-OCR), PNGs nur für visuelle Quellen (Bilder, gescannte PDF-Seiten).
+PDF_NATIVE: gescannte PDF-Seiten als PDF-Teildokumente statt PNG (Gemini liest PDFs direkt).
 """
 
 from __future__ import annotations
@@ -24,8 +29,14 @@ from __future__ import annotations
 import csv
 import email
 import io
+import os
 import re
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
+from typing import Iterator, NamedTuple
 from email import policy
 from email.parser import BytesParser
 
@@ -35,9 +46,9 @@ try:
 except ImportError:
     fitz = None
 try:
-    from PIL import Image
+    from PIL import Image, ImageDraw, ImageFont
 except ImportError:
-    Image = None
+    Image = ImageDraw = ImageFont = None
 try:
     from docx import Document as DocxDocument
 except ImportError:
@@ -51,92 +62,354 @@ try:
 except ImportError:
     BeautifulSoup = None
 
+from image_optimize import IMAGE_OPTIMIZE, optimize_image
+
 # DPI für PDF-Rendering (Lesbarkeit vs. Größe)
 PDF_DPI = 150
-# Max. Seitenlänge für Text→PNG (Zeilen), danach aufteilen
-TEXT_PNG_MAX_LINES = 80
-# Zeichen pro Zeile (annähernd) für Text-PNG
-CHARS_PER_LINE = 90
+# Parallele PDF-Rasterung: Prozesse (ohne übergebenen Pool) und Mindest-Seitenzahl dafür
+PDF_RASTER_WORKERS = int(os.environ.get("PDF_RASTER_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = 16
+# Seiten pro Render-Auftrag (Streaming: Blöcke werden nacheinander nachgeschoben)
+PDF_STREAM_CHUNK = 8
+# Textebene statt Rasterung (files_to_segments): Mindestzeichen pro Seite, max. Bildanteil
+PDF_TEXT_LAYER = os.environ.get("PDF_TEXT_LAYER", "1") != "0"
+PDF_TEXT_MIN_CHARS = 80
+PDF_IMAGE_COVERAGE_MAX = 0.5
+# PDFs direkt an Gemini (application/pdf) statt rastern: Seiten und Bytes pro Teildokument
+PDF_NATIVE = os.environ.get("PDF_NATIVE", "0") == "1"
+PDF_NATIVE_PAGES = int(os.environ.get("PDF_NATIVE_PAGES", "16"))
+PDF_NATIVE_MAX_BYTES = int(os.environ.get("PDF_NATIVE_MAX_BYTES", str(15 * 1024**2)))
+# Text→PNG: Seitengröße in px (Standard 2×3 Gemini-Kacheln à 768 px), Schriftgröße,
+# Zeilenabstand und Rand. Die Seite wird bis zum Rand mit Zeilen gefüllt.
+TEXT_PAGE_WIDTH = int(os.environ.get("TEXT_PAGE_WIDTH", "1536"))
+TEXT_PAGE_HEIGHT = int(os.environ.get("TEXT_PAGE_HEIGHT", "2304"))
+TEXT_FONT_SIZE = int(os.environ.get("TEXT_FONT_SIZE", "14"))
+TEXT_LINE_SPACING = 1.25
+TEXT_MARGIN = 16
+TEXT_FONT_PATHS = ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/System/Library/Fonts/Helvetica.ttc")
+TAB_SIZE = 4
+
+
+@lru_cache(maxsize=4)
+def _font(size: int = TEXT_FONT_SIZE):
+    """
+    TrueType-Schrift einmal pro Prozess laden. Fallback: PIL-Standardschrift in size
+    (Pillow >= 10.1), sonst die feste Bitmap-Standardschrift. None nur ohne Pillow.
+    """
+    if not ImageFont:
+        return None
+    for path in TEXT_FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, size)
+        except Exception:
+            pass
+    try:
+        font = ImageFont.load_default(size)
+    except TypeError:
+        font = None  # Pillow < 10.1: load_default() ohne Größe
+    if font is None:
+        font = ImageFont.load_default()
+    if font is None:
+        raise RuntimeError("Keine Schrift für Text-Rendering verfügbar (Pillow prüfen)")
+    return font
+
+
+def _line_height(font) -> int:
+    return max(1, round(getattr(font, "size", TEXT_FONT_SIZE) * TEXT_LINE_SPACING))
+
+
+def _wrap_line(line: str, font, max_width: float, word_widths: dict[str, float]) -> list[str]:
+    """Eine Zeile an Wortgrenzen nach echter Glyphenbreite umbrechen; überlange Wörter hart teilen."""
+    if font.getlength(line) <= max_width:
+        return [line]
+    space = font.getlength(" ")
+    out: list[str] = []
+    current: list[str] = []
+    width = 0.0
+    for word in line.split(" "):
+        w = word_widths.get(word)
+        if w is None:
+            w = word_widths[word] = font.getlength(word)
+        if current and width + space + w <= max_width:
+            current.append(word)
+            width += space + w
+            continue
+        if current:
+            out.append(" ".join(current))
+        while w > max_width:
+            # Längsten Präfix suchen, der passt (binäre Suche über die Zeichenzahl)
+            lo, hi = 1, len(word)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if font.getlength(word[:mid]) <= max_width:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            out.append(word[:lo])
+            word = word[lo:]
+            w = font.getlength(word)
+        current, width = [word], w
+    if current:
+        out.append(" ".join(current))
+    return out
 
 
-def _text_to_png_bytes(text: str, source_name: str = "") -> list[bytes]:
-    """Rendert Fließtext in eine oder mehrere PNG(s). Jede PNG = ein Block Text."""
+def _text_chunks(text: str, title: str = "") -> list[list[str]]:
+    """
+    Fließtext in Seiten (je ein PNG) aufteilen – nur vermessen, nicht rendern. Umbruch an
+    Wortgrenzen nach Glyphenbreite der gecachten Schrift, Seiten bis TEXT_PAGE_HEIGHT gefüllt.
+    """
     if not text or not text.strip():
         return []
-    if not Image:
-        return []  # Fallback: Caller kann Text direkt an Gemini senden
-    lines = text.replace("\r\n", "\n").replace("\r", "\n").strip().split("\n")
+    font = _font()
+    if font is None:
+        raise RuntimeError("Pillow fehlt: Text kann nicht als PNG gerendert werden")
+    line_height = _line_height(font)
+    max_width = TEXT_PAGE_WIDTH - 2 * TEXT_MARGIN
+    body_height = TEXT_PAGE_HEIGHT - 2 * TEXT_MARGIN - (line_height if title else 0)
+    lines_per_page = max(1, body_height // line_height)
+    word_widths: dict[str, float] = {}
     out = []
     chunk: list[str] = []
-    for line in lines:
-        # Lange Zeilen umbrechen
-        while len(line) > CHARS_PER_LINE:
-            chunk.append(line[:CHARS_PER_LINE])
-            line = line[CHARS_PER_LINE:]
-            if len(chunk) >= TEXT_PNG_MAX_LINES:
-                out.append(_render_lines_to_png(chunk, source_name))
+    text = text.replace("\r\n", "\n").replace("\r", "\n").strip()
+    # Mehrere Leerzeilen tragen keinen Inhalt, kosten aber Bildfläche
+    text = re.sub(r"\n[ \t]*(?:\n[ \t]*)+\n", "\n\n", text)
+    for line in text.split("\n"):
+        for wrapped in _wrap_line(line.rstrip().expandtabs(TAB_SIZE), font, max_width, word_widths):
+            chunk.append(wrapped)
+            if len(chunk) >= lines_per_page:
+                out.append(chunk)
                 chunk = []
-        chunk.append(line)
-        if len(chunk) >= TEXT_PNG_MAX_LINES:
-            out.append(_render_lines_to_png(chunk, source_name))
-            chunk = []
     if chunk:
-        out.append(_render_lines_to_png(chunk, source_name))
+        out.append(chunk)
     return out
 
 
+def _text_to_png_bytes(text: str, source_name: str = "") -> list[bytes]:
+    """Rendert Fließtext in eine oder mehrere PNG(s). Jede PNG = eine gefüllte Textseite."""
+    if not Image:
+        return []  # Fallback: Caller kann Text direkt an Gemini senden
+    return [_render_lines_to_png(chunk, source_name) for chunk in _text_chunks(text, source_name)]
+
+
 def _render_lines_to_png(lines: list[str], title: str) -> bytes:
-    """Zeilen in eine PNG zeichnen (einfaches weißes Bild mit schwarzer Schrift)."""
-    try:
-        from PIL import ImageDraw, ImageFont
-    except ImportError:
-        ImageDraw = ImageFont = None
-    font_size = 14
-    line_height = 20
-    margin = 40
-    width = 800
-    top = margin + (line_height * 2 if title else 0)
-    height = margin + top + len(lines) * line_height
-    img = Image.new("RGB", (width, height), (255, 255, 255))
-    draw = ImageDraw.Draw(img) if ImageDraw else None
-    font = None
-    if ImageFont:
-        for path in ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/System/Library/Fonts/Helvetica.ttc"):
-            try:
-                font = ImageFont.truetype(path, font_size)
-                break
-            except Exception:
-                pass
-        if font is None:
-            try:
-                font = ImageFont.load_default()
-            except Exception:
-                pass
-    if draw and font:
+    """Zeilen (aus _text_chunks) in eine PNG zeichnen: weißes Graustufenbild, schwarze Schrift."""
+    font = _font()
+    line_height = _line_height(font) if font else TEXT_FONT_SIZE
+    top = TEXT_MARGIN + (line_height if title else 0)
+    # Letzte Seite nur so hoch wie nötig
+    height = min(TEXT_PAGE_HEIGHT, top + len(lines) * line_height + TEXT_MARGIN)
+    img = Image.new("L", (TEXT_PAGE_WIDTH, height), 255)
+    if font and ImageDraw:
+        draw = ImageDraw.Draw(img)
         if title:
-            draw.text((margin, 10), title[:80], fill=(0, 0, 0), font=font)
+            draw.text((TEXT_MARGIN, TEXT_MARGIN // 2), title[:200], fill=0, font=font)
         for i, line in enumerate(lines):
-            y = top + i * line_height
-            draw.text((margin, y), line[:200], fill=(0, 0, 0), font=font)
+            draw.text((TEXT_MARGIN, top + i * line_height), line, fill=0, font=font)
+    return _encode_png(img)
+
+
+def _encode_png(img) -> bytes:
+    """PIL-Bild → PNG-Bytes, bei IMAGE_OPTIMIZE kompakt (siehe image_optimize)."""
+    if IMAGE_OPTIMIZE:
+        return optimize_image(img)
     buf = io.BytesIO()
     img.save(buf, format="PNG")
     return buf.getvalue()
 
 
-def _pdf_to_pngs(path: Path) -> list[bytes]:
+def _render_pdf_pages(path: str, pages: list[int], dpi: int = PDF_DPI) -> list[bytes]:
+    """Seiten (0-basiert) rendern. Läuft auch im Worker-Prozess (eigenes fitz-Dokument)."""
+    out = []
+    doc = fitz.open(path)
+    try:
+        for i in pages:
+            pix = doc[i].get_pixmap(dpi=dpi)
+            if IMAGE_OPTIMIZE and Image:
+                out.append(optimize_image(Image.frombytes("RGB", (pix.width, pix.height), pix.samples)))
+            else:
+                out.append(pix.tobytes("png"))
+    finally:
+        doc.close()
+    return out
+
+
+def _page_ranges(n_pages: int, n_chunks: int) -> list[tuple[int, int]]:
+    """n_pages in n_chunks zusammenhängende Bereiche teilen (Reihenfolge bleibt erhalten)."""
+    n_chunks = max(1, min(n_chunks, n_pages))
+    size, rest = divmod(n_pages, n_chunks)
+    ranges, start = [], 0
+    for k in range(n_chunks):
+        stop = start + size + (1 if k < rest else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _iter_render_pages(path: Path, pages: list[int], executor: Executor | None = None) -> Iterator[bytes]:
+    """
+    Seiten lazy rendern, in der Reihenfolge von pages. Ab PDF_PARALLEL_MIN_PAGES in Blöcken
+    à PDF_STREAM_CHUNK Seiten parallel – im übergebenen Prozess-Pool (API: gemeinsames
+    CPU-Limit über alle Jobs) oder in einem eigenen Pool mit PDF_RASTER_WORKERS Prozessen.
+    Höchstens so viele Blöcke wie Worker sind gleichzeitig unterwegs → Speicher bleibt begrenzt.
+    """
+    chunks = [pages[i : i + PDF_STREAM_CHUNK] for i in range(0, len(pages), PDF_STREAM_CHUNK)]
+    workers = max(1, PDF_RASTER_WORKERS)
+    own_pool = executor is None
+    if len(pages) < PDF_PARALLEL_MIN_PAGES or (own_pool and workers == 1):
+        for chunk in chunks:
+            yield from _render_pdf_pages(str(path), chunk)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers) if own_pool else executor
+    try:
+        todo = iter(chunks)
+        in_flight = deque(pool.submit(_render_pdf_pages, str(path), c) for c in islice(todo, workers))
+        while in_flight:
+            fut = in_flight.popleft()
+            nxt = next(todo, None)
+            if nxt is not None:
+                in_flight.append(pool.submit(_render_pdf_pages, str(path), nxt))
+            # In Submit-Reihenfolge einsammeln → deterministische Seitenfolge
+            yield from fut.result()
+    finally:
+        if own_pool:
+            pool.shutdown(cancel_futures=True)
+
+
+def _pdf_page_count(path: Path) -> int:
+    try:
+        with fitz.open(str(path)) as doc:
+            return len(doc)
+    except Exception:
+        return 0
+
+
+def _pdf_to_pngs(path: Path, executor: Executor | None = None) -> list[bytes]:
+    """PDF → eine PNG pro Seite (große PDFs parallel, siehe _iter_render_pages)."""
     if not fitz:
         return []
-    out = []
+    try:
+        return list(_iter_render_pages(path, list(range(_pdf_page_count(path))), executor))
+    except Exception:
+        return []
+
+
+def _page_text_layer(page) -> str | None:
+    """
+    Klassifiziert eine PDF-Seite über die PyMuPDF-Textebene.
+    Returns: Text, wenn die Seite eine brauchbare Textebene hat; None, wenn sie gerastert
+    werden muss (Scan, bildlastig, keine Fonts, zu wenig oder unlesbarer Text).
+    """
+    if not page.get_fonts():
+        return None
+    text = page.get_text("text") or ""
+    stripped = text.strip()
+    if len(stripped) < PDF_TEXT_MIN_CHARS:
+        return None
+    # Kaputte Font-Encodings liefern Ersatzzeichen statt Text
+    if stripped.count("\ufffd") > len(stripped) * 0.05:
+        return None
+    page_area = abs(page.rect) or 1.0
+    image_area = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page.rect
+        image_area += abs(bbox)
+    if image_area / page_area > PDF_IMAGE_COVERAGE_MAX:
+        return None
+    return stripped
+
+
+def _pdf_range_bytes(doc, start: int, stop: int) -> bytes:
+    """Seiten [start, stop) als eigenständiges PDF (nur benötigte Ressourcen, komprimiert)."""
+    part = fitz.open()
+    try:
+        part.insert_pdf(doc, from_page=start, to_page=stop - 1)
+        return part.tobytes(garbage=3, deflate=True)
+    finally:
+        part.close()
+
+
+def split_pdf(data: bytes) -> tuple[bytes, bytes] | None:
+    """PDF-Bytes in zwei Hälften teilen (für zu große Gemini-Requests); None bei < 2 Seiten."""
+    if not fitz:
+        return None
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        n = len(doc)
+        if n < 2:
+            return None
+        return _pdf_range_bytes(doc, 0, n // 2), _pdf_range_bytes(doc, n // 2, n)
+
+
+def _iter_pdf_parts(doc, path: Path, start: int, stop: int, label) -> Iterator[Segment]:
+    """
+    Seiten [start, stop) als PDF-Teildokumente (PDF_NATIVE): höchstens PDF_NATIVE_PAGES Seiten
+    und PDF_NATIVE_MAX_BYTES pro Teil, zu große Teile werden halbiert. Eine einzelne Seite
+    über dem Byte-Limit wird doch gerastert (PNG-Fallback).
+    """
+    if stop - start > PDF_NATIVE_PAGES:
+        for a in range(start, stop, PDF_NATIVE_PAGES):
+            yield from _iter_pdf_parts(doc, path, a, min(stop, a + PDF_NATIVE_PAGES), label)
+        return
+    data = _pdf_range_bytes(doc, start, stop)
+    if len(data) <= PDF_NATIVE_MAX_BYTES:
+        yield Segment(label(start, stop - 1), pdf=data, pages=stop - start)
+    elif stop - start == 1:
+        yield Segment(label(start, start), png=_render_pdf_pages(str(path), [start])[0])
+    else:
+        mid = (start + stop) // 2
+        yield from _iter_pdf_parts(doc, path, start, mid, label)
+        yield from _iter_pdf_parts(doc, path, mid, stop, label)
+
+
+def _iter_pdf_segments(path: Path, name: str, executor: Executor | None = None) -> Iterator[Segment]:
+    """
+    PDF → Segmente in Seitenreihenfolge: Seiten mit Textebene als Text (aufeinanderfolgende
+    zusammengefasst, PDF_TEXT_LAYER), die übrigen als PNG (lazy gerendert) oder – bei
+    PDF_NATIVE – als PDF-Teildokumente für Gemini, ganz ohne lokale Rasterung.
+    Raises: RuntimeError, wenn das PDF nicht (vollständig) gelesen werden kann – auch mitten im
+      Strom, damit ein abgeschnittenes PDF nie als vollständig verarbeitet gilt.
+    """
+    if not fitz:
+        return
     try:
         doc = fitz.open(str(path))
-        for i in range(len(doc)):
-            page = doc[i]
-            pix = page.get_pixmap(dpi=PDF_DPI)
-            out.append(pix.tobytes("png"))
+    except Exception as e:
+        raise RuntimeError(f"PDF nicht lesbar: {name} ({e})") from e
+    n_pages = len(doc)
+    try:
+        page_texts = [_page_text_layer(doc[i]) if PDF_TEXT_LAYER else None for i in range(n_pages)]
+    except Exception as e:
+        doc.close()
+        raise RuntimeError(f"PDF nicht lesbar: {name} ({e})") from e
+    raster_pages = [i for i, t in enumerate(page_texts) if t is None]
+    pngs = _iter_render_pages(path, [] if PDF_NATIVE else raster_pages, executor)
+
+    def label(a: int, b: int) -> str:
+        if n_pages == 1:
+            return name
+        return f"{name} (Seite {a + 1}/{n_pages})" if a == b else f"{name} (Seite {a + 1}–{b + 1}/{n_pages})"
+
+    i = 0
+    try:
+        while i < n_pages:
+            # Lauf aufeinanderfolgender Seiten gleicher Art (Text bzw. Raster)
+            is_text = page_texts[i] is not None
+            j = i
+            while j + 1 < n_pages and (page_texts[j + 1] is not None) == is_text:
+                j += 1
+            if is_text:
+                yield Segment(label(i, j), text="\n\n".join(page_texts[i : j + 1]))
+            elif PDF_NATIVE:
+                yield from _iter_pdf_parts(doc, path, i, j + 1, label)
+            else:
+                for k in range(i, j + 1):
+                    yield Segment(label(k, k), png=next(pngs))
+            i = j + 1
+    except Exception as e:
+        raise RuntimeError(f"PDF ab Seite {i + 1}/{n_pages} nicht lesbar: {name} ({e})") from e
+    finally:
+        pngs.close()
         doc.close()
-    except Exception:
-        pass
-    return out
 
 
 def _image_to_png(path: Path) -> list[bytes]:
@@ -145,11 +418,13 @@ def _image_to_png(path: Path) -> list[bytes]:
     out = []
     try:
         with Image.open(path) as im:
-            if im.mode in ("RGBA", "P"):
+            if not IMAGE_OPTIMIZE and im.mode in ("RGBA", "P"):
                 im = im.convert("RGB")
-            buf = io.BytesIO()
-            im.save(buf, format="PNG")
-            out.append(buf.getvalue())
+            if IMAGE_OPTIMIZE and im.format == "PNG":
+                # Vorhandenes PNG behalten, wenn die Optimierung nichts spart
+                out.append(optimize_image(im, original=path.read_bytes()))
+            else:
+                out.append(_encode_png(im))
     except Exception:
         pass
     return out
@@ -225,86 +500,168 @@ def _eml_to_text(path: Path) -> str:
     return ""
 
 
-def file_to_pngs(path: Path, source_name: str | None = None) -> list[bytes]:
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tiff", ".tif")
+
+
+class Segment(NamedTuple):
+    """
+    Ein Stück Eingabe für die Extraktion: Bild (png), bereits exakter Text oder
+    PDF-Teildokument (pdf, PDF_NATIVE) mit pages Seiten.
     """
-    Konvertiert eine Datei in eine Liste von PNG-Bildern (Bytes).
-    Geeignet für den Upload an Gemini 3 Flash Preview.
 
-    Returns:
-        Liste von PNG-Dateien als bytes. Kann leer sein bei unbekanntem Format oder Fehler.
+    label: str
+    png: bytes | None = None
+    text: str | None = None
+    pdf: bytes | None = None
+    pages: int = 1
+
+
+def file_to_text(path: Path) -> str | None:
+    """
+    Exakter Text für text-native Formate (TXT, MD, CSV, JSON, HTML, DOCX, XLSX, EML, …).
+    Returns: Text ("" wenn leer/Fehler) oder None für visuelle Quellen (PDF, Bilder).
     """
     path = Path(path).resolve()
-    if not path.is_file():
-        return []
-    name = source_name or path.name
     suffix = path.suffix.lower()
-
-    # PDF
-    if suffix == ".pdf" and fitz:
-        return _pdf_to_pngs(path)
-
-    # Bilder → eine PNG
-    if suffix in (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tiff", ".tif"):
-        return _image_to_png(path)
+    if (suffix == ".pdf" and fitz) or suffix in IMAGE_SUFFIXES:
+        return None
 
     # Office / Text
     if suffix in (".docx", ".doc"):
         text = _docx_to_text(path) if suffix == ".docx" and DocxDocument else ""
-        if not text and path.suffix.lower() == ".doc":
+        if not text and suffix == ".doc":
             text = "( .doc nur mit LibreOffice konvertierbar; bitte als .docx bereitstellen )"
-        return _text_to_png_bytes(text or "(leer)", name) if text or suffix == ".docx" else []
+        return (text or "(leer)") if text or suffix == ".docx" else ""
 
     if suffix in (".xlsx", ".xls"):
         text = _xlsx_to_text(path) if suffix == ".xlsx" and openpyxl else ""
         if not text and suffix == ".xls":
             text = "( .xls nur mit LibreOffice konvertierbar )"
-        return _text_to_png_bytes(text or "(leer)", name) if text or suffix == ".xlsx" else []
+        return (text or "(leer)") if text or suffix == ".xlsx" else ""
 
     # E-Mail
     if suffix == ".eml":
-        text = _eml_to_text(path)
-        return _text_to_png_bytes(text or "(kein lesbarer Inhalt)", name)
+        return _eml_to_text(path) or "(kein lesbarer Inhalt)"
 
     # Text-basierte Formate
     if suffix in (".txt", ".md", ".csv", ".json", ".xml", ".html", ".htm", ".rtf"):
         try:
             raw = path.read_text(encoding="utf-8", errors="replace")
         except Exception:
-            return []
+            return ""
         if suffix == ".html" or suffix == ".htm":
             raw = _html_to_text(raw)
         elif suffix == ".csv":
             rows = list(csv.reader(io.StringIO(raw)))
             raw = "\n".join("\t".join(cell for cell in row) for row in rows)
-        return _text_to_png_bytes(raw, name) if raw.strip() else []
+        return raw if raw.strip() else ""
 
     # Unbekannt: als Binärtext oder „raw“ versuchen
     try:
         raw = path.read_text(encoding="utf-8", errors="replace")
-        if raw.strip():
-            return _text_to_png_bytes(raw, name)
+        return raw if raw.strip() else ""
     except Exception:
-        pass
-    return []
+        return ""
+
+
+def _file_png_iter(path: Path, name: str, executor: Executor | None = None) -> tuple[int, Iterator[bytes]]:
+    """
+    (Anzahl PNGs, lazy Iterator der PNGs) für eine Datei. Die Anzahl steht vorab fest
+    (PDF-Seitenzahl bzw. Zahl der Textblöcke), gerendert wird erst beim Iterieren.
+    """
+    if not path.is_file():
+        return 0, iter(())
+    suffix = path.suffix.lower()
+
+    # PDF
+    if suffix == ".pdf" and fitz:
+        n = _pdf_page_count(path)
+        return n, _iter_render_pages(path, list(range(n)), executor)
+
+    # Bilder → eine PNG
+    if suffix in IMAGE_SUFFIXES:
+        pngs = _image_to_png(path)
+        return len(pngs), iter(pngs)
+
+    # Text-native Formate → Text rendern
+    chunks = _text_chunks(file_to_text(path) or "", name) if Image else []
+    return len(chunks), (_render_lines_to_png(chunk, name) for chunk in chunks)
+
+
+def file_to_pngs(path: Path, source_name: str | None = None, *, executor: Executor | None = None) -> list[bytes]:
+    """
+    Konvertiert eine Datei in eine Liste von PNG-Bildern (Bytes).
+    Geeignet für den Upload an Gemini 3 Flash Preview.
+    executor: optionaler Prozess-Pool für die parallele PDF-Rasterung.
+
+    Returns:
+        Liste von PNG-Dateien als bytes. Kann leer sein bei unbekanntem Format oder Fehler.
+    """
+    path = Path(path).resolve()
+    try:
+        return list(_file_png_iter(path, source_name or path.name, executor)[1])
+    except Exception:
+        return []
+
 
+def _page_label(name: str, i: int, n: int) -> str:
+    return f"{name} (Seite {i + 1}/{n})" if n > 1 else name
 
-def files_to_pngs(paths: list[Path]) -> list[tuple[str, bytes]]:
+
+def iter_pngs(paths: list[Path], *, executor: Executor | None = None) -> Iterator[tuple[str, bytes]]:
+    """
+    Lazy-Variante von files_to_pngs: liefert (label, png_bytes) einzeln, ohne alle Seiten
+    aller Dateien gleichzeitig im Speicher zu halten. Labels „Seite i/n“ wie gehabt.
+    """
+    for path in paths:
+        path = Path(path)
+        n, pngs = _file_png_iter(path.resolve(), path.name, executor)
+        try:
+            for i, png in enumerate(pngs):
+                yield _page_label(path.name, i, n), png
+        except Exception:
+            continue
+
+
+def files_to_pngs(paths: list[Path], *, executor: Executor | None = None) -> list[tuple[str, bytes]]:
     """
     Mehrere Dateien → flache Liste von (dateiname, png_bytes).
     dateiname dient als Kontext für Gemini (z. B. „document.pdf Seite 3“).
+    executor: optionaler Prozess-Pool für die parallele PDF-Rasterung.
+    """
+    return list(iter_pngs(paths, executor=executor))
+
+
+def iter_segments(paths: list[Path], *, executor: Executor | None = None) -> Iterator[Segment]:
+    """
+    Lazy-Variante von files_to_segments: PNG-Segmente werden erst beim Iterieren gerendert.
     """
-    result = []
     for path in paths:
         path = Path(path)
-        name = path.name
-        pngs = file_to_pngs(path, source_name=name)
-        for i, png in enumerate(pngs):
-            if len(pngs) > 1:
-                label = f"{name} (Seite {i + 1}/{len(pngs)})"
-            else:
-                label = name
-            result.append((label, png))
-    return result
+        if not path.is_file():
+            continue
+        if (PDF_TEXT_LAYER or PDF_NATIVE) and fitz and path.suffix.lower() == ".pdf":
+            yield from _iter_pdf_segments(path, path.name, executor)
+            continue
+        text = file_to_text(path)
+        if text is not None:
+            if text.strip():
+                yield Segment(path.name, text=text)
+            continue
+        for label, png in iter_pngs([path], executor=executor):
+            yield Segment(label, png=png)
+
+
+def files_to_segments(paths: list[Path], *, executor: Executor | None = None) -> list[Segment]:
+    """
+    Wie files_to_pngs, aber text-native Formate bleiben Text (Segment.text) statt
+    als PNG gerendert und per Bildmodell zurückgelesen zu werden. Nur visuelle
+    Quellen (Bilder, gescannte PDF-Seiten) werden zu PNG-Segmenten; PDF-Seiten mit
+    brauchbarer Textebene liefern direkt Text (PDF_TEXT_LAYER), Seitenfolge bleibt erhalten.
+    Mit PDF_NATIVE werden die übrigen PDF-Seiten nicht gerastert, sondern als
+    PDF-Teildokumente (Segment.pdf) für den direkten Upload an Gemini geliefert.
+    """
+    return list(iter_segments(paths, executor=executor))
 
 
 if __name__ == "__main__":
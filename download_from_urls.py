@@ -12,19 +12,76 @@ Unterstützt:
   - Öffentliche Supabase-URLs: .../object/public/<bucket>/<path>
   - Signed URLs (temporäre Links für private Buckets)
   - Beliebige andere HTTP(S)-URLs
+
+Mehrere URLs werden parallel über einen gemeinsamen httpx.AsyncClient geladen
+(Keep-Alive, HTTP/2 falls „h2“ installiert). Parallelität per .env:
+  DOWNLOAD_CONCURRENCY=8   (gleichzeitige Downloads insgesamt)
+  DOWNLOAD_PER_HOST=4      (gleichzeitige Downloads pro Host)
+
+Downloads werden blockweise auf die Platte gestreamt (kein ganzer Body im RAM),
+dabei wird SHA-256 mitgerechnet. Größenlimits (Content-Length wird vorab geprüft,
+sonst Abbruch mitten im Stream):
+  DOWNLOAD_MAX_FILE_BYTES=524288000   (pro Datei)
+  DOWNLOAD_MAX_JOB_BYTES=2147483648   (pro Aufruf / Job, alle Dateien zusammen)
+Wird ein Limit überschritten, bricht der ganze Aufruf mit DownloadTooLarge ab (laufende
+Downloads werden abgebrochen, Teildateien gelöscht) – der Job soll nie still auf einer
+unvollständigen Dateimenge weiterlaufen, deren Auswahl von der Download-Reihenfolge abhinge.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import os
 import re
 import tempfile
 from pathlib import Path
+from typing import NamedTuple
 from urllib.parse import unquote, urlparse
 
 try:
     import httpx
 except ImportError:
     httpx = None
+try:
+    import h2  # noqa: F401 – nur für httpx HTTP/2
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", "8"))
+DOWNLOAD_PER_HOST = int(os.environ.get("DOWNLOAD_PER_HOST", "4"))
+DOWNLOAD_MAX_FILE_BYTES = int(os.environ.get("DOWNLOAD_MAX_FILE_BYTES", str(500 * 1024**2)))
+DOWNLOAD_MAX_JOB_BYTES = int(os.environ.get("DOWNLOAD_MAX_JOB_BYTES", str(2 * 1024**3)))
+CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadedFile(NamedTuple):
+    """Heruntergeladene Datei mit SHA-256 (z. B. als Cache-Schlüssel, ohne die Datei neu zu lesen)."""
+
+    path: Path
+    sha256: str
+    size: int
+
+
+class DownloadTooLarge(Exception):
+    """Datei- oder Job-Budget überschritten."""
+
+
+class _ByteBudget:
+    """Gemeinsamer Byte-Zähler aller Downloads eines Jobs (asyncio: ein Thread, keine Locks nötig)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+
+    def take(self, n: int) -> None:
+        self.used += n
+        if self.max_bytes and self.used > self.max_bytes:
+            raise DownloadTooLarge(f"Job-Limit {self.max_bytes} Bytes überschritten")
+
+    def give_back(self, n: int) -> None:
+        self.used -= n
 
 
 def filename_from_url(url: str, content_disposition: str | None = None) -> str:
@@ -48,51 +105,227 @@ def filename_from_url(url: str, content_disposition: str | None = None) -> str:
     return "download"
 
 
+def _safe_name(url: str, content_disposition: str | None) -> str:
+    name = filename_from_url(url, content_disposition)
+    # Nur sichere Zeichen im Dateinamen
+    name = re.sub(r'[^\w\s\-\.]', '_', name)[:200]
+    if not name or name in (".", ".."):
+        name = "download"
+    return name
+
+
+def _unique_path(dest_dir: Path, name: str) -> Path:
+    """Freien Pfad wählen. Duplikate: datei.pdf → datei_1.pdf"""
+    path = dest_dir / name
+    if path.exists():
+        stem, suf = path.stem, path.suffix
+        for i in range(1, 100):
+            path = dest_dir / f"{stem}_{i}{suf}"
+            if not path.exists():
+                break
+    return path
+
+
+def _check_content_length(r, max_file_bytes: int, budget: _ByteBudget | None = None) -> None:
+    """Vorab-Prüfung per Content-Length (falls der Server sie mitschickt)."""
+    try:
+        length = int(r.headers.get("content-length") or -1)
+    except ValueError:
+        return
+    if length < 0:
+        return
+    if max_file_bytes and length > max_file_bytes:
+        raise DownloadTooLarge(f"Datei zu groß: {length} > {max_file_bytes} Bytes")
+    if budget is not None and budget.max_bytes and budget.used + length > budget.max_bytes:
+        raise DownloadTooLarge(f"Job-Limit {budget.max_bytes} Bytes würde überschritten")
+
+
 def download_file(
     url: str,
     dest_dir: Path,
     *,
     timeout: float = 60.0,
     headers: dict | None = None,
+    max_file_bytes: int = DOWNLOAD_MAX_FILE_BYTES,
 ) -> Path | None:
     """
-    Lädt eine Datei von url herunter und speichert sie in dest_dir.
+    Lädt eine Datei von url herunter und speichert sie in dest_dir (gestreamt).
     Dateiname aus URL oder Content-Disposition.
     Returns: Pfad zur gespeicherten Datei oder None bei Fehler.
+    Raises: DownloadTooLarge, wenn die Datei max_file_bytes überschreitet.
     """
     if not httpx:
         return None
     dest_dir = Path(dest_dir)
     dest_dir.mkdir(parents=True, exist_ok=True)
+    tmp = dest_dir / f".download_{os.getpid()}_{id(url)}.part"
     try:
         with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-            r = client.get(url, headers=headers or {})
-            r.raise_for_status()
-            name = filename_from_url(url, r.headers.get("content-disposition"))
-            # Nur sichere Zeichen im Dateinamen
-            name = re.sub(r'[^\w\s\-\.]', '_', name)[:200]
-            if not name or name in (".", ".."):
-                name = "download"
-            path = dest_dir / name
-            # Duplikate: datei.pdf → datei_1.pdf
-            if path.exists():
-                stem, suf = path.stem, path.suffix
-                for i in range(1, 100):
-                    path = dest_dir / f"{stem}_{i}{suf}"
-                    if not path.exists():
-                        break
-            path.write_bytes(r.content)
+            with client.stream("GET", url, headers=headers or {}) as r:
+                r.raise_for_status()
+                _check_content_length(r, max_file_bytes)
+                size = 0
+                with open(tmp, "wb") as f:
+                    for chunk in r.iter_bytes(CHUNK_SIZE):
+                        size += len(chunk)
+                        if max_file_bytes and size > max_file_bytes:
+                            raise DownloadTooLarge(f"Datei zu groß: > {max_file_bytes} Bytes")
+                        f.write(chunk)
+                path = _unique_path(dest_dir, _safe_name(url, r.headers.get("content-disposition")))
+            tmp.replace(path)
             return path
+    except DownloadTooLarge:
+        tmp.unlink(missing_ok=True)
+        raise
     except Exception:
+        tmp.unlink(missing_ok=True)
         return None
 
 
+async def _download_one(
+    client: httpx.AsyncClient,
+    index: int,
+    url: str,
+    dest_dir: Path,
+    *,
+    headers: dict | None,
+    limit: asyncio.Semaphore,
+    host_limits: dict[str, asyncio.Semaphore],
+    per_host: int,
+    max_file_bytes: int,
+    budget: _ByteBudget,
+) -> tuple[Path, str, str, int] | None:
+    """
+    Streamt url in eine temporäre Datei und rechnet SHA-256 mit.
+    Returns: (temp_pfad, sicherer_dateiname, sha256, größe) oder None bei Fehler.
+    Raises: DownloadTooLarge (Datei- oder Job-Limit) – der Aufrufer bricht den Job ab.
+    """
+    host = urlparse(url).netloc.lower()
+    host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+    # Erst Host-Slot, dann globalen Slot: wartende Tasks eines Hosts blockieren keine anderen Hosts
+    async with host_limit, limit:
+        tmp = dest_dir / f".download_{index}.part"
+        size = 0
+        try:
+            async with client.stream("GET", url, headers=headers or {}) as r:
+                r.raise_for_status()
+                _check_content_length(r, max_file_bytes, budget)
+                h = hashlib.sha256()
+                with open(tmp, "wb") as f:
+                    async for chunk in r.aiter_bytes(CHUNK_SIZE):
+                        size += len(chunk)
+                        budget.take(len(chunk))
+                        if max_file_bytes and size > max_file_bytes:
+                            raise DownloadTooLarge(f"Datei zu groß: > {max_file_bytes} Bytes")
+                        h.update(chunk)
+                        f.write(chunk)
+                return tmp, _safe_name(url, r.headers.get("content-disposition")), h.hexdigest(), size
+        except (DownloadTooLarge, asyncio.CancelledError):
+            tmp.unlink(missing_ok=True)
+            raise
+        except Exception:
+            # Abgebrochene Datei zählt nicht gegen das Job-Budget
+            budget.give_back(size)
+            tmp.unlink(missing_ok=True)
+            return None
+
+
+async def download_from_urls_async(
+    urls: list[str],
+    dest_dir: Path,
+    *,
+    timeout: float = 60.0,
+    headers: dict | None = None,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    per_host: int = DOWNLOAD_PER_HOST,
+    max_file_bytes: int = DOWNLOAD_MAX_FILE_BYTES,
+    max_job_bytes: int = DOWNLOAD_MAX_JOB_BYTES,
+) -> list[DownloadedFile]:
+    """
+    Lädt alle URLs parallel über einen gemeinsamen AsyncClient (Connection-Pool, Keep-Alive).
+    Returns: DownloadedFile in URL-Reihenfolge (fehlgeschlagene Downloads ausgelassen).
+    Raises: DownloadTooLarge bei überschrittenem Datei- oder Job-Limit; übrige Downloads werden
+      abgebrochen, ihre Dateien gelöscht.
+    """
+    concurrency = max(1, concurrency)
+    per_host = max(1, min(per_host, concurrency))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    limit = asyncio.Semaphore(concurrency)
+    host_limits: dict[str, asyncio.Semaphore] = {}
+    budget = _ByteBudget(max_job_bytes)
+    async with httpx.AsyncClient(
+        timeout=timeout, follow_redirects=True, http2=HTTP2, limits=limits
+    ) as client:
+        tasks = [
+            asyncio.ensure_future(_download_one(
+                client, i, url, dest_dir,
+                headers=headers, limit=limit, host_limits=host_limits, per_host=per_host,
+                max_file_bytes=max_file_bytes, budget=budget,
+            ))
+            for i, url in enumerate(urls)
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            for res in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(res, tuple):
+                    res[0].unlink(missing_ok=True)
+            raise
+    # Endgültige Namen in URL-Reihenfolge vergeben → Duplikat-Suffixe wie beim sequentiellen Laden
+    files = []
+    for res in results:
+        if res is None:
+            continue
+        tmp, name, sha, size = res
+        path = _unique_path(dest_dir, name)
+        tmp.replace(path)
+        files.append(DownloadedFile(path, sha, size))
+    return files
+
+
+def download_from_urls_hashed(
+    urls: list[str],
+    dest_dir: Path | None = None,
+    *,
+    timeout: float = 60.0,
+    headers: dict | None = None,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    per_host: int = DOWNLOAD_PER_HOST,
+    max_file_bytes: int = DOWNLOAD_MAX_FILE_BYTES,
+    max_job_bytes: int = DOWNLOAD_MAX_JOB_BYTES,
+) -> tuple[Path, list[DownloadedFile]]:
+    """
+    Wie download_from_urls, liefert aber pro Datei (path, sha256, size).
+    Der Hash entsteht beim Streamen – spätere Stufen müssen die Datei nicht erneut lesen.
+    """
+    if dest_dir is None:
+        dest_dir = Path(tempfile.mkdtemp(prefix="wissenstext_"))
+    else:
+        dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    urls = [u.strip() for u in urls if (u or "").strip().startswith(("http://", "https://"))]
+    if not urls or not httpx:
+        return dest_dir, []
+    # Läuft im Job-Thread (kein Event-Loop aktiv) → eigener Loop pro Aufruf
+    files = asyncio.run(download_from_urls_async(
+        urls, dest_dir, timeout=timeout, headers=headers, concurrency=concurrency, per_host=per_host,
+        max_file_bytes=max_file_bytes, max_job_bytes=max_job_bytes,
+    ))
+    return dest_dir, files
+
+
 def download_from_urls(
     urls: list[str],
     dest_dir: Path | None = None,
     *,
     timeout: float = 60.0,
     headers: dict | None = None,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    per_host: int = DOWNLOAD_PER_HOST,
+    max_file_bytes: int = DOWNLOAD_MAX_FILE_BYTES,
+    max_job_bytes: int = DOWNLOAD_MAX_JOB_BYTES,
 ) -> tuple[Path, list[Path]]:
     """
     Lädt alle Dateien von den angegebenen URLs in ein Verzeichnis.
@@ -102,25 +335,23 @@ def download_from_urls(
         dest_dir: Zielordner; wenn None, wird ein temporärer Ordner angelegt.
         timeout: Timeout pro Request in Sekunden.
         headers: Optionale HTTP-Header (z. B. für Auth).
+        concurrency: Max. gleichzeitige Downloads.
+        per_host: Max. gleichzeitige Downloads pro Host.
+        max_file_bytes: Max. Größe pro Datei.
+        max_job_bytes: Max. Gesamtgröße aller Dateien dieses Aufrufs.
 
     Returns:
         (ordner_path, list_of_downloaded_file_paths)
         Der Ordner kann an die Pipeline übergeben werden (alle Dateien darin verarbeiten).
+
+    Raises:
+        DownloadTooLarge: eine Datei oder alle zusammen über dem Limit (kein Teilergebnis).
     """
-    if dest_dir is None:
-        dest_dir = Path(tempfile.mkdtemp(prefix="wissenstext_"))
-    else:
-        dest_dir = Path(dest_dir)
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    downloaded = []
-    for url in urls:
-        url = (url or "").strip()
-        if not url.startswith(("http://", "https://")):
-            continue
-        path = download_file(url, dest_dir, timeout=timeout, headers=headers)
-        if path is not None:
-            downloaded.append(path)
-    return dest_dir, downloaded
+    dest_dir, files = download_from_urls_hashed(
+        urls, dest_dir, timeout=timeout, headers=headers, concurrency=concurrency, per_host=per_host,
+        max_file_bytes=max_file_bytes, max_job_bytes=max_job_bytes,
+    )
+    return dest_dir, [f.path for f in files]
 
 
 if __name__ == "__main__":
@@ -2,6 +2,18 @@
 """
 E-Mail-Analyse: Posteingang vs. Postausgang prüfen, Threads matchen (Message-ID / In-Reply-To),
 Wissen als Frage-Antwort-Paare extrahieren und in eine Textdatei schreiben.
+
+Große Postfächer werden parallel geladen (EMAIL_PARSE_WORKERS Prozesse): jeder Worker parst
+.eml-Dateien und liefert nur einfache, picklebare Dicts (Header als Strings, Body-Text) zurück.
+Zweiphasig (collect_pairs): erst nur die Header aller Mails fürs Matching, Bodies werden
+danach nur für die zugeordneten Paare dekodiert (load_bodies).
+Persistenter Index (email_index.py, EMAIL_INDEX): Header und Bodies bereits geparster Dateien
+kommen aus SQLite, neu geparst werden nur neue oder geänderte .eml-Dateien.
+EMAIL_PAIRING=thread: statt einzelner Paare ganze Konversationen (email_threads.py, Union-Find
+über References/In-Reply-To, Betreff+Zeitfenster für Mails ohne Message-ID) – ein Block pro Thread.
+Auch per CLI: --pairing thread (mit und ohne --output-dir).
+collect_pairs liefert die Paare strukturiert (Pipeline → wissen_analyse_parser.run_with_pairs),
+paare.txt ist nur noch der lesbare Export (write_paare_txt).
 """
 
 import email
@@ -13,6 +25,11 @@ from email.parser import BytesParser
 from email.utils import parsedate_to_datetime
 from collections import defaultdict
 
+from email_index import EmailIndex, get_email_index
+from email_threads import build_threads
+from ordered_map import map_ordered
+from text_budget import fair_caps, truncate
+
 # Pfade (Defaults für Standalone-Lauf)
 BASE = Path(__file__).resolve().parent
 POSTEINGANG = BASE / "Posteingang 01.01.25-30.06.25 Reiseteam"
@@ -20,35 +37,81 @@ POSTAUSGANG = BASE / "Postausgang 01.01.25-30.06.25 Reiseteam"
 OUTPUT_KNOWLEDGE_141 = BASE / "Wissensbasis_Reiseteam_141_Paare.txt"
 OUTPUT_KNOWLEDGE_FULL = BASE / "Wissensbasis_Reiseteam_vollstaendig.txt"
 OUTPUT_REPORT = BASE / "Analyse_Bericht.txt"
+OUTPUT_KNOWLEDGE_THREADS = BASE / "Wissensbasis_Reiseteam_Threads.txt"
 
 REISETEAM_DOMAIN = "unyflygroup.com"
 
-
-def run_with_paths(
+# Paralleles Laden: Prozesse und Mindestzahl Dateien (darunter lohnt der Pool-Start nicht)
+EMAIL_PARSE_WORKERS = int(os.environ.get("EMAIL_PARSE_WORKERS", str(os.cpu_count() or 1)))
+EMAIL_PARALLEL_MIN_FILES = 200
+# Header, die fürs Thread-Matching gebraucht werden (statt des EmailMessage-Objekts)
+MATCH_HEADERS = ("Message-ID", "In-Reply-To", "References")
+# Ausgabe: "pair" = ein Block pro Support-Antwort + Kundenmail, "thread" = ein Block pro Konversation
+EMAIL_PAIRING = os.environ.get("EMAIL_PAIRING", "pair").strip().lower()
+# Kennzeichnung gekürzter Mail-Texte (_body_text, pro Nachricht im Thread-Modus)
+BODY_TRUNCATED_MARKER = "\n... (gekürzt)"
+# Zitierter Verlauf in Antworten (im Thread-Modus pro Nachricht abgeschnitten, steht ja schon im Thread)
+QUOTE_START_RE = re.compile(
+    r"\bAm\s+\d{1,2}\.\d{1,2}\.\d{2,4}[^\n]{0,120}?\bschrieb\b[^\n:]{0,200}:"
+    r"|\bhat am\s+\d{1,2}\.\d{1,2}\.\d{2,4}[^\n]{0,120}?geschrieben:"
+    r"|\bOn\s[^\n]{1,200}?\bwrote:"
+    r"|-{2,}\s*(?:Ursprüngliche Nachricht|Original Message|Weitergeleitete Nachricht|Forwarded message)"
+    r"|\bVon:\s[^\n]{1,200}?\s+(?:Gesendet|Sent):"
+    r"|\bFrom:\s[^\n]{1,200}?\s+(?:Sent|Date):",
+    re.IGNORECASE,
+)
+
+
+def collect_pairs(
     posteingang_dir: Path,
     postausgang_dir: Path,
-    output_paare: Path,
     output_report: Path,
     support_domain: str | None = None,
-) -> int:
-    """Führt E-Mail-Pairing aus und schreibt paare.txt + Report. Gibt Anzahl der Paare zurück."""
+    mode: str | None = None,
+) -> list[dict]:
+    """
+    Führt E-Mail-Pairing aus, schreibt den Report und gibt die Paare strukturiert zurück
+    (direkt für wissen_analyse_parser.run_with_pairs, ohne Umweg über paare.txt).
+    mode: "pair" oder "thread" (Standard: EMAIL_PAIRING) – im Thread-Modus ist jedes
+      „Paar“ eine ganze Konversation.
+    Returns: [{id, betreff, datum_eingang, von_kunde, datum_antwort, anfrage, antwort
+      (+ nachrichten im Thread-Modus)}, ...] – anfrage/antwort genau wie in paare.txt.
+    """
     domain = (support_domain or REISETEAM_DOMAIN).lower()
-    inbox_by_id, inbox_no_id = load_all_emails(posteingang_dir)
-    outbox_by_id, outbox_no_id = load_all_emails(postausgang_dir)
+    mode = (mode or EMAIL_PAIRING).strip().lower()
+    index = get_email_index(output_report.parent)
+    # Phase 1: nur Header – Matching braucht Message-ID, In-Reply-To, References, From
+    inbox_by_id, inbox_no_id = load_all_emails(posteingang_dir, bodies=False, index=index)
+    outbox_by_id, outbox_no_id = load_all_emails(postausgang_dir, bodies=False, index=index)
     n_inbox = len(inbox_by_id) + len(inbox_no_id)
     n_outbox = len(outbox_by_id) + len(outbox_no_id)
 
     def is_support(data: dict) -> bool:
         return domain in (data.get("from") or "").lower()
 
+    if mode == "thread":
+        conversations = support_threads(inbox_by_id, inbox_no_id, outbox_by_id, outbox_no_id, is_support)
+        load_bodies([data for conv in conversations for data in conv], index=index)
+        report_lines = [
+            "=== E-Mail-Analyse: Posteingang vs. Postausgang ===\n",
+            f"Posteingang: {n_inbox} E-Mails",
+            f"Postausgang: {n_outbox} E-Mails",
+            f"Konversationen (Kundenanfrage + Support-Antwort): {len(conversations)}",
+            f"  – Nachrichten in diesen Konversationen: {sum(len(c) for c in conversations)}",
+            "",
+        ]
+        output_report.parent.mkdir(parents=True, exist_ok=True)
+        output_report.write_text("\n".join(report_lines), encoding="utf-8")
+        return [thread_pair(i, conv, is_support) for i, conv in enumerate(conversations, 1)]
+
     matched_pairs = []
     outbox_matched = set()
     inbox_matched = set()
     for mid, out_data in outbox_by_id.items():
         if not is_support(out_data):
             continue
-        in_reply = parse_message_ids(get_header(out_data["msg"], "In-Reply-To"))
-        refs = parse_message_ids(get_header(out_data["msg"], "References"))
+        in_reply = parse_message_ids(get_header(out_data["headers"], "In-Reply-To"))
+        refs = parse_message_ids(get_header(out_data["headers"], "References"))
         all_refs = list(dict.fromkeys(in_reply + refs))
         found_inbox = None
         for ref_id in all_refs:
@@ -58,7 +121,9 @@ def run_with_paths(
         if found_inbox:
             matched_pairs.append((found_inbox, out_data))
             outbox_matched.add(mid)
-            inbox_matched.add(normalize_message_id(get_header(found_inbox["msg"], "Message-ID")))
+            inbox_matched.add(normalize_message_id(get_header(found_inbox["headers"], "Message-ID")))
+    # Phase 2: Bodies nur für die Mails, die tatsächlich ausgegeben werden
+    load_bodies([data for pair in matched_pairs for data in pair], index=index)
 
     report_lines = [
         "=== E-Mail-Analyse: Posteingang vs. Postausgang ===\n",
@@ -69,28 +134,128 @@ def run_with_paths(
     ]
     output_report.parent.mkdir(parents=True, exist_ok=True)
     output_report.write_text("\n".join(report_lines), encoding="utf-8")
+    return [
+        {
+            "id": i,
+            "betreff": in_data["subject"],
+            "datum_eingang": in_data["date"],
+            "von_kunde": in_data["from"],
+            "datum_antwort": out_data["date"],
+            "anfrage": _body_text(in_data["body"]),
+            "antwort": _body_text(out_data["body"]),
+        }
+        for i, (in_data, out_data) in enumerate(matched_pairs, 1)
+    ]
+
 
+def write_paare_txt(pairs: list[dict], output_paare: Path) -> None:
+    """Lesbarer Export der Paare im paare.txt-Format (wieder einlesbar per wissen_analyse_parser)."""
+    threads = any("nachrichten" in p for p in pairs)
     output_paare.parent.mkdir(parents=True, exist_ok=True)
     with open(output_paare, "w", encoding="utf-8") as out:
-        out.write("WISSENSBASIS – KUNDENDIENST-PAARE\n")
-        out.write("(Posteingang + Postausgang, zugeordnet per Message-ID/In-Reply-To)\n")
+        if threads:
+            out.write("WISSENSBASIS – KUNDENDIENST-KONVERSATIONEN\n")
+            out.write("(Posteingang + Postausgang, Threads per References/In-Reply-To bzw. Betreff + Zeitfenster)\n")
+        else:
+            out.write("WISSENSBASIS – KUNDENDIENST-PAARE\n")
+            out.write("(Posteingang + Postausgang, zugeordnet per Message-ID/In-Reply-To)\n")
         out.write("=" * 80 + "\n\n")
-        for i, (in_data, out_data) in enumerate(matched_pairs, 1):
-            out.write(f"--- Paar {i} ---\n")
-            out.write(f"Betreff: {in_data['subject']}\n")
-            out.write(f"Datum (Eingang): {in_data['date']} | Von: {in_data['from']}\n")
-            out.write(f"Datum (Antwort): {out_data['date']}\n")
-            out.write("\n[ Anfrage / Kunde ]\n")
-            out.write((in_data["body"] or "(kein Text)")[:8000])
-            if len(in_data["body"] or "") > 8000:
-                out.write("\n... (gekürzt)")
-            out.write("\n\n[ Antwort / Reiseteam ]\n")
-            out.write((out_data["body"] or "(kein Text)")[:8000])
-            if len(out_data["body"] or "") > 8000:
-                out.write("\n... (gekürzt)")
+        for p in pairs:
+            out.write(f"--- Paar {p['id']} ---\n")
+            out.write(f"Betreff: {p['betreff']}\n")
+            out.write(f"Datum (Eingang): {p['datum_eingang']} | Von: {p['von_kunde']}\n")
+            out.write(f"Datum (Antwort): {p['datum_antwort']}\n")
+            if "nachrichten" in p:
+                out.write(f"Thread: {p['nachrichten']} Nachrichten\n")
+            out.write(f"\n[ Anfrage / Kunde ]\n{p['anfrage']}")
+            out.write(f"\n\n[ Antwort / Reiseteam ]\n{p['antwort']}")
             out.write("\n\n")
-    print(f"E-Mail-Pairing: {len(matched_pairs)} Paare → {output_paare}")
-    return len(matched_pairs)
+
+
+def run_with_paths(
+    posteingang_dir: Path,
+    postausgang_dir: Path,
+    output_paare: Path,
+    output_report: Path,
+    support_domain: str | None = None,
+    mode: str | None = None,
+) -> int:
+    """Führt E-Mail-Pairing aus und schreibt paare.txt + Report. Gibt Anzahl der Paare zurück."""
+    pairs = collect_pairs(posteingang_dir, postausgang_dir, output_report, support_domain, mode)
+    write_paare_txt(pairs, output_paare)
+    print(f"E-Mail-Pairing: {len(pairs)} Paare → {output_paare}")
+    return len(pairs)
+
+
+def _body_text(body: str | None) -> str:
+    """Mail-Text für Anfrage/Antwort: max. 8000 Zeichen, Kürzung markiert."""
+    text = (body or "(kein Text)")[:8000]
+    return text + BODY_TRUNCATED_MARKER if len(body or "") > 8000 else text
+
+
+def support_threads(inbox_by_id: dict, inbox_no_id: list, outbox_by_id: dict, outbox_no_id: list, is_support) -> list[list[dict]]:
+    """
+    Alle Mails (auch ohne Message-ID) zu Threads verbinden; behalten werden Threads mit
+    mindestens einer Kundenmail und einer Support-Antwort. Mails in beiden Ordnern zählen einmal.
+    """
+    records = list({**inbox_by_id, **outbox_by_id}.values())
+    records += [data for _, data in inbox_no_id] + [data for _, data in outbox_no_id]
+    threads = build_threads(records, normalize_id=normalize_message_id, parse_ids=parse_message_ids)
+    return [
+        t for t in threads
+        if any(is_support(d) for d in t) and any(not is_support(d) for d in t)
+    ]
+
+
+def strip_quoted(text: str) -> str:
+    """Zitierten Verlauf („Am … schrieb …:“, „-----Ursprüngliche Nachricht-----“, „> …“) abschneiden."""
+    m = QUOTE_START_RE.search(text or "")
+    if m:
+        text = text[: m.start()]
+    return "\n".join(line for line in (text or "").splitlines() if not line.lstrip().startswith(">")).strip()
+
+
+def thread_pair(i: int, thread: list[dict], is_support) -> dict:
+    """
+    Eine Konversation als Paar: alle Kundenmails unter anfrage, alle Support-Antworten unter
+    antwort, jeweils mit Position im Verlauf. Zitate und Support-Signaturen werden pro
+    Nachricht entfernt – auf dem ganzen Verlauf würde der erste Signaturschnitt alle späteren
+    Antworten abschneiden. antwort_bereinigt markiert das für structure_pair (kein zweiter Durchlauf).
+    Die Längengrenzen pro Paar (PAAR_MAX_*) werden fair auf die Nachrichten verteilt und jede
+    Nachricht einzeln gekürzt – sonst schnitte structure_pair alles nach den ersten Nachrichten ab.
+    """
+    from wissen_analyse_parser import PAAR_MAX_ANFRAGE, PAAR_MAX_ANTWORT, clean_reiseteam_answer
+
+    customer = [(n, d) for n, d in enumerate(thread, 1) if not is_support(d)]
+    support = [(n, d) for n, d in enumerate(thread, 1) if is_support(d)]
+    first = customer[0][1]
+
+    def turn(n: int, data: dict, with_from: bool) -> tuple[str, str]:
+        body = strip_quoted(data["body"] or "")
+        if not with_from:
+            body = clean_reiseteam_answer(body)
+        head = f"» Nachricht {n}/{len(thread)} · {data['date']}" + (f" · {data['from']}" if with_from else "")
+        return f"{head}\n", _body_text(body)
+
+    antwort = _join_turns([turn(n, d, False) for n, d in support], PAAR_MAX_ANTWORT)
+    return {
+        "id": i,
+        "betreff": first["subject"],
+        "datum_eingang": first["date"],
+        "von_kunde": first["from"],
+        "datum_antwort": support[-1][1]["date"],
+        "nachrichten": len(thread),
+        "anfrage": _join_turns([turn(n, d, True) for n, d in customer], PAAR_MAX_ANFRAGE),
+        "antwort": antwort,
+        "antwort_bereinigt": antwort,
+    }
+
+
+def _join_turns(turns: list[tuple[str, str]], max_chars: int) -> str:
+    """(Kopfzeile, Text) pro Nachricht verbinden; Texte fair gekürzt, damit alles in max_chars passt."""
+    overhead = sum(len(head) for head, _ in turns) + 2 * max(0, len(turns) - 1)
+    caps = fair_caps([len(text) for _, text in turns], max_chars - overhead)
+    return "\n\n".join(head + truncate(text, cap, BODY_TRUNCATED_MARKER) for (head, text), cap in zip(turns, caps))
 
 
 def normalize_message_id(raw: str) -> str:
@@ -177,11 +342,34 @@ def parse_eml(path: Path) -> email.message.EmailMessage | None:
         return None
 
 
-def get_header(msg: email.message.Message, name: str) -> str:
+def parse_eml_headers(path: Path) -> email.message.EmailMessage | None:
+    """Nur den Header-Block einer .eml-Datei lesen und parsen (Body wird nicht gelesen)."""
+    try:
+        lines = []
+        with open(path, "rb") as f:
+            for line in f:
+                if line in (b"\r\n", b"\n"):
+                    break
+                lines.append(line)
+        return BytesParser(policy=policy.default).parsebytes(b"".join(lines), headersonly=True)
+    except Exception:
+        return None
+
+
+def get_header(msg: email.message.Message | dict, name: str) -> str:
+    """Header als String; msg darf auch das headers-Dict aus load_email sein."""
     v = msg.get(name)
     return (v or "").strip()
 
 
+def get_timestamp(msg: email.message.Message) -> float | None:
+    """Date-Header als Unix-Zeit (für Thread-Sortierung und Zeitfenster), None wenn nicht lesbar."""
+    try:
+        return parsedate_to_datetime(get_header(msg, "Date")).timestamp()
+    except Exception:
+        return None
+
+
 def get_date_str(msg: email.message.Message) -> str:
     d = get_header(msg, "Date")
     if not d:
@@ -193,28 +381,86 @@ def get_date_str(msg: email.message.Message) -> str:
         return d
 
 
-def load_all_emails(folder: Path) -> tuple[dict[str, dict], list[tuple[Path, dict]]]:
+def load_email(path: Path, body: bool = True) -> dict | None:
     """
-    Lädt alle .eml aus folder.
-    Returns: (msg_id -> {path, msg, from, to, date, subject, body}, list of (path, data) ohne Message-ID)
+    Eine .eml-Datei → einfaches Dict (picklebar, läuft auch im Worker-Prozess).
+    body=False: nur Header parsen, "body" bleibt None (später per load_bodies).
+    Returns: {path, headers, from, to, date, timestamp, subject, body} oder None, wenn nicht lesbar.
     """
+    msg = parse_eml(path) if body else parse_eml_headers(path)
+    if msg is None:
+        return None
+    return {
+        "path": path,
+        "headers": {name: get_header(msg, name) for name in MATCH_HEADERS},
+        "from": get_header(msg, "From"),
+        "to": get_header(msg, "To"),
+        "date": get_date_str(msg),
+        "timestamp": get_timestamp(msg),
+        "subject": get_header(msg, "Subject"),
+        "body": load_body(path, msg) if body else None,
+    }
+
+
+def load_body(path: Path, msg: email.message.Message | None = None) -> str:
+    """Body-Text einer .eml-Datei (Datei wird neu geparst, wenn msg fehlt)."""
+    msg = msg if msg is not None else parse_eml(path)
+    if msg is None:
+        return ""
+    try:
+        return get_body_text(msg)
+    except Exception:
+        return ""
+
+
+def _load_headers(path: Path) -> dict | None:
+    return load_email(path, body=False)
+
+
+def _map_files(fn, items: list, workers: int) -> list:
+    """fn auf items anwenden – ab EMAIL_PARALLEL_MIN_FILES in workers Prozessen, Reihenfolge bleibt."""
+    workers = max(1, min(workers, len(items)))
+    # Große Chunks: pro Datei fällt nur wenig Arbeit an, IPC-Overhead klein halten
+    return list(map_ordered(
+        fn, items, workers,
+        processes=True,
+        min_items=EMAIL_PARALLEL_MIN_FILES,
+        chunk_size=len(items) // (workers * 8),
+        in_flight=2 * workers,
+    ))
+
+
+def load_all_emails(
+    folder: Path,
+    workers: int = EMAIL_PARSE_WORKERS,
+    *,
+    bodies: bool = True,
+    index: EmailIndex | None = None,
+) -> tuple[dict[str, dict], list[tuple[Path, dict]]]:
+    """
+    Lädt alle .eml aus folder – ab EMAIL_PARALLEL_MIN_FILES Dateien in workers Prozessen.
+    Reihenfolge wie bei folder.glob (bei doppelter Message-ID gewinnt die letzte Datei).
+    bodies=False: nur Header (schnell, wenig Speicher); Bodies später per load_bodies.
+    index: optionaler EmailIndex – nur neue/geänderte Dateien (Größe, mtime) werden geparst.
+    Returns: (msg_id -> {path, headers, from, to, date, subject, body}, list of (path, data) ohne Message-ID)
+    """
+    files = list(folder.glob("*.eml"))
+    loader = load_email if bodies else _load_headers
+    if index is None:
+        loaded = _map_files(loader, files, workers)
+    else:
+        stats = {f: f.stat() for f in files}
+        cached = index.lookup(folder, stats)
+        todo = [f for f in files if f not in cached or (bodies and cached[f]["body"] is None)]
+        fresh = dict(zip(todo, _map_files(loader, todo, workers)))
+        index.put_many([(stats[f], data) for f, data in fresh.items() if data is not None])
+        loaded = [fresh[f] if f in fresh else cached[f] for f in files]
     by_id = {}
     no_id = []
-    for f in folder.glob("*.eml"):
-        msg = parse_eml(f)
-        if msg is None:
+    for f, data in zip(files, loaded):
+        if data is None:
             continue
-        mid = normalize_message_id(get_header(msg, "Message-ID"))
-        body = get_body_text(msg)
-        data = {
-            "path": f,
-            "msg": msg,
-            "from": get_header(msg, "From"),
-            "to": get_header(msg, "To"),
-            "date": get_date_str(msg),
-            "subject": get_header(msg, "Subject"),
-            "body": body,
-        }
+        mid = normalize_message_id(data["headers"]["Message-ID"])
         if mid:
             by_id[mid] = data
         else:
@@ -222,15 +468,30 @@ def load_all_emails(folder: Path) -> tuple[dict[str, dict], list[tuple[Path, dic
     return by_id, no_id
 
 
+def load_bodies(records: list[dict], workers: int = EMAIL_PARSE_WORKERS, index: EmailIndex | None = None) -> None:
+    """Fehlende Bodies (header-only geladen) nachladen – nur für die übergebenen Datensätze."""
+    todo = list({id(d): d for d in records if d.get("body") is None}.values())
+    for data, body in zip(todo, _map_files(load_body, [d["path"] for d in todo], workers)):
+        data["body"] = body
+    if index is not None:
+        index.put_bodies([(d["path"], d["body"]) for d in todo])
+
+
 def is_from_reiseteam(data: dict) -> bool:
     return REISETEAM_DOMAIN.lower() in (data.get("from") or "").lower()
 
 
-def main():
+def main(mode: str | None = None):
+    if (mode or EMAIL_PAIRING).strip().lower() == "thread":
+        # Konversationen: derselbe Weg wie in der Pipeline (collect_pairs), Export im paare.txt-Format
+        run_with_paths(POSTEINGANG, POSTAUSGANG, OUTPUT_KNOWLEDGE_THREADS, OUTPUT_REPORT, mode="thread")
+        print(f"Bericht: {OUTPUT_REPORT}")
+        return
+    index = get_email_index(OUTPUT_REPORT.parent)
     print("Lade Posteingang...")
-    inbox_by_id, inbox_no_id = load_all_emails(POSTEINGANG)
+    inbox_by_id, inbox_no_id = load_all_emails(POSTEINGANG, index=index)
     print("Lade Postausgang...")
-    outbox_by_id, outbox_no_id = load_all_emails(POSTAUSGANG)
+    outbox_by_id, outbox_no_id = load_all_emails(POSTAUSGANG, index=index)
 
     # Statistik
     n_inbox = len(inbox_by_id) + len(inbox_no_id)
@@ -243,8 +504,8 @@ def main():
     inbox_matched = set()   # inbox Message-IDs die schon zugeordnet
 
     for mid, out_data in outbox_by_id.items():
-        in_reply = parse_message_ids(get_header(out_data["msg"], "In-Reply-To"))
-        refs = parse_message_ids(get_header(out_data["msg"], "References"))
+        in_reply = parse_message_ids(get_header(out_data["headers"], "In-Reply-To"))
+        refs = parse_message_ids(get_header(out_data["headers"], "References"))
         all_refs = list(dict.fromkeys(in_reply + refs))
         found_inbox = None
         for ref_id in all_refs:
@@ -254,7 +515,7 @@ def main():
         if found_inbox:
             matched_pairs.append((found_inbox, out_data))
             outbox_matched.add(mid)
-            inbox_matched.add(normalize_message_id(get_header(found_inbox["msg"], "Message-ID")))
+            inbox_matched.add(normalize_message_id(get_header(found_inbox["headers"], "Message-ID")))
 
     # Auch: Posteingang-Mails die auf andere Posteingang-Mails antworten (Kunde antwortet) – optional
     # Wir fokussieren auf: Kunde fragt (Posteingang) -> Reiseteam antwortet (Postausgang)
@@ -361,6 +622,10 @@ if __name__ == "__main__":
     p.add_argument("--postausgang", type=Path, help="Ordner mit ausgehenden .eml")
     p.add_argument("--output-dir", type=Path, help="Ordner für paare.txt und Bericht")
     p.add_argument("--support-domain", type=str, default="", help="E-Mail-Domain des Supports (z.B. unyflygroup.com)")
+    p.add_argument(
+        "--pairing", choices=("pair", "thread"), default=None,
+        help="pair = Kundenmail + Antwort, thread = ganze Konversation (Standard: EMAIL_PAIRING)",
+    )
     args = p.parse_args()
     if args.output_dir and args.posteingang and args.postausgang:
         run_with_paths(
@@ -369,6 +634,7 @@ if __name__ == "__main__":
             args.output_dir / "paare.txt",
             args.output_dir / "Analyse_Bericht.txt",
             support_domain=args.support_domain or None,
+            mode=args.pairing,
         )
     else:
-        main()
+        main(args.pairing)
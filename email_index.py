@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Persistenter Index für email_analyse: geparste Header-Felder (und, sobald dekodiert, Body-Text)
+pro .eml-Datei in SQLite. Schlüssel: absoluter Pfad; gültig, solange Größe und mtime stimmen.
+
+Wiederholte Läufe über dasselbe Postfach parsen nur neue oder geänderte Dateien; alles andere
+kommt aus dem Index.
+
+Datenschutz: Der Index enthält vollständige Kunden-Mails (Header und Body) im Klartext. Er liegt
+deshalb standardmäßig neben der Ausgabe des Laufs (nicht im aktuellen Arbeitsverzeichnis) und
+wird bei jedem Öffnen bereinigt (prune): Einträge, deren .eml-Datei nicht mehr existiert –
+egal in welchem Ordner –, und Einträge, die länger als EMAIL_INDEX_MAX_AGE_DAYS in keinem Lauf
+mehr vorkamen, werden gelöscht. Wer Postfächer löscht, löscht damit auch ihre Kopie im Index.
+
+Ablage: SQLite (WAL, wie job_store.py / page_cache.py).
+
+Konfiguration per .env:
+  EMAIL_INDEX=1
+  EMAIL_INDEX_PATH=             (leer = <Ausgabeordner>/email_index.sqlite3)
+  EMAIL_INDEX_MAX_AGE_DAYS=30   (0 = nur Einträge gelöschter Dateien entfernen)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+EMAIL_INDEX_NAME = "email_index.sqlite3"
+EMAIL_INDEX_PATH = os.environ.get("EMAIL_INDEX_PATH", "").strip()
+EMAIL_INDEX_MAX_AGE_DAYS = float(os.environ.get("EMAIL_INDEX_MAX_AGE_DAYS", "30"))
+# Erhöhen, wenn sich Header-/Body-Extraktion in email_analyse ändert → alte Einträge ungültig
+INDEX_VERSION = 2
+
+
+class EmailIndex:
+    """Header + Body pro .eml-Datei; eine SQLite-Verbindung pro Thread."""
+
+    def __init__(self, db_path: Path | str, *, timeout: float = 30.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS emails (
+                    path     TEXT PRIMARY KEY,
+                    size     INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    version  INTEGER NOT NULL,
+                    record   TEXT NOT NULL,
+                    body     TEXT,
+                    seen_at  REAL NOT NULL DEFAULT 0
+                )"""
+            )
+            # Indizes aus älteren Versionen: Spalte nachrüsten (0 = beim nächsten prune() abgelaufen)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(emails)")}
+            if "seen_at" not in columns:
+                conn.execute("ALTER TABLE emails ADD COLUMN seen_at REAL NOT NULL DEFAULT 0")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, rows: list[tuple]) -> None:
+        """Viele Zeilen in einer Transaktion schreiben (Autocommit wäre ein Commit pro Zeile)."""
+        if not rows:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(sql, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def lookup(self, folder: Path, stats: dict[Path, os.stat_result]) -> dict[Path, dict]:
+        """
+        Gültige Einträge für die Dateien in stats (Pfad → os.stat) aus folder. Einträge von
+        Dateien, die es in folder nicht mehr gibt, werden gelöscht.
+        Returns: Pfad → Datensatz wie email_analyse.load_email ("body" None, wenn nie dekodiert).
+        """
+        keys = {self._key(p): p for p in stats}
+        folder_key = self._key(folder)
+        prefix = folder_key + os.sep
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT path, size, mtime_ns, version, record, body FROM emails WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix),
+        ).fetchall()
+        found: dict[Path, dict] = {}
+        gone = []
+        for key, size, mtime_ns, version, record, body in rows:
+            path = keys.get(key)
+            if path is None:
+                # Nur direkte Kinder von folder (glob "*.eml"), Unterordner gehören nicht dazu
+                if os.path.dirname(key) == folder_key:
+                    gone.append((key,))
+                continue
+            st = stats[path]
+            if version != INDEX_VERSION or size != st.st_size or mtime_ns != st.st_mtime_ns:
+                continue
+            data = json.loads(record)
+            data["path"] = path
+            data["body"] = body
+            found[path] = data
+        self._write("DELETE FROM emails WHERE path = ?", gone)
+        now = time.time()
+        self._write("UPDATE emails SET seen_at = ? WHERE path = ?", [(now, self._key(p)) for p in found])
+        return found
+
+    def prune(self, max_age_days: float = EMAIL_INDEX_MAX_AGE_DAYS) -> int:
+        """
+        Einträge löschen, deren Datei nicht mehr existiert (alle Ordner, nicht nur der gerade
+        geladene) oder die seit max_age_days in keinem Lauf vorkamen. Returns: Anzahl gelöscht.
+        """
+        conn = self._conn()
+        cutoff = time.time() - max_age_days * 86400 if max_age_days > 0 else None
+        gone = [
+            (key,) for key, seen_at in conn.execute("SELECT path, seen_at FROM emails")
+            if (cutoff is not None and seen_at < cutoff) or not os.path.exists(key)
+        ]
+        self._write("DELETE FROM emails WHERE path = ?", gone)
+        return len(gone)
+
+    def put_many(self, items: list[tuple[os.stat_result, dict]]) -> None:
+        """Neu geparste Datensätze (mit ihrem os.stat) speichern."""
+        rows = []
+        now = time.time()
+        for st, data in items:
+            record = {k: v for k, v in data.items() if k not in ("path", "body")}
+            rows.append((
+                self._key(data["path"]), st.st_size, st.st_mtime_ns, INDEX_VERSION,
+                json.dumps(record, ensure_ascii=False), data.get("body"), now,
+            ))
+        self._write(
+            """INSERT OR REPLACE INTO emails (path, size, mtime_ns, version, record, body, seen_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+
+    def put_bodies(self, items: list[tuple[Path, str]]) -> None:
+        """Nachträglich dekodierte Bodies (load_bodies) zu bestehenden Einträgen speichern."""
+        self._write("UPDATE emails SET body = ? WHERE path = ?", [(body, self._key(path)) for path, body in items])
+
+
+def get_email_index(base_dir: Path | str) -> EmailIndex | None:
+    """
+    Index anhand von EMAIL_INDEX (Standard: an) öffnen und bereinigen (prune).
+    base_dir: Ausgabeordner des Laufs – dort liegt der Index, solange EMAIL_INDEX_PATH leer ist.
+    """
+    if os.environ.get("EMAIL_INDEX", "1") == "0":
+        return None
+    path = os.environ.get("EMAIL_INDEX_PATH", EMAIL_INDEX_PATH).strip()
+    index = EmailIndex(path or Path(base_dir) / EMAIL_INDEX_NAME)
+    index.prune()
+    return index
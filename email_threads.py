@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Thread-Rekonstruktion für email_analyse: ganze Konversationen statt einzelner Paare.
+
+  1. Message-ID-Graph: jede Mail wird per Union-Find mit allen IDs aus In-Reply-To und
+     References verbunden (ein linearer Durchlauf). Referenzierte, aber fehlende Mails
+     verbinden ihre Antworten trotzdem (gemeinsamer Knoten).
+  2. Mails ohne Message-ID: Fallback über den normalisierten Betreff (ohne Re:/AW:/WG:/Fwd: …)
+     innerhalb eines Zeitfensters (EMAIL_THREAD_WINDOW_DAYS) zur zeitlich nächsten Mail.
+
+Ergebnis: Threads als Listen von Mail-Datensätzen (aus load_all_emails), chronologisch sortiert.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import defaultdict
+
+EMAIL_THREAD_WINDOW_DAYS = float(os.environ.get("EMAIL_THREAD_WINDOW_DAYS", "14"))
+# Antwort-/Weiterleitungs-Präfixe (auch mehrfach, z. B. "AW: WG: Re[2]:")
+SUBJECT_PREFIX_RE = re.compile(r"^\s*(?:(?:re|aw|wg|fw|fwd|antw|sv|vs)(?:\[\d+\])?\s*:\s*)+", re.IGNORECASE)
+# Kürzere Betreffs sind zu unspezifisch für den Fallback ("Frage", "Hallo")
+MIN_SUBJECT_CHARS = 8
+
+
+class UnionFind:
+    """Disjunkte Mengen über beliebige hashbare Schlüssel (Pfadhalbierung + Union by Size)."""
+
+    def __init__(self):
+        self.parent: dict = {}
+        self.size: dict = {}
+
+    def find(self, x):
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+def normalize_subject(subject: str) -> str:
+    """Betreff ohne Antwort-Präfixe, klein, Whitespace zusammengefasst."""
+    s = SUBJECT_PREFIX_RE.sub("", subject or "")
+    return re.sub(r"\s+", " ", s).strip().lower()
+
+
+def build_threads(
+    records: list[dict],
+    *,
+    normalize_id,
+    parse_ids,
+    window_days: float = EMAIL_THREAD_WINDOW_DAYS,
+) -> list[list[dict]]:
+    """
+    records: Mail-Datensätze mit "headers" (Message-ID, In-Reply-To, References), "subject"
+      und "timestamp" (Sekunden oder None).
+    normalize_id / parse_ids: Message-ID-Helfer aus email_analyse (eine Quelle für die Normalisierung).
+    Returns: Threads (Listen von Datensätzen), chronologisch sortiert; Reihenfolge der Threads
+      nach ihrer ersten Mail.
+    """
+    uf = UnionFind()
+    with_id: list[tuple[str, dict]] = []
+    without_id: list[dict] = []
+    for data in records:
+        mid = normalize_id(data["headers"].get("Message-ID", ""))
+        if not mid:
+            without_id.append(data)
+            continue
+        node = ("id", mid)
+        uf.find(node)
+        for ref in parse_ids(data["headers"].get("In-Reply-To", "")) + parse_ids(data["headers"].get("References", "")):
+            uf.union(node, ("id", ref))
+        with_id.append((mid, data))
+
+    # Fallback: gleicher normalisierter Betreff, zeitlich nächste Mail im Fenster.
+    # Alle Mails pro Betreff einmal nach Zeit sortieren; die nächste Mail einer Mail ohne ID ist
+    # dann ihr linker oder rechter Nachbar (auch Mails ohne ID untereinander, z. B. ganzer Thread
+    # ohne IDs) – O(n log n) statt Einfügen in sortierte Listen.
+    buckets: dict[str, list[tuple[float, int, tuple]]] = defaultdict(list)
+    for mid, data in with_id:
+        subject = normalize_subject(data.get("subject", ""))
+        if len(subject) >= MIN_SUBJECT_CHARS and data.get("timestamp") is not None:
+            buckets[subject].append((data["timestamp"], 0, ("id", mid)))
+    for k, data in enumerate(without_id):
+        uf.find(("noid", k))
+        subject = normalize_subject(data.get("subject", ""))
+        if len(subject) >= MIN_SUBJECT_CHARS and data.get("timestamp") is not None:
+            buckets[subject].append((data["timestamp"], 1, ("noid", k)))
+    window = window_days * 86400
+    for bucket in buckets.values():
+        bucket.sort()
+        for i, (ts, has_no_id, node) in enumerate(bucket):
+            if not has_no_id:
+                continue
+            near = [bucket[j] for j in (i - 1, i + 1) if 0 <= j < len(bucket)]
+            best = min(near, key=lambda other: abs(other[0] - ts), default=None)
+            if best is not None and abs(best[0] - ts) <= window:
+                uf.union(node, best[2])
+
+    groups: dict = defaultdict(list)
+    for mid, data in with_id:
+        groups[uf.find(("id", mid))].append(data)
+    for k, data in enumerate(without_id):
+        groups[uf.find(("noid", k))].append(data)
+
+    def when(data: dict) -> float:
+        ts = data.get("timestamp")
+        return ts if ts is not None else float("inf")
+
+    threads = [sorted(mails, key=when) for mails in groups.values()]
+    threads.sort(key=lambda t: when(t[0]))
+    return threads
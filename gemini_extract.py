@@ -3,15 +3,40 @@
 Extraktion von Text/Struktur aus Dokument-Bildern (PNG) via Gemini 3 Flash Preview.
 
 Sendet PNG(s) an die Google Gemini API und erhält strukturierten Markdown-Text
-für die weitere Wissensbasis-Verarbeitung.
+für die weitere Wissensbasis-Verarbeitung. Bereits exakter Text (Text-Passthrough aus
+convert_to_png.files_to_segments) geht über extract_from_texts als reiner Text-Call.
+
+Mehrere Calls laufen parallel (GEMINI_CONCURRENCY), gedrosselt über Token-Buckets für
+Requests/Minute (GEMINI_RPM) und geschätzte Input-Tokens/Minute (GEMINI_TPM). Die Buckets
+gelten prozessweit, also auch über parallel laufende Jobs. Ergebnisse kommen in
+Eingabe-Reihenfolge zurück (deterministisches Corpus).
+
+Bild-Batches werden adaptiv gepackt: so viele Seiten pro Call, wie in das Budget aus
+geschätzten Bild-Tokens (GEMINI_BATCH_MAX_TOKENS) und Payload-Bytes (GEMINI_BATCH_MAX_BYTES)
+passen. Lehnt die API einen Batch als zu groß ab, wird er halbiert und erneut gesendet.
+
+PDF-Teildokumente (convert_to_png mit PDF_NATIVE) gehen über extract_from_pdfs direkt als
+application/pdf an Gemini – ohne lokale Rasterung; ein Teil pro Call.
+
+extract_segments verarbeitet den gemischten Segment-Strom aus convert_to_png.iter_segments
+(Bilder, Text, PDF-Teile) in einem Durchlauf: Ergebnisse in Segment-Reihenfolge, sodass ein
+PDF mit Text- und Scanseiten im Corpus in Seitenreihenfolge steht.
+
+Optional Seiten-Cache (page_cache.py): bereits extrahierte Seiten (PNG-Hash + Modell +
+Prompt) werden nicht erneut gesendet; Treffer/Fehltreffer pro Job über stats.
 """
 
 from __future__ import annotations
 
 import base64
+import math
 import os
+import re
+import struct
+import threading
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, NamedTuple
 
 try:
     from google import genai
@@ -19,52 +44,410 @@ try:
 except ImportError:
     genai = types = None
 
+from convert_to_png import Segment
+from ordered_map import map_ordered
+from page_cache import page_key
+
+if TYPE_CHECKING:
+    from page_cache import PageCache
+
 MODEL = "gemini-2.5-flash"
-BATCH_SIZE = 5  # max PNGs pro API-Call (Token-Limit)
-PAUSE_SEC = 1.0
+BATCH_SIZE = 16  # max PNGs pro API-Call (zusätzlich Token-/Byte-Budget, siehe _plan_batches)
+BATCH_MAX_TOKENS = int(os.environ.get("GEMINI_BATCH_MAX_TOKENS", "8000"))  # geschätzte Bild-Tokens pro Call
+BATCH_MAX_BYTES = int(os.environ.get("GEMINI_BATCH_MAX_BYTES", str(15 * 1024**2)))  # Inline-Limit ~20 MB
 MAX_RETRIES = 2
+GEMINI_CONCURRENCY = int(os.environ.get("GEMINI_CONCURRENCY", "4"))  # Calls gleichzeitig
+GEMINI_RPM = float(os.environ.get("GEMINI_RPM", "60"))  # Requests pro Minute
+GEMINI_TPM = float(os.environ.get("GEMINI_TPM", "1000000"))  # Input-Tokens pro Minute (geschätzt)
+# Gemini rechnet Bilder in 768px-Kacheln à 258 Tokens ab; Text grob 4 Zeichen/Token
+IMAGE_TILE_PX = 768
+TOKENS_PER_TILE = 258
+CHARS_PER_TOKEN = 4
+TEXT_BATCH_CHARS = 60_000  # max Zeichen Text pro API-Call (extract_from_texts)
 
 PROMPT = """Extrahiere aus diesem Dokument alle Texte und Strukturen für eine Wissensbasis (RAG).
 Ausgabe: Klares Markdown mit Abschnitten. Nur Fakten, Regeln, Informationen – keine Einleitung, keine Duplikate.
 Bei Tabellen: als lesbare Struktur. Bei Listen: als Bullet-Points."""
 
+# Zusatz bei Seiten-Cache und mehreren Bildern: Ausgabe pro Seite trennbar machen
+PAGE_MARKER_PROMPT = """Es folgen {n} Seiten. Beginne den Abschnitt jeder Seite mit einer eigenen Zeile
+<<<SEITE i>>> (i = 1 bis {n}, in der Reihenfolge der Bilder)."""
+PAGE_MARKER_RE = re.compile(r"^\s*<<<SEITE (\d+)>>>\s*$", re.MULTILINE)
 
-def extract_from_pngs(
-    pngs: list[tuple[str, bytes]],
+
+class TokenBucket:
+    """Thread-sicherer Token-Bucket: rate_per_min Einheiten pro Minute, Kapazität = eine Minute."""
+
+    def __init__(self, rate_per_min: float):
+        self.capacity = max(1.0, rate_per_min)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: float = 1.0) -> None:
+        """Blockiert, bis n Einheiten verfügbar sind (n > Kapazität wird auf Kapazität begrenzt)."""
+        n = min(n, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_request_bucket = TokenBucket(GEMINI_RPM)
+_token_bucket = TokenBucket(GEMINI_TPM)
+
+
+def _png_size(png: bytes) -> tuple[int, int]:
+    """Breite/Höhe aus dem PNG-IHDR-Header (ohne Dekodieren)."""
+    if len(png) >= 24 and png[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", png[16:24])
+    return IMAGE_TILE_PX, IMAGE_TILE_PX
+
+
+def estimate_image_tokens(png: bytes) -> int:
+    w, h = _png_size(png)
+    return TOKENS_PER_TILE * max(1, math.ceil(w / IMAGE_TILE_PX)) * max(1, math.ceil(h / IMAGE_TILE_PX))
+
+
+def estimate_text_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class BatchTooLarge(RuntimeError):
+    """Die API hat den Request als zu groß abgelehnt (Payload oder Token-Limit)."""
+
+
+def _is_too_large(e: Exception) -> bool:
+    if getattr(e, "code", None) == 413:
+        return True
+    msg = str(e).lower()
+    return any(k in msg for k in (
+        "too large", "exceeds the maximum", "payload size", "request size", "input token count",
+    ))
+
+
+class _Ready(NamedTuple):
+    """Fertiges Ergebnis ohne API-Call (Seiten-Cache-Treffer oder Text-Passthrough)."""
+
+    name: str
+    text: str
+
+
+class _PdfPart(NamedTuple):
+    """PDF-Teildokument (PDF_NATIVE): ein Call, ohne lokale Rasterung."""
+
+    name: str
+    data: bytes
+    pages: int
+
+
+class _TextBatch(NamedTuple):
+    """Bereits exakte Texte (name, text) für einen Text-only-Call, zusammen ≤ TEXT_BATCH_CHARS."""
+
+    items: list[tuple[str, str]]
+
+
+# Aufträge, die _plan_batches nicht packt, sondern unverändert durchreicht
+_UNITS = (_Ready, _PdfPart, _TextBatch)
+
+
+def _plan_batches(
+    pngs: Iterable[tuple[str, bytes] | _Ready | _PdfPart | _TextBatch],
     *,
-    model: str | None = None,
-    api_key: str | None = None,
-) -> list[tuple[str, str]]:
+    max_tokens: int = BATCH_MAX_TOKENS,
+    max_bytes: int = BATCH_MAX_BYTES,
+    max_images: int = BATCH_SIZE,
+) -> Iterator[list[tuple[str, bytes]] | _Ready | _PdfPart | _TextBatch]:
     """
-    Sendet PNGs an Gemini 3 Flash Preview, erhält extrahierten Text.
-    Returns: [(source_name, extracted_text), ...]
+    Seiten lazy zu Batches packen, bis Token-, Byte- oder Bildanzahl-Budget erreicht ist.
+    Viele kleine Seiten → wenige Calls; dichte Scans → kleine Batches. Eine einzelne Seite
+    über Budget bekommt einen eigenen Batch. Andere Aufträge (_Ready, _PdfPart, _TextBatch)
+    schließen den laufenden Batch ab und werden unverändert durchgereicht (Reihenfolge bleibt erhalten).
     """
+    batch: list[tuple[str, bytes]] = []
+    tokens = size = 0
+    for item in pngs:
+        if isinstance(item, _UNITS):
+            if batch:
+                yield batch
+                batch, tokens, size = [], 0, 0
+            yield item
+            continue
+        name, png = item
+        t, b = estimate_image_tokens(png), len(png)
+        if batch and (tokens + t > max_tokens or size + b > max_bytes or len(batch) >= max_images):
+            yield batch
+            batch, tokens, size = [], 0, 0
+        batch.append((name, png))
+        tokens += t
+        size += b
+    if batch:
+        yield batch
+
+
+def _map_ordered(fn: Callable, items: Iterable, concurrency: int = GEMINI_CONCURRENCY) -> Iterator:
+    """fn parallel auf items anwenden (Thread-Pool), Ergebnisse in Eingabe-Reihenfolge (ordered_map)."""
+    return map_ordered(fn, items, max(1, concurrency), thread_name_prefix="gemini")
+
+
+def _client(api_key: str | None, model: str | None):
     if not genai or not types:
         raise RuntimeError("google-genai nicht installiert: pip install google-genai")
     api_key = api_key or os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise RuntimeError("GEMINI_API_KEY fehlt (z. B. in .env)")
-    model = model or os.environ.get("GEMINI_MODEL", MODEL)
-    client = genai.Client(api_key=api_key)
-    results = []
-    for i in range(0, len(pngs), BATCH_SIZE):
-        batch = pngs[i : i + BATCH_SIZE]
+    return genai.Client(api_key=api_key), model or os.environ.get("GEMINI_MODEL", MODEL)
+
+
+def _generate(client, model: str, contents: list, est_tokens: int = 0) -> str:
+    """Ein generate_content-Call mit Retries und Rate-Limit. Returns: Antworttext (ggf. leer)."""
+    for attempt in range(MAX_RETRIES + 1):
+        _request_bucket.acquire()
+        _token_bucket.acquire(est_tokens)
+        try:
+            r = client.models.generate_content(model=model, contents=contents)
+            return (r.text or "").strip()
+        except Exception as e:
+            # Zu große Requests: Wiederholen hilft nicht, der Aufrufer teilt den Batch
+            if _is_too_large(e):
+                raise BatchTooLarge(f"Gemini: Request zu groß: {e}") from e
+            if attempt < MAX_RETRIES:
+                time.sleep(3)
+                continue
+            raise RuntimeError(f"Gemini API Fehler: {e}") from e
+    return ""
+
+
+def _split_pages(text: str, n: int) -> list[str] | None:
+    """Antwort mit <<<SEITE i>>>-Markern in n Seitentexte teilen; None, wenn die Marker nicht passen."""
+    parts = PAGE_MARKER_RE.split(text)
+    # parts = [vor_erstem_marker, "1", text1, "2", text2, ...]
+    numbers = [int(x) for x in parts[1::2]]
+    if numbers != list(range(1, n + 1)):
+        return None
+    return [t.strip() for t in parts[2::2]]
+
+
+class _Extraction:
+    """
+    Zustand eines Extraktionslaufs: Gemini-Client (erst beim ersten echten Call), Modell,
+    Seiten-Cache und Treffer-Zähler. call() führt einen Auftrag aus und läuft im Thread-Pool.
+    """
+
+    def __init__(self, model: str | None, api_key: str | None, cache: PageCache | None, stats: dict | None):
+        self.client = None
+        self.api_key = api_key
+        self.model = model or os.environ.get("GEMINI_MODEL", MODEL)
+        self.cache = cache
+        self.counts = stats if stats is not None else {}
+        self.counts.setdefault("hits", 0)
+        self.counts.setdefault("misses", 0)
+
+    def connect(self) -> None:
+        """Client anlegen (im lesenden Thread, bevor der erste echte Auftrag in den Pool geht)."""
+        if self.client is None:
+            self.client, self.model = _client(self.api_key, self.model)
+
+    def lookup(self, data: bytes) -> str | None:
+        """Seiten-Cache für Bild- bzw. PDF-Bytes; zählt Treffer/Fehltreffer."""
+        if self.cache is None:
+            return None
+        hit = self.cache.get(page_key(data, self.model, PROMPT))
+        self.counts["hits" if hit is not None else "misses"] += 1
+        return hit
+
+    def units(self, segments: Iterable[Segment], text_mode: str = "corpus") -> Iterator:
+        """
+        Segmente (convert_to_png.Segment) → Aufträge für _plan_batches, in Segment-Reihenfolge.
+        Text: "corpus" = unverändert ins Ergebnis, "llm" = aufeinanderfolgende Texte zu
+        Text-Calls ≤ TEXT_BATCH_CHARS gebündelt.
+        """
+        texts: list[tuple[str, str]] = []
+        size = 0
+        for seg in segments:
+            if seg.text is not None and text_mode == "llm":
+                # Lange Texte in Stücke ≤ TEXT_BATCH_CHARS teilen
+                for j in range(0, len(seg.text), TEXT_BATCH_CHARS):
+                    piece = seg.text[j : j + TEXT_BATCH_CHARS]
+                    if texts and size + len(piece) > TEXT_BATCH_CHARS:
+                        yield _TextBatch(texts)
+                        texts, size = [], 0
+                    texts.append((seg.label, piece))
+                    size += len(piece)
+                continue
+            if texts:
+                yield _TextBatch(texts)
+                texts, size = [], 0
+            if seg.png is not None:
+                hit = self.lookup(seg.png)
+                yield _Ready(seg.label, hit) if hit is not None else (seg.label, seg.png)
+            elif seg.text is not None:
+                yield _Ready(seg.label, seg.text)
+            elif seg.pdf is not None:
+                hit = self.lookup(seg.pdf)
+                yield _Ready(seg.label, hit) if hit is not None else _PdfPart(seg.label, seg.pdf, seg.pages)
+        if texts:
+            yield _TextBatch(texts)
+
+    def run(self, items: Iterable) -> list[tuple[str, str]]:
+        """Aufträge packen, parallel ausführen; Ergebnisse (ohne leere) in Eingabe-Reihenfolge."""
+
+        def work():
+            for unit in _plan_batches(items):
+                if not isinstance(unit, _Ready):
+                    self.connect()
+                yield unit
+
+        return [(source, text) for part in _map_ordered(self.call, work()) for source, text in part if text]
+
+    def call(self, unit) -> list[tuple[str, str]]:
+        if isinstance(unit, _Ready):
+            return [(unit.name, unit.text)]
+        if isinstance(unit, _PdfPart):
+            text = self.pdf(unit.name, unit.data, unit.pages)
+            if self.cache is not None and text:
+                self.cache.put(page_key(unit.data, self.model, PROMPT), text)
+            return [(unit.name, text)]
+        if isinstance(unit, _TextBatch):
+            return [self.texts(unit.items)]
+        return self.pngs(unit)
+
+    def pngs(self, batch: list[tuple[str, bytes]]) -> list[tuple[str, str]]:
         contents = []
         for name, png_bytes in batch:
             contents.append(types.Part.from_bytes(data=png_bytes, mime_type="image/png"))
-        contents.append(f"[Quelle(n): {', '.join(n for n, _ in batch)}]\n\n{PROMPT}")
-        for attempt in range(MAX_RETRIES + 1):
-            try:
-                r = client.models.generate_content(model=model, contents=contents)
-                text = (r.text or "").strip()
-                if text:
-                    source = " | ".join(n for n, _ in batch)
-                    results.append((source, text))
-                break
-            except Exception as e:
-                if attempt < MAX_RETRIES:
-                    time.sleep(3)
-                    continue
-                raise RuntimeError(f"Gemini API Fehler: {e}") from e
-        time.sleep(PAUSE_SEC)
-    return results
+        prompt = f"[Quelle(n): {', '.join(n for n, _ in batch)}]\n\n{PROMPT}"
+        if self.cache is not None and len(batch) > 1:
+            prompt += "\n\n" + PAGE_MARKER_PROMPT.format(n=len(batch))
+        contents.append(prompt)
+        est = sum(estimate_image_tokens(p) for _, p in batch) + estimate_text_tokens(prompt)
+        try:
+            text = _generate(self.client, self.model, contents, est)
+        except BatchTooLarge:
+            if len(batch) == 1:
+                raise
+            # Halbieren und beide Hälften nacheinander senden (Reihenfolge bleibt erhalten)
+            mid = len(batch) // 2
+            return self.pngs(batch[:mid]) + self.pngs(batch[mid:])
+        if self.cache is None:
+            return [(" | ".join(n for n, _ in batch), text)]
+        pages = [text] if len(batch) == 1 else _split_pages(text, len(batch))
+        if pages is None:
+            # Marker fehlen → Ergebnis als Ganzes nutzen, aber nicht pro Seite cachen
+            return [(" | ".join(n for n, _ in batch), PAGE_MARKER_RE.sub("", text).strip())]
+        for (_, png_bytes), page_text in zip(batch, pages):
+            self.cache.put(page_key(png_bytes, self.model, PROMPT), page_text)
+        return [(name, page_text) for (name, _), page_text in zip(batch, pages)]
+
+    def pdf(self, name: str, data: bytes, n_pages: int) -> str:
+        prompt = f"[Quelle(n): {name}]\n\n{PROMPT}"
+        contents = [types.Part.from_bytes(data=data, mime_type="application/pdf"), prompt]
+        try:
+            est = TOKENS_PER_TILE * n_pages + estimate_text_tokens(prompt)
+            return _generate(self.client, self.model, contents, est)
+        except BatchTooLarge:
+            from convert_to_png import split_pdf
+
+            halves = split_pdf(data) if n_pages > 1 else None
+            if halves is None:
+                raise
+            first, second = halves
+            half = n_pages // 2
+            return (self.pdf(name, first, half) + "\n\n" + self.pdf(name, second, n_pages - half)).strip()
+
+    def texts(self, batch: list[tuple[str, str]]) -> tuple[str, str]:
+        docs = "\n\n".join(f"=== Dokument: {n} ===\n{t}" for n, t in batch)
+        prompt = f"[Quelle(n): {', '.join(n for n, _ in batch)}]\n\n{PROMPT}\n\n{docs}"
+        text = _generate(self.client, self.model, [prompt], estimate_text_tokens(prompt))
+        return " | ".join(dict.fromkeys(n for n, _ in batch)), text
+
+
+def extract_segments(
+    segments: Iterable[Segment],
+    *,
+    text_mode: str = "corpus",
+    model: str | None = None,
+    api_key: str | None = None,
+    cache: PageCache | None = None,
+    stats: dict | None = None,
+) -> list[tuple[str, str]]:
+    """
+    Segmente aus convert_to_png.iter_segments (Bild, Text oder PDF-Teil) in einem geordneten
+    Strom extrahieren: aufeinanderfolgende Bilder werden gepackt wie bei extract_from_pngs,
+    PDF-Teile gehen einzeln als application/pdf, Text je nach text_mode direkt ins Ergebnis
+    ("corpus") oder gebündelt als Text-Call ("llm"). Alle Aufträge teilen sich einen Pool;
+    segments wird lazy gelesen (höchstens GEMINI_CONCURRENCY Aufträge im Speicher).
+    cache/stats: wie bei extract_from_pngs (Bilder und PDF-Teile).
+    Returns: [(source_name, extracted_text), ...] in Segment-Reihenfolge
+    """
+    run = _Extraction(model, api_key, cache, stats)
+    return run.run(run.units(segments, text_mode))
+
+
+def extract_from_pngs(
+    pngs: Iterable[tuple[str, bytes]],
+    *,
+    model: str | None = None,
+    api_key: str | None = None,
+    cache: PageCache | None = None,
+    stats: dict | None = None,
+) -> list[tuple[str, str]]:
+    """
+    Sendet PNGs an Gemini 3 Flash Preview, erhält extrahierten Text.
+    pngs darf ein Generator sein (z. B. convert_to_png.iter_pngs): es wird batchweise
+    gelesen (Batches per Token-/Byte-Budget, siehe _plan_batches), im Speicher liegen
+    höchstens GEMINI_CONCURRENCY Batches gleichzeitig.
+    cache: optionaler Seiten-Cache (page_cache.PageCache). Treffer kosten keinen API-Call;
+      bei mehreren Seiten pro Call wird die Antwort per <<<SEITE i>>> pro Seite getrennt.
+    stats: optionales Dict, wird mit {"hits": n, "misses": m} des Seiten-Caches befüllt.
+    Returns: [(source_name, extracted_text), ...]
+    """
+    return extract_segments(
+        (Segment(name, png=png) for name, png in pngs),
+        model=model, api_key=api_key, cache=cache, stats=stats,
+    )
+
+
+def extract_from_texts(
+    texts: list[tuple[str, str]],
+    *,
+    model: str | None = None,
+    api_key: str | None = None,
+) -> list[tuple[str, str]]:
+    """
+    Strukturiert bereits exakten Text (ohne Bild-Tokens) mit demselben PROMPT.
+    Kurze Texte werden bis TEXT_BATCH_CHARS pro Call gebündelt, lange Texte gestückelt.
+    Returns: [(source_name, extracted_text), ...]
+    """
+    run = _Extraction(model, api_key, None, None)
+    run.connect()
+    return run.run(run.units((Segment(name, text=text) for name, text in texts), "llm"))
+
+
+def extract_from_pdfs(
+    pdfs: Iterable[tuple[str, bytes, int]],
+    *,
+    model: str | None = None,
+    api_key: str | None = None,
+    cache: PageCache | None = None,
+    stats: dict | None = None,
+) -> list[tuple[str, str]]:
+    """
+    Sendet PDF-Teildokumente (name, pdf_bytes, seitenzahl) direkt als application/pdf an Gemini,
+    ein Teil pro Call (Seitenbereiche schneidet convert_to_png, PDF_NATIVE_PAGES/_MAX_BYTES).
+    Lehnt die API einen Teil als zu groß ab, wird er halbiert. Gemini rechnet pro PDF-Seite
+    wie mit einem Bild (TOKENS_PER_TILE).
+    cache/stats: wie bei extract_from_pngs, Schlüssel über die Bytes des Teildokuments.
+    Returns: [(source_name, extracted_text), ...]
+    """
+    return extract_segments(
+        (Segment(name, pdf=data, pages=n) for name, data, n in pdfs),
+        model=model, api_key=api_key, cache=cache, stats=stats,
+    )
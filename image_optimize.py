@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Kompakte Seitenbilder für Gemini: weiße Ränder abschneiden, Graustufen bzw. Palette statt
+RGB, PNG-Kompression einstellbar, optional auf eine maximale Kantenlänge verkleinern.
+
+Dokumente sind fast immer schwarz auf weiß – volle RGB-PNGs mit breiten Rändern kosten
+Upload-Bytes und (über die Bildgröße) Bild-Tokens, ohne dass Gemini mehr lesen kann.
+convert_to_png wendet optimize_image auf gerenderte PDF-Seiten, Text-PNGs und Bilder an.
+
+  - Zuschnitt: Begrenzungsrahmen aller Pixel dunkler als IMAGE_CROP_THRESHOLD, plus Rand
+  - Farbe: nahezu graue Bilder → IMAGE_GRAY_LEVELS Graustufen (16 → 4-Bit-PNG, Kantenglättung
+    der Schrift bleibt erhalten); farbige → Palette mit IMAGE_PALETTE_COLORS Farben
+    (bei <= 256 Farben verlustfrei). 0 = volle 8 Bit Grau bzw. RGB (z. B. für Fotos)
+  - Verkleinern: nur wenn IMAGE_MAX_EDGE > 0 (Standard aus, Lesbarkeit kleiner Schrift)
+  - Kein Gewinn: ein vorhandenes PNG, das dabei nicht kleiner wird, bleibt unverändert
+
+Konfiguration per .env:
+  IMAGE_OPTIMIZE=1
+  IMAGE_MAX_EDGE=0
+  IMAGE_GRAY_LEVELS=16
+  IMAGE_PALETTE_COLORS=256
+  IMAGE_PNG_COMPRESS_LEVEL=9
+
+Benchmark (Bytes, geschätzte Bild-Tokens, Laufzeit; mit --extract auch Textvergleich via Gemini):
+  python image_optimize.py [--extract] <datei> [datei2 ...]
+"""
+
+from __future__ import annotations
+
+import io
+import os
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:
+    Image = ImageChops = None
+
+IMAGE_OPTIMIZE = os.environ.get("IMAGE_OPTIMIZE", "1") != "0"
+IMAGE_MAX_EDGE = int(os.environ.get("IMAGE_MAX_EDGE", "0"))
+IMAGE_GRAY_LEVELS = int(os.environ.get("IMAGE_GRAY_LEVELS", "16"))
+IMAGE_PALETTE_COLORS = int(os.environ.get("IMAGE_PALETTE_COLORS", "256"))
+IMAGE_PNG_COMPRESS_LEVEL = int(os.environ.get("IMAGE_PNG_COMPRESS_LEVEL", "9"))
+# Pixel dunkler als dieser Grauwert zählen als Inhalt (JPEG-Rauschen auf Weiß liegt darüber)
+IMAGE_CROP_THRESHOLD = 235
+# Rand um den Inhalt nach dem Zuschnitt (px)
+IMAGE_CROP_PADDING = 16
+# Max. Abweichung zwischen Farbkanälen, bis zu der ein Bild als grau gilt
+GRAY_TOLERANCE = 24
+
+
+def _flatten(im: "Image.Image") -> "Image.Image":
+    """Transparenz auf Weiß legen, exotische Modi nach RGB bzw. L bringen."""
+    if im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info):
+        rgba = im.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    if im.mode in ("1", "L", "RGB"):
+        return im
+    return im.convert("RGB")
+
+
+def _is_gray(im: "Image.Image") -> bool:
+    r, g, b = im.split()
+    spread = max(
+        ImageChops.difference(r, g).getextrema()[1],
+        ImageChops.difference(g, b).getextrema()[1],
+        ImageChops.difference(r, b).getextrema()[1],
+    )
+    return spread <= GRAY_TOLERANCE
+
+
+def _crop(im: "Image.Image", gray: "Image.Image") -> "Image.Image":
+    content = gray.point(lambda p: 255 if p < IMAGE_CROP_THRESHOLD else 0).getbbox()
+    if content is None:
+        return im  # leere Seite: unverändert lassen
+    left, top, right, bottom = content
+    box = (
+        max(0, left - IMAGE_CROP_PADDING),
+        max(0, top - IMAGE_CROP_PADDING),
+        min(im.width, right + IMAGE_CROP_PADDING),
+        min(im.height, bottom + IMAGE_CROP_PADDING),
+    )
+    return im.crop(box) if box != (0, 0, im.width, im.height) else im
+
+
+def optimize_image(im: "Image.Image", *, max_edge: int = IMAGE_MAX_EDGE,
+                   compress_level: int = IMAGE_PNG_COMPRESS_LEVEL, original: bytes | None = None) -> bytes:
+    """
+    PIL-Bild → kompakte PNG-Bytes (Zuschnitt, Graustufen/Palette, ggf. verkleinert).
+    original: vorhandene PNG-Bytes des Bildes; werden zurückgegeben, wenn das Ergebnis nicht
+    kleiner ist (schon optimiert, Palette kleiner Bilder teurer als RGB) und nicht verkleinert
+    werden muss.
+    """
+    edge = max(im.size)
+    im = _flatten(im)
+    if im.mode == "1":
+        im = im.convert("L")
+    if im.mode == "RGB" and _is_gray(im):
+        im = im.convert("L")
+    im = _crop(im, im if im.mode == "L" else im.convert("L"))
+    if max_edge and max(im.size) > max_edge:
+        im = im.copy()
+        im.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    # Palette ohne Dithering: Rauschmuster kosten Bytes und stören die Texterkennung
+    colors = IMAGE_GRAY_LEVELS if im.mode == "L" else IMAGE_PALETTE_COLORS
+    if colors:
+        im = im.quantize(min(colors, 256), dither=Image.Dither.NONE)
+    buf = io.BytesIO()
+    im.save(buf, format="PNG", compress_level=compress_level)
+    out = buf.getvalue()
+    if original is not None and len(out) >= len(original) and not (max_edge and edge > max_edge):
+        return original
+    return out
+
+
+def optimize_png(png: bytes, **kwargs) -> bytes:
+    """PNG-Bytes optimieren; bei nicht lesbaren Bildern oder ohne Ersparnis unverändert zurückgeben."""
+    if not Image:
+        return png
+    try:
+        with Image.open(io.BytesIO(png)) as im:
+            im.load()
+            return optimize_image(im, original=png, **kwargs)
+    except Exception:
+        return png
+
+
+def _benchmark(paths: list[str], extract: bool) -> None:
+    import difflib
+    import time
+    from pathlib import Path
+
+    # Rohbilder: convert_to_png ohne Optimierung importieren (liest IMAGE_OPTIMIZE beim Import)
+    os.environ["IMAGE_OPTIMIZE"] = "0"
+    from convert_to_png import file_to_pngs
+    from gemini_extract import estimate_image_tokens, extract_from_pngs
+
+    total_raw = total_opt = tokens_raw = tokens_opt = 0
+    for p in paths:
+        path = Path(p)
+        raw = file_to_pngs(path)
+        if not raw:
+            print(f"{path.name}: keine Seitenbilder")
+            continue
+        t0 = time.perf_counter()
+        opt = [optimize_png(png) for png in raw]
+        elapsed = time.perf_counter() - t0
+        b_raw, b_opt = sum(map(len, raw)), sum(map(len, opt))
+        t_raw = sum(map(estimate_image_tokens, raw))
+        t_opt = sum(map(estimate_image_tokens, opt))
+        total_raw, total_opt = total_raw + b_raw, total_opt + b_opt
+        tokens_raw, tokens_opt = tokens_raw + t_raw, tokens_opt + t_opt
+        print(
+            f"{path.name}: {len(raw)} Bild(er) | {b_raw / 1024:.0f} KB → {b_opt / 1024:.0f} KB "
+            f"({100 * (1 - b_opt / b_raw):.0f} % gespart) | ~{t_raw} → ~{t_opt} Bild-Tokens "
+            f"| {1000 * elapsed / len(raw):.0f} ms/Bild"
+        )
+        if extract:
+            names = [f"{path.name} ({i + 1})" for i in range(len(raw))]
+            text_raw = "\n".join(t for _, t in extract_from_pngs(list(zip(names, raw))))
+            text_opt = "\n".join(t for _, t in extract_from_pngs(list(zip(names, opt))))
+            ratio = difflib.SequenceMatcher(None, text_raw, text_opt, autojunk=False).ratio()
+            print(f"  Extraktion: {len(text_raw)} vs. {len(text_opt)} Zeichen, Ähnlichkeit {ratio:.3f}")
+    if total_raw:
+        print(
+            f"Gesamt: {total_raw / 1024:.0f} KB → {total_opt / 1024:.0f} KB "
+            f"({100 * (1 - total_opt / total_raw):.0f} % gespart), ~{tokens_raw} → ~{tokens_opt} Bild-Tokens"
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = [a for a in sys.argv[1:] if a != "--extract"]
+    if not args:
+        print("Verwendung: python image_optimize.py [--extract] <datei> [datei2 ...]")
+        print("  Vergleicht Roh- und optimierte Seitenbilder (Bytes, Bild-Tokens, mit --extract Gemini-Text).")
+        sys.exit(0)
+    _benchmark(args, extract="--extract" in sys.argv[1:])
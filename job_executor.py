@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Begrenzter Job-Executor für die API (ersetzt FastAPI BackgroundTasks).
+
+  - Höchstens JOB_CONCURRENCY Pipelines laufen gleichzeitig (eigener Thread-Pool),
+    weitere Jobs warten FIFO in der Queue (Status "pending", Position im Job-Store).
+  - CPU-lastige Stufen (PDF-Seitenbereiche aus convert_to_png) laufen in einem gemeinsamen
+    Prozess-Pool mit CPU_WORKERS Prozessen – kein GIL-Konflikt mit Event-Loop und anderen Jobs,
+    und die CPU-Last aller Jobs zusammen bleibt bei CPU_WORKERS.
+
+Konfiguration per .env:
+  JOB_CONCURRENCY=2
+  CPU_WORKERS=<Anzahl CPUs>
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "2"))
+CPU_WORKERS = int(os.environ.get("CPU_WORKERS", str(os.cpu_count() or 1)))
+
+
+class JobExecutor:
+    """Thread-Pool mit fester Größe für Jobs + lazy Prozess-Pool für CPU-Stufen."""
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY, cpu_workers: int = CPU_WORKERS):
+        self.concurrency = max(1, concurrency)
+        self.cpu_workers = max(1, cpu_workers)
+        # ThreadPoolExecutor arbeitet seine interne Queue FIFO ab
+        self._jobs = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job")
+        self._cpu_pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def cpu_pool(self) -> ProcessPoolExecutor:
+        """Prozess-Pool erst bei Bedarf starten (nicht schon beim Import in jedem Worker)."""
+        with self._lock:
+            if self._cpu_pool is None:
+                self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+            return self._cpu_pool
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Job einreihen; läuft, sobald einer der JOB_CONCURRENCY Slots frei ist."""
+        return self._jobs.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._jobs.shutdown(wait=wait)
+        with self._lock:
+            if self._cpu_pool is not None:
+                self._cpu_pool.shutdown(wait=wait)
+                self._cpu_pool = None
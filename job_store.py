@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Job-Store für die API (app.py): Status, Fehler, Ergebnis-Pfad und Fortschritt pro job_id.
+
+Backends:
+  - "sqlite" (Standard): eingebettete SQLite-DB im WAL-Modus. Mehrere uvicorn-Worker
+    (--workers N) auf derselben Maschine teilen sich die Datei; Jobs überleben Neustarts.
+    Jeder Job merkt sich den Prozess, der ihn eingereiht hat (owner_pid). Jobs, deren Prozess
+    nicht mehr läuft, werden beim Start als "failed" markiert – ihre Queue lag im Speicher
+    des alten Prozesses und wird nie mehr abgearbeitet.
+  - "memory": Dict im Prozess (nur für lokale Tests / Einzelprozess).
+
+Konfiguration per .env:
+  JOB_STORE=sqlite|memory
+  JOB_DB_PATH=./jobs.sqlite3
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+JOB_DB_PATH = Path(os.environ.get("JOB_DB_PATH", "jobs.sqlite3"))
+# Felder, die per update() gesetzt werden dürfen (Spaltennamen der Tabelle)
+JOB_FIELDS = ("status", "error", "result_path", "progress", "file_urls")
+# Fehlertext für Jobs, deren Prozess beendet wurde, bevor sie fertig waren
+RESTART_ERROR = "Abgebrochen: Server wurde neu gestartet, Job bitte erneut anlegen"
+
+
+def _with_stage(progress: dict | None, stage: str, info: dict) -> dict:
+    """Neuer Fortschritt: Kennzahlen übernehmen, Stufe setzen und mit Zeitstempel anhängen."""
+    progress = dict(progress or {})
+    progress.update(info)
+    progress["stage"] = stage
+    progress["stages"] = [*progress.get("stages", []), {"stage": stage, "at": time.time()}]
+    return progress
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore(ABC):
+    """Schnittstelle: get/create/update per job_id. Werte sind einfache Dicts."""
+
+    @abstractmethod
+    def create(self, job_id: str, **fields) -> dict:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        ...
+
+    @abstractmethod
+    def queue_position(self, job_id: str) -> int | None:
+        """
+        1-basierte Position in der FIFO-Queue des Prozesses, der den Job eingereiht hat
+        (Jobs mit Status "pending"), sonst None.
+        """
+
+    @abstractmethod
+    def set_stage(self, job_id: str, stage: str, **info) -> None:
+        """Fortschritt: aktuelle Pipeline-Stufe mit Zeitstempel eintragen (+ optionale Kennzahlen).
+        Atomar – parallele Aufrufe für denselben Job dürfen keine Stufe verlieren."""
+
+
+class MemoryJobStore(JobStore):
+    """Jobs nur im Prozess-Speicher (geht bei Neustart verloren, nicht worker-übergreifend)."""
+
+    def __init__(self):
+        self._jobs: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, **fields) -> dict:
+        now = time.time()
+        job = {"job_id": job_id, "status": "pending", "created_at": now, "updated_at": now, **fields}
+        with self._lock:
+            self._jobs[job_id] = job
+        return dict(job)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updated_at=time.time())
+
+    def set_stage(self, job_id: str, stage: str, **info) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(progress=_with_stage(job.get("progress"), stage, info), updated_at=time.time())
+
+    def queue_position(self, job_id: str) -> int | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != "pending":
+                return None
+            return 1 + sum(
+                1 for j in self._jobs.values()
+                if j["status"] == "pending" and j["created_at"] < job["created_at"]
+            )
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Jobs in SQLite (WAL): Lesen parallel zu Schreiben, Lookup per PRIMARY KEY (job_id).
+    Eine Verbindung pro Thread, da sqlite3-Verbindungen nicht thread-sicher geteilt werden.
+    """
+
+    def __init__(self, db_path: Path | str = JOB_DB_PATH, *, timeout: float = 30.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    job_id      TEXT PRIMARY KEY,
+                    status      TEXT NOT NULL,
+                    error       TEXT,
+                    result_path TEXT,
+                    progress    TEXT,
+                    file_urls   TEXT,
+                    created_at  REAL NOT NULL,
+                    updated_at  REAL NOT NULL,
+                    owner_pid   INTEGER
+                )"""
+            )
+            # DBs aus älteren Versionen: Spalte nachrüsten
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner_pid" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner_pid INTEGER")
+            # Queue-Position: wartende Jobs desselben Prozesses nach Eingang zählen
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_owner_status_created ON jobs (owner_pid, status, created_at)"
+            )
+        self.recover_orphans()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode(fields: dict) -> dict:
+        out = {}
+        for k, v in fields.items():
+            if k not in JOB_FIELDS:
+                raise ValueError(f"Unbekanntes Job-Feld: {k}")
+            out[k] = json.dumps(v, ensure_ascii=False) if k in ("progress", "file_urls") and v is not None else v
+        return out
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        for k in ("progress", "file_urls"):
+            if job.get(k):
+                job[k] = json.loads(job[k])
+        return {k: v for k, v in job.items() if v is not None}
+
+    def recover_orphans(self) -> int:
+        """
+        Offene Jobs (pending/processing) beendeter Prozesse als "failed" markieren; Anzahl zurück.
+        Die eigene PID zählt als beendet: Beim Start hat dieser Prozess noch keine Jobs angelegt,
+        Zeilen mit derselben PID stammen von einem Vorgänger (z. B. Container-Neustart mit PID 1).
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT owner_pid FROM jobs WHERE status IN ('pending', 'processing')"
+            ).fetchall()
+            dead = [
+                pid for (pid,) in rows
+                if pid is None or pid == os.getpid() or not _pid_alive(pid)
+            ]
+            changed = 0
+            for pid in dead:
+                changed += conn.execute(
+                    """UPDATE jobs SET status = 'failed', error = ?, updated_at = ?
+                       WHERE status IN ('pending', 'processing') AND owner_pid IS ?""",
+                    (RESTART_ERROR, time.time(), pid),
+                ).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return changed
+
+    def create(self, job_id: str, **fields) -> dict:
+        now = time.time()
+        values = {"status": "pending", **self._encode(fields)}
+        cols = ["job_id", *values.keys(), "created_at", "updated_at", "owner_pid"]
+        params = [job_id, *values.values(), now, now, os.getpid()]
+        self._conn().execute(
+            f"INSERT INTO jobs ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+            params,
+        )
+        return self.get(job_id) or {}
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._conn().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def update(self, job_id: str, **fields) -> None:
+        if not fields:
+            return
+        values = self._encode(fields)
+        assignments = ", ".join(f"{k} = ?" for k in values)
+        self._conn().execute(
+            f"UPDATE jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+            [*values.values(), time.time(), job_id],
+        )
+
+    def set_stage(self, job_id: str, stage: str, **info) -> None:
+        # Lesen und Schreiben in einer Schreibtransaktion: kein anderer Thread/Worker dazwischen
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT progress FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is not None:
+                progress = json.loads(row["progress"]) if row["progress"] else None
+                conn.execute(
+                    "UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ?",
+                    (json.dumps(_with_stage(progress, stage, info), ensure_ascii=False), time.time(), job_id),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def queue_position(self, job_id: str) -> int | None:
+        # Jeder uvicorn-Worker hat seine eigene Queue: nur Jobs desselben Prozesses stehen davor
+        row = self._conn().execute(
+            """SELECT COUNT(*) FROM jobs AS w, jobs AS j
+               WHERE j.job_id = ? AND j.status = 'pending'
+                 AND w.owner_pid IS j.owner_pid
+                 AND w.status = 'pending' AND w.created_at <= j.created_at""",
+            (job_id,),
+        ).fetchone()
+        return row[0] or None
+
+
+def get_job_store(kind: str | None = None) -> JobStore:
+    """Store anhand von JOB_STORE (Standard: sqlite) erzeugen."""
+    kind = (kind or os.environ.get("JOB_STORE", "sqlite")).strip().lower()
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind == "sqlite":
+        return SQLiteJobStore(os.environ.get("JOB_DB_PATH", JOB_DB_PATH))
+    raise ValueError(f"Unbekannter JOB_STORE: {kind} (erlaubt: sqlite, memory)")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Aho–Corasick-Automat für Themen-Keywords (wissen_analyse_ki.themen_zuordnung).
+
+Statt für jedes Thema jedes Keyword per `in` im Text zu suchen (Themen × Keywords × Textlänge),
+wird aus allen Keywords einmal ein Automat gebaut; ein Text wird dann in einem Durchlauf
+gelesen und liefert alle Treffer pro Thema – auch überlappende und ineinander enthaltene
+Keywords ("reiserücktritt" zählt zusätzlich für "rücktritt"). Laufzeit linear in der
+Textlänge, unabhängig von der Zahl der Keywords.
+
+Vergleich erfolgt auf Kleinbuchstaben (Keywords und Text), wie bisher bei `kw.lower() in text`.
+
+Gezählt werden alle Vorkommen, auch überlappende ("aa" in "aaaa" → 3).
+
+Der Automat läuft in Python (ein Dict-Lookup pro Zeichen, ~0,8 ms für 5 000 Zeichen). Bei wenigen
+Keywords ist die Suche pro Keyword in C schneller; unterhalb von AUTOMATON_MIN_KEYWORDS wird
+deshalb so gezählt – `str.count`, bzw. `str.find` ab jeder Trefferposition + 1 für Keywords, die
+mit sich selbst überlappen können ("rechtssicher", "online-reisebüro"). Beide Wege liefern
+dieselben Zahlen. Die Themen in wissen_analyse_ki (82 Keywords) liegen unter der Schwelle und
+laufen über diesen Weg; der Automat greift erst bei größeren Keyword-Listen.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+
+# Ab so vielen Keywords scannt der Automat (gemessen: Gleichstand bei ~170 Keywords, 5 000 Zeichen)
+AUTOMATON_MIN_KEYWORDS = 160
+
+
+def _has_border(kw: str) -> bool:
+    return any(kw[:k] == kw[-k:] for k in range(1, len(kw)))
+
+
+def _count_overlapping(text: str, kw: str) -> int:
+    """Alle Vorkommen von kw in text, auch überlappende."""
+    n = 0
+    i = text.find(kw)
+    while i >= 0:
+        n += 1
+        i = text.find(kw, i + 1)
+    return n
+
+
+class KeywordAutomaton:
+    """
+    Aus {gruppe: [keywords]} gebaut; counts(text) → {gruppe: Anzahl Treffer}.
+    Übergänge sind vollständig vorberechnet (DFA): pro Zeichen genau ein Dict-Lookup,
+    kein Zurückfallen über Fehlerlinks während der Suche.
+    """
+
+    def __init__(self, groups: dict[str, list[str]], *, min_keywords: int = AUTOMATON_MIN_KEYWORDS):
+        self.groups = list(groups)
+        # (Gruppe, Keyword) – auch Basis für das Zählen per str.count bei kleinen Mengen
+        self._keywords = [
+            (g, kw) for g, keywords in enumerate(groups.values())
+            for kw in dict.fromkeys(k.lower() for k in keywords if k)
+        ]
+        self.use_automaton = len(self._keywords) >= min_keywords
+        # Keywords mit Rand (Präfix = Suffix) können überlappen; str.count zählt nur disjunkte Treffer
+        self._overlapping = {kw for _, kw in self._keywords if _has_border(kw)}
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for g, kw in self._keywords:
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(g)
+
+        # Fehlerlinks per Breitensuche; Übergänge des Fehlerzustands übernehmen (→ DFA)
+        fail = [0] * len(goto)
+        delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state] += out[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+        self._delta = delta
+        self._out = [tuple(o) for o in out]
+
+    @property
+    def states(self) -> int:
+        return len(self._delta)
+
+    def counts(self, text: str) -> dict[str, int]:
+        """Treffer pro Gruppe (nur Gruppen mit mindestens einem Treffer), Text wird klein geschrieben."""
+        text = text.lower()
+        hits = [0] * len(self.groups)
+        if not self.use_automaton:
+            for g, kw in self._keywords:
+                hits[g] += _count_overlapping(text, kw) if kw in self._overlapping else text.count(kw)
+        else:
+            delta, out = self._delta, self._out
+            state = 0
+            for ch in text:
+                state = delta[state].get(ch, 0)
+                for g in out[state]:
+                    hits[g] += 1
+        return {self.groups[g]: n for g, n in enumerate(hits) if n}
@@ -14,7 +14,6 @@ Voraussetzung: .env mit OPENAI_API_KEY (und optional OPENAI_MODEL).
   Laufzeit: ca. 10–30 Min. (141 API-Calls mit 2 s Pause dazwischen).
 """
 
-import json
 import os
 import re
 import time
@@ -23,6 +22,8 @@ from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from wissen_analyse_parser import load_paare
+
 load_dotenv()
 
 
@@ -84,8 +85,7 @@ def run_with_paths(input_json: Path, output_md: Path) -> int:
     if not input_json.exists():
         print(f"FEHLER: {input_json} nicht gefunden.")
         return 1
-    paare = json.loads(input_json.read_text(encoding="utf-8"))
-    paare = sorted(paare, key=lambda p: p["id"])
+    paare = sorted(load_paare(input_json), key=lambda p: p["id"])
     total = len(paare)
     client = OpenAI(api_key=api_key)
     output_md.parent.mkdir(parents=True, exist_ok=True)
@@ -159,7 +159,7 @@ def main():
 if __name__ == "__main__":
     import argparse
     p = argparse.ArgumentParser(description="KI-Wissensextraktion: JSON → Markdown")
-    p.add_argument("--input", type=Path, default=INPUT_JSON)
+    p.add_argument("--input", type=Path, default=INPUT_JSON, help="paare_strukturiert.json oder .jsonl")
     p.add_argument("--output", type=Path, default=OUTPUT_MD)
     args = p.parse_args()
     if args.input != INPUT_JSON or args.output != OUTPUT_MD:
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Geordnetes paralleles map als Strom – gemeinsam genutzt von gemini_extract (Threads, I/O-lastige
+Gemini-Calls), wissen_analyse_parser (Prozesse, Parsen + Bereinigung) und email_analyse
+(Prozesse, .eml-Dateien).
+
+items wird lazy gelesen, Ergebnisse kommen in Eingabereihenfolge, und es sind höchstens
+in_flight Aufträge gleichzeitig unterwegs – der Speicherbedarf hängt nicht von der Eingabelänge ab.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _apply(fn: Callable[[T], R], chunk: list[T]) -> list[R]:
+    return [fn(x) for x in chunk]
+
+
+def map_ordered(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    workers: int,
+    *,
+    processes: bool = False,
+    min_items: int = 0,
+    chunk_size: int = 1,
+    in_flight: int | None = None,
+    thread_name_prefix: str = "",
+) -> Iterator[R]:
+    """
+    fn auf items anwenden, Ergebnisse als Strom in Eingabereihenfolge.
+    Seriell bei workers <= 1 oder weniger als min_items Elementen, sonst in einem Pool mit
+    workers Threads (processes=True: Prozesse; fn muss dann picklebar sein). Ein Auftrag umfasst
+    chunk_size Elemente (IPC-Overhead bei Prozessen klein halten), höchstens in_flight
+    Aufträge (Standard: workers) sind gleichzeitig unterwegs.
+    """
+    it = iter(items)
+    head = list(islice(it, min_items))
+    if workers <= 1 or len(head) < min_items:
+        yield from map(fn, head)
+        yield from map(fn, it)
+        return
+    it = chain(head, it)
+    limit = max(1, in_flight or workers)
+    if processes:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix)
+    with pool:
+        pending = deque()
+        while chunk := list(islice(it, max(1, chunk_size))):
+            pending.append(pool.submit(_apply, fn, chunk))
+            if len(pending) >= limit:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
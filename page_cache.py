@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Seiten-Cache für die Gemini-Extraktion: gleiche Seite (PNG-Inhalt) + Modell + Prompt →
+gespeichertes Markdown statt erneutem API-Call (Briefköpfe, AGB-Anhänge, identische Anhänge).
+
+Ablage: SQLite (WAL, wie job_store.py), prozessübergreifend nutzbar.
+Schlüssel: SHA-256(PNG) | Modell | SHA-256(PROMPT).
+Verdrängung: LRU nach Gesamtgröße (PAGE_CACHE_MAX_BYTES), älteste Nutzung zuerst.
+
+Konfiguration per .env:
+  PAGE_CACHE=1
+  PAGE_CACHE_PATH=./page_cache.sqlite3
+  PAGE_CACHE_MAX_BYTES=536870912
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+PAGE_CACHE_PATH = Path(os.environ.get("PAGE_CACHE_PATH", "page_cache.sqlite3"))
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(512 * 1024**2)))
+# Verdrängung nur alle N Schreibvorgänge prüfen (SUM über die Tabelle)
+EVICT_EVERY = 100
+
+
+def page_key(png: bytes, model: str, prompt: str) -> str:
+    """Cache-Schlüssel einer Seite."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    return f"{hashlib.sha256(png).hexdigest()}|{model}|{prompt_hash}"
+
+
+class PageCache:
+    """Extrahiertes Markdown pro Seite in SQLite; eine Verbindung pro Thread."""
+
+    def __init__(self, db_path: Path | str = PAGE_CACHE_PATH, *, max_bytes: int = PAGE_CACHE_MAX_BYTES,
+                 timeout: float = 30.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS pages (
+                    key       TEXT PRIMARY KEY,
+                    markdown  TEXT NOT NULL,
+                    size      INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> str | None:
+        conn = self._conn()
+        row = conn.execute("SELECT markdown FROM pages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key: str, markdown: str) -> None:
+        size = len(markdown.encode("utf-8")) + len(key)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO pages (key, markdown, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, markdown, size, time.time()),
+        )
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """Älteste Einträge löschen, bis die Gesamtgröße unter max_bytes liegt."""
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM pages ORDER BY last_used"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM pages WHERE key = ?", doomed)
+
+
+def get_page_cache() -> PageCache | None:
+    """Cache anhand von PAGE_CACHE (Standard: an) erzeugen."""
+    if os.environ.get("PAGE_CACHE", "1") == "0":
+        return None
+    return PageCache(os.environ.get("PAGE_CACHE_PATH", PAGE_CACHE_PATH))
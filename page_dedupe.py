@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Beinahe-Duplikate unter Seitenbildern erkennen, bevor sie an Gemini gehen.
+
+E-Mail-Uploads enthalten viele fast gleiche Seiten (Signatur-Banner, weitergeleitete PDFs,
+neu komprimierte Scans) – ein exakter Hash findet die nicht. Pro Seite wird ein
+Differenz-Hash (dHash, PIL, horizontal + vertikal) berechnet; Seiten mit Hamming-Abstand <= PAGE_DEDUPE_MAX_DISTANCE
+zu einer bereits gesehenen Seite (gleiches Seitenverhältnis) sind nur Kandidaten. Gefaltet wird
+erst, wenn der Inhalt bestätigt ist: gleiche Bytes (SHA-256) oder kein Pixel des Graustufen-
+Vorschaubilds (CONFIRM_SIZE) weicht um mehr als CONFIRM_PIXEL_DELTA ab. Der grobe Hash allein
+hält Seiten mit gleichem Briefkopf, aber anderem Text (Rechnungen, Regeln) für gleich.
+clusters / report() sagen, welche Quellen zusammengefasst wurden.
+
+Standardmäßig aus: Eine gefaltete Seite erreicht Gemini nie. Auch mit Inhaltsprüfung können
+winzige Unterschiede (eine einzelne Ziffer) unter der Auflösung des Vorschaubilds liegen.
+
+Konfiguration per .env:
+  PAGE_DEDUPE=0
+  PAGE_DEDUPE_MAX_DISTANCE=24   (von 2·HASH_SIZE² = 512 Bit)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+from typing import Iterable, Iterator
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:
+    Image = ImageChops = None
+
+PAGE_DEDUPE = os.environ.get("PAGE_DEDUPE", "0") != "0"
+PAGE_DEDUPE_MAX_DISTANCE = int(os.environ.get("PAGE_DEDUPE_MAX_DISTANCE", "24"))
+# 16×16 statt der üblichen 8×8, dazu der vertikale Gradient: Textseiten mit gleichem Layout
+# (Zeilen gleicher Länge, gleiche Ränder) sollen sich noch unterscheiden
+HASH_SIZE = 16
+# Max. relative Abweichung des Seitenverhältnisses innerhalb eines Clusters
+ASPECT_TOLERANCE = 0.02
+# Inhaltsprüfung vor dem Falten: Graustufen-Vorschau (~1/4 einer A4-Seite bei 100 dpi), in der
+# eine geänderte Textzeile noch mehrere Pixel ausmacht; Abweichungen bis CONFIRM_PIXEL_DELTA
+# (von 255) gelten als Kompressionsrauschen
+CONFIRM_SIZE = (192, 256)
+CONFIRM_PIXEL_DELTA = 48
+
+
+def dhash(png: bytes, hash_size: int = HASH_SIZE) -> tuple[int, float] | None:
+    """(dHash als int, Seitenverhältnis) eines Bildes oder None, wenn es nicht lesbar ist."""
+    fp = _fingerprint(png, hash_size)
+    return fp[:2] if fp else None
+
+
+def _fingerprint(png: bytes, hash_size: int = HASH_SIZE) -> tuple[int, float, bytes] | None:
+    """(dHash, Seitenverhältnis, Graustufen-Vorschau in CONFIRM_SIZE) oder None."""
+    if not Image:
+        return None
+    try:
+        with Image.open(io.BytesIO(png)) as im:
+            aspect = im.width / max(1, im.height)
+            gray = im.convert("L")
+            # (n+1)×(n+1): Bit = „Pixel heller als rechter“ bzw. „… als unterer Nachbar“
+            small = gray.resize((hash_size + 1, hash_size + 1), Image.BILINEAR)
+            preview = gray.resize(CONFIRM_SIZE, Image.BOX).tobytes()
+            px = small.load()
+    except Exception:
+        return None
+    bits = 0
+    for y in range(hash_size):
+        for x in range(hash_size):
+            bits = (bits << 2) | (px[x, y] > px[x + 1, y]) << 1 | (px[x, y] > px[x, y + 1])
+    return bits, aspect, preview
+
+
+def same_content(preview_a: bytes, preview_b: bytes, max_delta: int = CONFIRM_PIXEL_DELTA) -> bool:
+    """True, wenn kein Pixel der beiden Vorschaubilder um mehr als max_delta abweicht."""
+    a = Image.frombytes("L", CONFIRM_SIZE, preview_a)
+    b = Image.frombytes("L", CONFIRM_SIZE, preview_b)
+    return ImageChops.difference(a, b).point(lambda v: 255 if v > max_delta else 0).getbbox() is None
+
+
+class PageDeduper:
+    """Faltet Beinahe-Duplikate aus einem (lazy) Strom von (label, png_bytes)."""
+
+    def __init__(self, max_distance: int = PAGE_DEDUPE_MAX_DISTANCE):
+        self.max_distance = max_distance
+        # (hash, aspect, Vorschau, label) je Cluster
+        self._reps: list[tuple[int, float, bytes, str]] = []
+        self._exact: dict[bytes, str] = {}  # SHA-256 der PNG-Bytes → Repräsentant
+        self.clusters: dict[str, list[str]] = {}  # Repräsentant → gefaltete Labels
+        self.pages = 0
+
+    def _find(self, h: int, aspect: float, preview: bytes) -> str | None:
+        for rep_hash, rep_aspect, rep_preview, label in self._reps:
+            if abs(rep_aspect - aspect) > ASPECT_TOLERANCE * rep_aspect:
+                continue
+            if (rep_hash ^ h).bit_count() <= self.max_distance and same_content(rep_preview, preview):
+                return label
+        return None
+
+    def keep(self, label: str, png: bytes) -> bool:
+        """True für die erste Seite eines Clusters; bestätigte Duplikate werden gefaltet (False)."""
+        self.pages += 1
+        digest = hashlib.sha256(png).digest()
+        rep = self._exact.get(digest)
+        if rep is None:
+            fp = _fingerprint(png)
+            rep = self._find(*fp) if fp else None
+            if rep is None:
+                # Neuer Cluster; unlesbare Bilder nur bei gleichen Bytes falten
+                if fp:
+                    self._reps.append((*fp, label))
+                self._exact[digest] = label
+                self.clusters[label] = []
+                return True
+        self.clusters[rep].append(label)
+        return False
+
+    def filter(self, pngs: Iterable[tuple[str, bytes]]) -> Iterator[tuple[str, bytes]]:
+        """Nur die erste Seite jedes Clusters weiterreichen; Reihenfolge bleibt erhalten."""
+        for label, png in pngs:
+            if self.keep(label, png):
+                yield label, png
+
+    @property
+    def folded(self) -> int:
+        return sum(len(v) for v in self.clusters.values())
+
+    def stats(self) -> dict:
+        return {"pages": self.pages, "folded": self.folded}
+
+    def report(self) -> str:
+        """Lesbarer Bericht: welche Seiten auf welche Repräsentanten gefaltet wurden."""
+        lines = [
+            "=== Seiten-Duplikate (perzeptueller Hash + Inhaltsprüfung) ===",
+            f"Seiten gesamt: {self.pages} | gefaltet: {self.folded} | extrahiert: {self.pages - self.folded}",
+            "",
+        ]
+        for rep, folded in self.clusters.items():
+            if not folded:
+                continue
+            lines.append(f"{rep}")
+            lines.extend(f"  = {label}" for label in folded)
+            lines.append("")
+        return "\n".join(lines)
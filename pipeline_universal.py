@@ -12,26 +12,28 @@ from __future__ import annotations
 import os
 import tempfile
 import time
+from concurrent.futures import Executor
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from text_budget import fair_caps, truncate
 
-def merge_corpus_to_wissenstext(corpus: str, *, model: str | None = None) -> str:
-    """Aus Corpus (extrahierte Texte aus Gemini) einen kompakten Wissenstext erzeugen (OpenAI)."""
-    from openai import OpenAI
+if TYPE_CHECKING:
+    from page_cache import PageCache
+    from result_cache import ResultCache
 
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY fehlt für Merge-Schritt")
-    model = model or os.environ.get("OPENAI_MODEL", "gpt-4.1-mini")
-    client = OpenAI(api_key=api_key)
-    max_chars = 90_000
-    if len(corpus) > max_chars:
-        corpus = "... [gekürzt] ...\n\n" + corpus[-max_chars:]
-    prompt = f"""Aus den folgenden Dokument-Auszügen (aus verschiedenen Quellen extrahiert) erstelle EINEN kompakten, thematisch gegliederten Wissenstext für eine Wissensdatenbank / RAG-System.
+# Text-native Formate (TXT, DOCX, EML, …): "corpus" = Text direkt ins Corpus,
+# "llm" = Text-only Gemini-Call, "off" = wie früher als PNG rendern + Bild-Extraktion
+TEXT_PASSTHROUGH = os.environ.get("TEXT_PASSTHROUGH", "corpus").strip().lower()
+# Max. Zeichen Corpus für den Merge-Call; darüber wird pro Dokument gekürzt (build_corpus)
+MERGE_MAX_CHARS = 90_000
+TRUNCATED_MARKER = "\n\n... [gekürzt] ..."
+
+MERGE_PROMPT = """Aus den folgenden Dokument-Auszügen (aus verschiedenen Quellen extrahiert) erstelle EINEN kompakten, thematisch gegliederten Wissenstext für eine Wissensdatenbank / RAG-System.
 Pro Abschnitt: Überschrift (## …), darunter Bullet-Points mit den relevanten Regeln/Fakten.
 Keine Duplikate, keine Einzelfallbeispiele. Stil: sachlich, prägnant, auf Deutsch.
 
@@ -39,6 +41,85 @@ Keine Duplikate, keine Einzelfallbeispiele. Stil: sachlich, prägnant, auf Deuts
 {corpus}
 ---
 Dein Wissenstext:"""
+
+
+def resolve_models(gemini_model: str | None = None, openai_model: str | None = None) -> tuple[str, str]:
+    """Tatsächlich genutzte Modellnamen (Argument > .env > Default)."""
+    from gemini_extract import MODEL
+
+    return (
+        gemini_model or os.environ.get("GEMINI_MODEL", MODEL),
+        openai_model or os.environ.get("OPENAI_MODEL", "gpt-4.1-mini"),
+    )
+
+
+def prompt_version() -> str:
+    """
+    Kurzer Hash über alle Prompts + alle Modi, die ändern, was an die Modelle geht (Text-/PDF-Modus,
+    PDF-Textebene, Bildoptimierung, Seiten-Dedupe) – ändert sich etwas, ändert sich der Cache-Schlüssel.
+    """
+    import hashlib
+
+    import convert_to_png
+    import image_optimize
+    import page_dedupe
+    from gemini_extract import PROMPT
+
+    modes = "|".join((
+        TEXT_PASSTHROUGH,
+        f"pdf_native={int(convert_to_png.PDF_NATIVE)}",
+        f"pdf_text_layer={int(convert_to_png.PDF_TEXT_LAYER)}",
+        f"image_optimize={int(image_optimize.IMAGE_OPTIMIZE)}",
+        f"page_dedupe={int(page_dedupe.PAGE_DEDUPE)}:{page_dedupe.PAGE_DEDUPE_MAX_DISTANCE}",
+    ))
+    return hashlib.sha256((PROMPT + "\0" + MERGE_PROMPT + "\0" + modes).encode("utf-8")).hexdigest()[:16]
+
+
+def result_cache_key(
+    file_hashes: list[str],
+    *,
+    gemini_model: str | None = None,
+    openai_model: str | None = None,
+) -> str:
+    """Cache-Schlüssel für eine Eingabemenge mit den aktuell konfigurierten Modellen/Prompts."""
+    from result_cache import cache_key
+
+    gemini_model, openai_model = resolve_models(gemini_model, openai_model)
+    return cache_key(
+        file_hashes, gemini_model=gemini_model, openai_model=openai_model, prompt_version=prompt_version()
+    )
+
+
+def build_corpus(extracted: list[tuple[str, str]], max_chars: int = MERGE_MAX_CHARS) -> str:
+    """
+    Corpus für den Merge: ein Abschnitt "## Dokument: …" pro Eintrag, in Eingabe-Reihenfolge.
+    Passt nicht alles in max_chars, bekommt jeder Eintrag einen gleichen Anteil (kürzere geben
+    ihren Rest an die längeren ab) und nur zu lange Einträge werden am Ende gekürzt – ein großer
+    Text (z. B. CSV im Text-Passthrough) verdrängt so keine extrahierten Inhalte.
+    """
+    sections = [(f"## Dokument: {name}\n\n", text) for name, text in extracted]
+    overhead = sum(len(head) for head, _ in sections) + 2 * max(0, len(sections) - 1)
+    if overhead + sum(len(text) for _, text in sections) <= max_chars:
+        return "\n\n".join(head + text for head, text in sections)
+    caps = fair_caps([len(text) for _, text in sections], max_chars - overhead)
+    return "\n\n".join(
+        head + truncate(text, cap, TRUNCATED_MARKER) for (head, text), cap in zip(sections, caps)
+    )
+
+
+def merge_corpus_to_wissenstext(corpus: str, *, model: str | None = None) -> str:
+    """Aus Corpus (extrahierte Texte aus Gemini) einen kompakten Wissenstext erzeugen (OpenAI)."""
+    from openai import OpenAI
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY fehlt für Merge-Schritt")
+    model = resolve_models(openai_model=model)[1]
+    client = OpenAI(api_key=api_key)
+    if len(corpus) > MERGE_MAX_CHARS:
+        # Nur für Aufrufer ohne build_corpus: Anfang behalten
+        corpus = corpus[: MERGE_MAX_CHARS - len(TRUNCATED_MARKER)] + TRUNCATED_MARKER
+    prompt = MERGE_PROMPT.format(corpus=corpus)
     r = client.chat.completions.create(
         model=model,
         messages=[{"role": "user", "content": prompt}],
@@ -54,49 +135,113 @@ def run_universal_pipeline(
     gemini_model: str | None = None,
     openai_model: str | None = None,
     local_paths: list[Path] | None = None,
+    on_stage: Callable[..., None] | None = None,
+    cpu_executor: Executor | None = None,
+    result_cache: ResultCache | None = None,
+    page_cache: PageCache | None = None,
 ) -> Path:
     """
-    URLs → Download → PNG → Gemini → Merge → PDF.
+    URLs → Download → PNG (nur visuelle Quellen) / Text / PDF-Teile (PDF_NATIVE) → Gemini → Merge → PDF.
     Oder: local_paths=[Path(...)] für lokale Dateien (ohne Download).
+    on_stage: optionaler Callback, wird mit dem Namen jeder Stufe (+ Kennzahlen als kwargs)
+      aufgerufen (Job-Fortschritt).
+    cpu_executor: optionaler Prozess-Pool für CPU-lastige Stufen (PDF-Seiten rastern).
+    result_cache: optionaler Ergebnis-Cache; gleiche Dateien + Modelle + Prompts → gecachte PDF.
+    page_cache: optionaler Seiten-Cache für die Gemini-Extraktion (Treffer/Fehltreffer → on_stage).
     Returns: Pfad zur erzeugten PDF-Datei.
     """
-    from convert_to_png import files_to_pngs
-    from download_from_urls import download_from_urls
-    from gemini_extract import extract_from_pngs
+    from convert_to_png import Segment, iter_pngs, iter_segments
+    from download_from_urls import download_from_urls_hashed
+    from gemini_extract import extract_segments
+    from page_dedupe import PAGE_DEDUPE, PageDeduper
     from wissenstext_zu_pdf import build_pdf
 
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    def stage(name: str, **info) -> None:
+        if on_stage:
+            on_stage(name, **info)
+
     # 1. Dateien: Download von URLs oder lokale Pfade
+    stage("download")
+    file_hashes: list[str] | None = None
     if local_paths:
         paths = [Path(p) for p in local_paths if Path(p).exists()]
     else:
         work_dir = output_dir / "work"
         work_dir.mkdir(exist_ok=True)
-        _, paths = download_from_urls(file_urls, dest_dir=work_dir)
+        _, downloaded = download_from_urls_hashed(file_urls, dest_dir=work_dir)
+        paths = [d.path for d in downloaded]
+        file_hashes = [d.sha256 for d in downloaded]
     if not paths:
         raise RuntimeError("Keine Dateien. URLs prüfen oder local_paths nutzen.")
 
-    # 2. Alle Dateien → PNG(s)
-    pngs = files_to_pngs(paths)
-    if not pngs:
-        raise RuntimeError("Keine PNGs aus den Dateien erzeugt.")
+    key = None
+    if result_cache is not None:
+        from result_cache import sha256_file
+
+        if file_hashes is None:
+            file_hashes = [sha256_file(p) for p in paths]
+        key = result_cache_key(file_hashes, gemini_model=gemini_model, openai_model=openai_model)
+        cached = result_cache.restore(key, output_dir)
+        if cached is not None:
+            stage("cache")
+            return cached
 
-    # 3. Gemini: PNG → extrahierter Text
-    extracted = extract_from_pngs(pngs, model=gemini_model)
+    # 2. + 3. Dateien → Segmente (PNG / Text / PDF-Teil), lazy und in Eingabe-Reihenfolge:
+    #          Gemini liest den Strom auftragsweise, nie alle Seiten des Jobs gleichzeitig im Speicher
+    stage("extract")
+    # Beinahe-Duplikate (perzeptueller Hash) nur einmal extrahieren
+    deduper = PageDeduper() if PAGE_DEDUPE else None
+    n_segments = 0
+
+    def segment_stream():
+        nonlocal n_segments
+        if TEXT_PASSTHROUGH == "off":
+            segments = (Segment(label, png=png) for label, png in iter_pngs(paths, executor=cpu_executor))
+        else:
+            segments = iter_segments(paths, executor=cpu_executor)
+        for seg in segments:
+            n_segments += 1
+            if seg.png is not None and deduper and not deduper.keep(seg.label, seg.png):
+                continue
+            yield seg
+
+    cache_stats: dict = {}
+    # Ein Strom, Ergebnisse in Segment-Reihenfolge: gemischte PDFs (Text- und Scanseiten)
+    # und mehrere Dateien stehen im Corpus so, wie sie eingereicht wurden
+    extracted = extract_segments(
+        segment_stream(),
+        text_mode="llm" if TEXT_PASSTHROUGH == "llm" else "corpus",
+        model=gemini_model,
+        cache=page_cache,
+        stats=cache_stats,
+    )
+    if deduper and deduper.folded:
+        (output_dir / "Seiten_Duplikate.txt").write_text(deduper.report(), encoding="utf-8")
+    if not n_segments:
+        raise RuntimeError("Keine PNGs/Texte/PDFs aus den Dateien erzeugt.")
     if not extracted:
         raise RuntimeError("Gemini lieferte keine Texte.")
-    corpus = "\n\n".join(f"## Dokument: {name}\n\n{text}" for name, text in extracted)
+    corpus = build_corpus(extracted)
 
     # 4. Merge zu Wissenstext (OpenAI)
+    stage(
+        "merge",
+        page_cache=cache_stats if page_cache is not None else None,
+        dedupe=deduper.stats() if deduper else None,
+    )
     wissen_txt = merge_corpus_to_wissenstext(corpus, model=openai_model)
     wissen_path = output_dir / "Wissenstext.txt"
     wissen_path.write_text(wissen_txt, encoding="utf-8")
 
     # 5. PDF
+    stage("pdf")
     pdf_path = output_dir / "Wissenstext.pdf"
     build_pdf(wissen_path, pdf_path)
+    if result_cache is not None and key:
+        result_cache.put(key, [pdf_path, wissen_path])
     return pdf_path
 
 
@@ -108,10 +253,13 @@ if __name__ == "__main__":
     p.add_argument("--local", nargs="+", metavar="PFAD", help="Lokale Dateipfade (statt URLs)")
     p.add_argument("--output", "-o", type=Path, default=Path("./output_universal"), help="Ausgabeordner")
     args = p.parse_args()
+    from page_cache import get_page_cache
+
+    page_cache = get_page_cache()
     if args.local:
-        run_universal_pipeline([], args.output, local_paths=[Path(x) for x in args.local])
+        run_universal_pipeline([], args.output, local_paths=[Path(x) for x in args.local], page_cache=page_cache)
     elif args.urls:
-        run_universal_pipeline(args.urls, args.output)
+        run_universal_pipeline(args.urls, args.output, page_cache=page_cache)
     else:
         p.error("--urls oder --local erforderlich")
     print(f"Fertig. PDF: {args.output / 'Wissenstext.pdf'}")
@@ -16,6 +16,8 @@ Eingabe (--input):
 Ausgabe (--output):
   Alle Zwischenergebnisse und das finale PDF liegen im Ausgabeordner:
   paare.txt, paare_strukturiert.json, KI_Wissensextraktion.md, Wissenstext.txt, Wissenstext.pdf
+  Bei E-Mail-Eingabe gehen die Paare direkt strukturiert in paare_strukturiert.json;
+  paare.txt ist dann nur ein lesbarer Export (PAARE_TXT_EXPORT=0 schaltet ihn ab).
 
 Beispiele:
   python pipeline_wissenstext.py --input ./projekte/kunde_xyz --output ./projekte/kunde_xyz/output
@@ -23,11 +25,14 @@ Beispiele:
 """
 
 import argparse
+import os
 import sys
 from pathlib import Path
 
 # Projektroot = Ordner dieses Skripts
 BASE = Path(__file__).resolve().parent
+# Bei E-Mail-Eingabe zusätzlich paare.txt (lesbar) schreiben; die Pipeline selbst braucht ihn nicht
+PAARE_TXT_EXPORT = os.environ.get("PAARE_TXT_EXPORT", "1") != "0"
 
 
 def detect_input(input_path: Path) -> tuple[str, Path | None, Path | None, Path | None]:
@@ -105,26 +110,28 @@ def run_pipeline(
         return None
 
     paare_txt = output_dir / "paare.txt"
+    paare_json = output_dir / "paare_strukturiert.json"
     if kind == "eml":
-        from email_analyse import run_with_paths as run_email
-        n = run_email(
+        # Paare → JSON direkt aus dem Pairing (kein Schreiben + erneutes Parsen von paare.txt)
+        from email_analyse import collect_pairs, write_paare_txt
+        from wissen_analyse_parser import run_with_pairs
+        pairs = collect_pairs(
             posteingang,
             postausgang,
-            paare_txt,
             output_dir / "Analyse_Bericht.txt",
             support_domain=support_domain,
         )
-        if n == 0:
+        if not pairs:
             print("Warnung: Keine E-Mail-Paare gefunden. Prüfen Sie posteingang/postausgang und Support-Domain.", file=sys.stderr)
+        if PAARE_TXT_EXPORT:
+            write_paare_txt(pairs, paare_txt)
+        run_with_pairs(pairs, paare_json)
     elif kind == "paare":
         if paare_file.resolve() != paare_txt.resolve():
             paare_txt.write_bytes(paare_file.read_bytes())
-        paare_txt = output_dir / "paare.txt"
-
-    # Paare → JSON
-    from wissen_analyse_parser import run_with_paths as run_parser
-    paare_json = output_dir / "paare_strukturiert.json"
-    run_parser(paare_txt, paare_json)
+        # Paare → JSON
+        from wissen_analyse_parser import run_with_paths as run_parser
+        run_parser(paare_txt, paare_json)
 
     ki_md = output_dir / "KI_Wissensextraktion.md"
     if not skip_llm_extract:
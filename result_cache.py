@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Inhaltsadressierter Ergebnis-Cache für die universelle Pipeline.
+
+Schlüssel = SHA-256 über (sortierte SHA-256 aller Eingabedateien, Gemini-Modell,
+OpenAI-Modell, Prompt-Version). Gleiche Dateien mit gleichen Modellen/Prompts →
+fertiges Wissenstext.pdf aus dem Cache statt Download/PNG/Gemini/OpenAI.
+
+Ablage: <RESULT_CACHE_DIR>/<key>/Wissenstext.pdf (+ Wissenstext.txt).
+Verdrängung: nach Alter (RESULT_CACHE_MAX_AGE_DAYS) und Gesamtgröße
+(RESULT_CACHE_MAX_BYTES, älteste Einträge zuerst). Treffer setzen die mtime neu (LRU).
+Da Einträge jederzeit verdrängt werden können, holt restore() einen Treffer als Hardlink
+(bzw. Kopie) in das Verzeichnis des Jobs – Job-Ergebnisse zeigen nie in den Cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+RESULT_CACHE_DIR = Path(os.environ.get("RESULT_CACHE_DIR", "result_cache"))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(2 * 1024**3)))
+RESULT_CACHE_MAX_AGE_DAYS = float(os.environ.get("RESULT_CACHE_MAX_AGE_DAYS", "30"))
+RESULT_PDF_NAME = "Wissenstext.pdf"
+
+
+def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 einer Datei, blockweise gelesen."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(file_hashes: list[str], *, gemini_model: str, openai_model: str, prompt_version: str) -> str:
+    """Schlüssel für eine Eingabemenge (Reihenfolge der Dateien egal)."""
+    h = hashlib.sha256()
+    for part in (*sorted(x.lower() for x in file_hashes), gemini_model, openai_model, prompt_version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Ergebnis-Verzeichnisse pro Schlüssel; atomar geschrieben, prozessübergreifend nutzbar."""
+
+    def __init__(
+        self,
+        root: Path | str = RESULT_CACHE_DIR,
+        *,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        max_age_days: float = RESULT_CACHE_MAX_AGE_DAYS,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_days * 86400
+
+    def get(self, key: str) -> Path | None:
+        """Pfad zur gecachten PDF oder None. Abgelaufene Einträge zählen als Fehltreffer."""
+        entry = self.root / key
+        pdf = entry / RESULT_PDF_NAME
+        if not pdf.is_file():
+            return None
+        if self.max_age_sec and time.time() - entry.stat().st_mtime > self.max_age_sec:
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(entry)
+        return pdf
+
+    def restore(self, key: str, dest_dir: Path) -> Path | None:
+        """
+        Treffer nach dest_dir holen (Hardlink, sonst Kopie). Returns: Pfad der PDF in dest_dir
+        oder None (kein Treffer, oder der Eintrag wurde währenddessen verdrängt).
+        """
+        pdf = self.get(key)
+        if pdf is None:
+            return None
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for f in pdf.parent.iterdir():
+                target = dest_dir / f.name
+                target.unlink(missing_ok=True)
+                try:
+                    os.link(f, target)
+                except OSError:
+                    shutil.copy2(f, target)
+        except OSError:
+            return None
+        return dest_dir / RESULT_PDF_NAME
+
+    def put(self, key: str, files: list[Path]) -> Path | None:
+        """Dateien (PDF + ggf. TXT) unter key ablegen. Returns: Pfad zur gecachten PDF."""
+        entry = self.root / key
+        if (entry / RESULT_PDF_NAME).is_file():
+            os.utime(entry)
+            return entry / RESULT_PDF_NAME
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key[:12]}_", dir=self.root))
+        try:
+            for f in files:
+                shutil.copy2(f, tmp / Path(f).name)
+            # Atomar sichtbar machen; hat ein anderer Worker schneller geschrieben, gewinnt dieser
+            os.replace(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+        pdf = entry / RESULT_PDF_NAME
+        return pdf if pdf.is_file() else None
+
+    def evict(self) -> None:
+        """Abgelaufene Einträge löschen, dann älteste bis Gesamtgröße <= max_bytes."""
+        now = time.time()
+        entries = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+                size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+            except OSError:
+                continue
+            if self.max_age_sec and now - mtime > self.max_age_sec:
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            entries.append((mtime, size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
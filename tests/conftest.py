@@ -0,0 +1,23 @@
+"""Gemeinsame Fixtures; Repo-Wurzel in sys.path, damit die Top-Level-Module importierbar sind."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SAMPLE_CORPUS = ROOT / "Wissensbasis_Reiseteam_01_01_25_30_06_25.txt"
+
+
+@pytest.fixture
+def sample_paare_txt(tmp_path: Path) -> Path:
+    """Beispielkorpus im paare.txt-Format (Blöcke "--- Paar N ---" statt "--- Thread N ---")."""
+    if not SAMPLE_CORPUS.exists():
+        pytest.skip("Beispielkorpus fehlt")
+    data = SAMPLE_CORPUS.read_bytes().replace(b"--- Thread ", b"--- Paar ")
+    path = tmp_path / "paare.txt"
+    path.write_bytes(data)
+    return path
@@ -0,0 +1,198 @@
+"""
+Frühere Implementierungen als Referenz für die Äquivalenztests (Stand vor den
+Performance-Umbauten, unverändert übernommen bis auf Funktionsnamen).
+"""
+
+import re
+from pathlib import Path
+
+
+def old_parse_fields(path: Path) -> list[dict]:
+    """wissen_analyse_parser.parse_paare_file vor dem mmap-Umbau – ohne structure_pair."""
+    content = path.read_text(encoding="utf-8")
+    blocks = re.split(r"\n---\s*Paar\s+(\d+)\s*---\n", content)[1:]
+    paare = []
+    for i in range(0, len(blocks), 2):
+        if i + 1 >= len(blocks):
+            break
+        num, block = int(blocks[i]), blocks[i + 1]
+        betr = re.search(r"Betreff:\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
+        dat_in = re.search(r"Datum\s*\(Eingang\):\s*([^\n|]+)", block, re.IGNORECASE)
+        von = re.search(r"Von:\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
+        dat_out = re.search(r"Datum\s*\(Antwort\):\s*([^\n]+)", block, re.IGNORECASE)
+        anfrage = re.search(
+            r"\[\s*Anfrage\s*/\s*Kunde\s*\]\s*\n(.*?)(?=\n\[\s*Antwort\s*/\s*Reiseteam\s*\])",
+            block, re.DOTALL | re.IGNORECASE,
+        )
+        antwort = re.search(r"\[\s*Antwort\s*/\s*Reiseteam\s*\]\s*\n(.*)", block, re.DOTALL | re.IGNORECASE)
+        paare.append({
+            "id": num,
+            "betreff": betr.group(1).strip() if betr else "",
+            "datum_eingang": dat_in.group(1).strip() if dat_in else "",
+            "von_kunde": von.group(1).strip() if von else "",
+            "datum_antwort": dat_out.group(1).strip() if dat_out else "",
+            "anfrage": anfrage.group(1) if anfrage else "",
+            "antwort": antwort.group(1) if antwort else "",
+        })
+    return paare
+
+
+def old_clean_reiseteam_answer(raw: str) -> str:
+    """clean_reiseteam_answer vor den vorkompilierten CLEAN_*-Mustern (unbegrenzte Wiederholungen)."""
+    if not raw or not raw.strip():
+        return ""
+    text = raw.strip()
+    text = re.sub(
+        r"\s+[^\s]+(\s+<[^>]+>)?\s+hat am\s+\d{1,2}\.\d{1,2}\.\d{2,4}[^:]*geschrieben:.*",
+        "",
+        text,
+        flags=re.DOTALL | re.IGNORECASE,
+    )
+    text = re.sub(r"\s*----------\s*Ursprüngliche Nachricht\s*----------.*", "", text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r"\s*Von:\s*[^\n]+\s+An:\s*[^\n]+\s+Datum:.*?(?=\n\n|\Z)", "", text, flags=re.DOTALL | re.IGNORECASE)
+    signature_start = re.search(
+        r"(Beste Grüße|Mit freundlichen Grüßen|Guten Tag,?)\s*,?\s*(Ihr )?Reiseteam (vom )?Urlaubs Service Deutschland\s*(Tel\.?:|ACHTUNG|Internet:)",
+        text,
+        flags=re.IGNORECASE,
+    )
+    if signature_start:
+        text = text[: signature_start.start()].strip()
+    if "Sitz und Registergericht Oldenburg HRA 205897" in text:
+        idx = text.find("Sitz und Registergericht Oldenburg HRA 205897")
+        before = text[:idx]
+        last_content = max(before.rfind("Beste Grüße"), before.rfind("Tel.:"), before.rfind("Internet: www"))
+        if last_content > 0:
+            text = text[:last_content].strip()
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    return text.strip()
+
+
+def old_themen_zuordnung(paar: dict, themen_keywords: dict[str, list[str]]) -> list[str]:
+    """wissen_analyse_ki.themen_zuordnung vor keyword_automaton (ein `in` pro Keyword)."""
+    text = (
+        (paar.get("betreff") or "")
+        + " "
+        + (paar.get("anfrage_roh") or "")[:2000]
+        + " "
+        + (paar.get("antwort_bereinigt") or "")
+        + " "
+        + (paar.get("antwort_roh") or "")[:2000]
+    ).lower()
+    zuordnung = []
+    for thema, keywords in themen_keywords.items():
+        if any(kw.lower() in text for kw in keywords):
+            zuordnung.append(thema)
+    if not zuordnung:
+        zuordnung.append("Sonstiges")
+    return zuordnung
+
+
+def old_analyse(paare: list[dict]) -> tuple[list[str], dict, dict]:
+    """
+    wissen_analyse_ki.analyse vor der Ein-Durchlauf-Aggregation (Schritt 3: pro Satzgruppe alle
+    Paare durchlaufen, danach pro Thema deduplizieren). Themen, Satz-Split und Normalform
+    kommen aus dem aktuellen Modul – verglichen wird nur die Aggregation.
+    """
+    from collections import defaultdict
+
+    from wissen_analyse_ki import (
+        THEMEN_MIN_TREFFER,
+        ist_wissens_relevant,
+        normalize_fuer_vergleich,
+        satz_split,
+        themen_treffer,
+    )
+
+    for p in paare:
+        if not (p.get("antwort_bereinigt") or "").strip():
+            raw = (p.get("antwort_roh") or "")[:4000]
+            p["_text_fuer_analyse"] = raw
+        else:
+            p["_text_fuer_analyse"] = p.get("antwort_bereinigt") or ""
+
+    themen_pro_paar = {}
+    themen_haeufigkeit = defaultdict(int)
+    themen_treffer_summe = defaultdict(int)
+    for p in paare:
+        treffer = themen_treffer(p)
+        themen = [t for t, n in treffer.items() if n >= THEMEN_MIN_TREFFER] or ["Sonstiges"]
+        themen_pro_paar[p["id"]] = themen
+        for t in themen:
+            themen_haeufigkeit[t] += 1
+            themen_treffer_summe[t] += treffer.get(t, 0)
+
+    alle_saetze_normalized = defaultdict(list)
+    for p in paare:
+        text = p["_text_fuer_analyse"]
+        for satz in satz_split(text):
+            if not ist_wissens_relevant(satz):
+                continue
+            norm = normalize_fuer_vergleich(satz)
+            if len(norm) < 20:
+                continue
+            alle_saetze_normalized[norm].append((p["id"], satz))
+
+    themen_saetze = defaultdict(list)
+    for norm, vorkommen in alle_saetze_normalized.items():
+        if len(vorkommen) < 1:
+            continue
+        rep = max(vorkommen, key=lambda x: len(x[1]))[1]
+        paar_ids = list({pid for pid, _ in vorkommen})
+        for p in paare:
+            if p["id"] not in paar_ids:
+                continue
+            for t in themen_pro_paar[p["id"]]:
+                themen_saetze[t].append((rep, len(paar_ids)))
+
+    themen_saetze_dedup = {}
+    for thema, lst in themen_saetze.items():
+        by_norm = {}
+        for satz, count in lst:
+            norm = normalize_fuer_vergleich(satz)
+            if norm not in by_norm or by_norm[norm][1] < count:
+                by_norm[norm] = (satz, count)
+        themen_saetze_dedup[thema] = sorted(by_norm.values(), key=lambda x: -x[1])
+
+    wiederholungen = [(norm, len(v)) for norm, v in alle_saetze_normalized.items() if len(v) >= 2]
+    wiederholungen.sort(key=lambda x: -x[1])
+    top_phrasen = wiederholungen[:80]
+
+    lines = [
+        "# KI-Analyse: Wissensextraktion aus 141 Kundendienst-Paaren",
+        "",
+        "## 1. Themen-Verteilung (Keyword-Zuordnung)",
+        "",
+        "| Thema | Anzahl Paare | Keyword-Treffer |",
+        "|-------|--------------|-----------------|",
+    ]
+    for thema in sorted(themen_haeufigkeit.keys(), key=lambda t: -themen_haeufigkeit[t]):
+        lines.append(f"| {thema} | {themen_haeufigkeit[thema]} | {themen_treffer_summe[thema]} |")
+    lines.extend([
+        "",
+        "---",
+        "## 2. Häufig wiederkehrende Aussagen (mind. 2-mal vorkommend)",
+        "",
+    ])
+    for norm, count in top_phrasen[:50]:
+        orig = alle_saetze_normalized[norm][0][1]
+        orig_short = orig[:120] + "…" if len(orig) > 120 else orig
+        lines.append(f"- **{count}×** {orig_short}")
+        lines.append("")
+    lines.extend([
+        "---",
+        "## 3. Wissens-Kandidaten pro Thema (für Wissenstext)",
+        "",
+    ])
+    kandidaten_export = {}
+    for thema in sorted(themen_saetze_dedup.keys(), key=lambda t: -len(themen_saetze_dedup[t])):
+        kandidaten = themen_saetze_dedup[thema][:35]
+        kandidaten_export[thema] = [{"satz": s, "vorkommen": c} for s, c in kandidaten]
+        lines.append(f"### {thema}")
+        lines.append("")
+        for satz, count in kandidaten[:25]:
+            lines.append(f"- ({count}×) {satz[:200]}{'…' if len(satz)>200 else ''}")
+        lines.append("")
+
+    return lines, kandidaten_export, dict(themen_haeufigkeit)
@@ -0,0 +1,75 @@
+import pytest
+
+import convert_to_png
+from convert_to_png import _font, _text_chunks, _text_to_png_bytes
+
+pytest.importorskip("PIL")
+
+
+@pytest.fixture
+def no_truetype(monkeypatch):
+    """Keine TrueType-Schrift auf dem System; Cache von _font vor/nach dem Test leeren."""
+    monkeypatch.setattr(convert_to_png, "TEXT_FONT_PATHS", ("/nicht/vorhanden.ttf",))
+    _font.cache_clear()
+    yield
+    _font.cache_clear()
+
+
+def test_text_renders_with_default_font(no_truetype):
+    pngs = _text_to_png_bytes("Hallo Welt\n" * 10, "a.txt")
+    assert len(pngs) == 1
+    assert pngs[0].startswith(b"\x89PNG")
+
+
+def test_pillow_without_sized_default_font_falls_back(no_truetype, monkeypatch):
+    real_load_default = convert_to_png.ImageFont.load_default
+
+    def load_default_10_0(*args):
+        # Pillow 10.0: load_default() kennt keine Größe
+        if args:
+            raise TypeError("load_default() takes 0 positional arguments")
+        return real_load_default()
+
+    monkeypatch.setattr(convert_to_png.ImageFont, "load_default", load_default_10_0)
+    assert _text_chunks("Inhalt, der nicht verloren gehen darf", "a.txt") == [["Inhalt, der nicht verloren gehen darf"]]
+
+
+def test_no_font_raises_instead_of_dropping_text(no_truetype, monkeypatch):
+    monkeypatch.setattr(convert_to_png.ImageFont, "load_default", lambda *args: None)
+    with pytest.raises(RuntimeError):
+        _text_chunks("Inhalt", "a.txt")
+
+
+def _pdf(path, pages: int):
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page()
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_unreadable_pdf_raises(tmp_path, monkeypatch):
+    pytest.importorskip("fitz")
+    monkeypatch.setattr(convert_to_png, "PDF_TEXT_LAYER", True)
+    path = tmp_path / "kaputt.pdf"
+    path.write_bytes(b"%PDF-1.4 kein gueltiges pdf")
+    with pytest.raises(RuntimeError, match="kaputt.pdf"):
+        list(convert_to_png.iter_segments([path]))
+
+
+def test_pdf_failing_midway_is_not_reported_complete(tmp_path, monkeypatch):
+    path = _pdf(tmp_path / "scan.pdf", 3)
+    monkeypatch.setattr(convert_to_png, "PDF_TEXT_LAYER", True)
+    monkeypatch.setattr(convert_to_png, "PDF_NATIVE", False)
+
+    def render_one_then_fail(path, pages, executor=None):
+        yield b"png-1"
+        raise OSError("Lesefehler")
+
+    monkeypatch.setattr(convert_to_png, "_iter_render_pages", render_one_then_fail)
+    segments = convert_to_png.iter_segments([path])
+    assert next(segments).label == "scan.pdf (Seite 1/3)"
+    with pytest.raises(RuntimeError, match="ab Seite 1/3"):
+        next(segments)
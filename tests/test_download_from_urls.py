@@ -0,0 +1,71 @@
+import hashlib
+from functools import partial
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from download_from_urls import DownloadTooLarge, download_file, download_from_urls_hashed
+
+BODY = b"x" * 400
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    name = request.url.path.rsplit("/", 1)[-1]
+    if name.startswith("fehlt"):
+        return httpx.Response(404)
+    size = int(name.split("_")[0])
+    body = b"x" * size
+    if "stream" in name:
+        # Ohne Content-Length: Limit greift erst mitten im Stream
+        async def chunks():
+            for i in range(0, size, 100):
+                yield body[i:i + 100]
+
+        return httpx.Response(200, content=chunks())
+    return httpx.Response(200, content=body)
+
+
+@pytest.fixture
+def mock_http(monkeypatch):
+    transport = httpx.MockTransport(_handler)
+    monkeypatch.setattr(httpx, "AsyncClient", partial(httpx.AsyncClient, transport=transport))
+    monkeypatch.setattr(httpx, "Client", partial(httpx.Client, transport=transport))
+
+
+def _urls(*names: str) -> list[str]:
+    return [f"https://storage.example.com/bucket/{name}" for name in names]
+
+
+def test_downloads_in_url_order_with_hash(mock_http, tmp_path):
+    _, files = download_from_urls_hashed(_urls("400_a.pdf", "400_b.pdf", "400_c.pdf"), tmp_path, max_job_bytes=1200)
+    assert [f.path.name for f in files] == ["400_a.pdf", "400_b.pdf", "400_c.pdf"]
+    assert all(f.size == 400 and f.sha256 == hashlib.sha256(BODY).hexdigest() for f in files)
+
+
+@pytest.mark.parametrize("suffix", [".pdf", "_stream.pdf"])
+def test_job_budget_fails_instead_of_dropping_a_file(mock_http, tmp_path, suffix):
+    urls = _urls(*(f"400_{c}{suffix}" for c in "abc"))
+    with pytest.raises(DownloadTooLarge, match="Job-Limit"):
+        download_from_urls_hashed(urls, tmp_path, max_job_bytes=1000)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("name", ["2000_gross.pdf", "2000_gross_stream.pdf"])
+def test_file_cap_fails_the_job(mock_http, tmp_path, name):
+    with pytest.raises(DownloadTooLarge, match="Datei zu groß"):
+        download_from_urls_hashed(_urls("400_a.pdf", name), tmp_path, max_file_bytes=1000)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_download_is_skipped(mock_http, tmp_path):
+    _, files = download_from_urls_hashed(_urls("400_a.pdf", "fehlt.pdf"), tmp_path)
+    assert [f.path.name for f in files] == ["400_a.pdf"]
+
+
+def test_sync_download_file_raises_on_file_cap(mock_http, tmp_path):
+    assert download_file(_urls("400_a.pdf")[0], tmp_path, max_file_bytes=1000).read_bytes() == BODY
+    with pytest.raises(DownloadTooLarge):
+        download_file(_urls("2000_gross.pdf")[0], tmp_path, max_file_bytes=1000)
+    assert [p.name for p in tmp_path.iterdir()] == ["400_a.pdf"]
+
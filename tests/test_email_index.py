@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+import email_index
+from email_index import EMAIL_INDEX_NAME, EmailIndex, get_email_index
+
+
+def _eml(folder, name, body="Hallo"):
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / name
+    path.write_text(f"Message-ID: <{name}@x>\nSubject: Test\n\n{body}\n", encoding="utf-8")
+    return path
+
+
+def _put(index, path):
+    st = path.stat()
+    index.put_many([(st, {"path": path, "headers": {"Message-ID": f"<{path.name}@x>"}, "body": "Hallo"})])
+
+
+def _paths(index):
+    conn = sqlite3.connect(index.db_path)
+    try:
+        return {os.path.basename(p) for (p,) in conn.execute("SELECT path FROM emails")}
+    finally:
+        conn.close()
+
+
+def test_default_path_next_to_output(tmp_path, monkeypatch):
+    monkeypatch.delenv("EMAIL_INDEX_PATH", raising=False)
+    monkeypatch.setattr(email_index, "EMAIL_INDEX_PATH", "")
+    monkeypatch.chdir(tmp_path)
+    index = get_email_index(tmp_path / "ausgabe")
+    assert index.db_path == tmp_path / "ausgabe" / EMAIL_INDEX_NAME
+    assert not (tmp_path / EMAIL_INDEX_NAME).exists()
+
+
+def test_lookup_returns_cached_records(tmp_path):
+    index = EmailIndex(tmp_path / "idx.sqlite3")
+    a = _eml(tmp_path / "inbox", "a.eml")
+    _put(index, a)
+    found = index.lookup(a.parent, {a: a.stat()})
+    assert found[a]["body"] == "Hallo"
+
+
+def test_prune_removes_deleted_files_in_any_folder(tmp_path):
+    index = EmailIndex(tmp_path / "idx.sqlite3")
+    a = _eml(tmp_path / "postfach_alt", "a.eml")
+    b = _eml(tmp_path / "postfach_neu", "b.eml")
+    _put(index, a)
+    _put(index, b)
+    # Ganzer Ordner gelöscht – wird nie mehr gescannt
+    a.unlink()
+    a.parent.rmdir()
+    assert index.prune() == 1
+    assert _paths(index) == {"b.eml"}
+
+
+def test_prune_removes_entries_not_seen_within_max_age(tmp_path, monkeypatch):
+    index = EmailIndex(tmp_path / "idx.sqlite3")
+    a = _eml(tmp_path / "inbox", "a.eml")
+    b = _eml(tmp_path / "inbox", "b.eml")
+    now = time.time()
+    monkeypatch.setattr(email_index.time, "time", lambda: now - 40 * 86400)
+    _put(index, a)
+    monkeypatch.setattr(email_index.time, "time", lambda: now)
+    _put(index, b)
+    assert index.prune(max_age_days=30) == 1
+    assert _paths(index) == {"b.eml"}
+    assert index.prune(max_age_days=0) == 0
+
+
+def test_lookup_refreshes_seen_at(tmp_path, monkeypatch):
+    index = EmailIndex(tmp_path / "idx.sqlite3")
+    a = _eml(tmp_path / "inbox", "a.eml")
+    now = time.time()
+    monkeypatch.setattr(email_index.time, "time", lambda: now - 40 * 86400)
+    _put(index, a)
+    monkeypatch.setattr(email_index.time, "time", lambda: now)
+    index.lookup(a.parent, {a: a.stat()})
+    assert index.prune(max_age_days=30) == 0
+
+
+@pytest.fixture(autouse=True)
+def _no_env_index(monkeypatch):
+    monkeypatch.setenv("EMAIL_INDEX", "1")
@@ -0,0 +1,115 @@
+import time
+
+from email_analyse import normalize_message_id, parse_message_ids, thread_pair
+from email_threads import build_threads, normalize_subject
+
+DAY = 86400.0
+
+
+def _mail(mid="", subject="Stornierung Buchung 4711", ts=0.0, reply_to="", refs="", sender="kunde@example.com",
+          body="Text"):
+    return {
+        "headers": {"Message-ID": f"<{mid}>" if mid else "", "In-Reply-To": reply_to, "References": refs},
+        "subject": subject,
+        "timestamp": ts,
+        "date": str(ts),
+        "from": sender,
+        "body": body,
+    }
+
+
+def _threads(records, **kw):
+    threads = build_threads(records, normalize_id=normalize_message_id, parse_ids=parse_message_ids, **kw)
+    return sorted(sorted(records.index(d) for d in t) for t in threads)
+
+
+def test_normalize_subject():
+    assert normalize_subject("AW: WG: Re[2]:  Stornierung  Buchung") == "stornierung buchung"
+
+
+def test_references_join_threads_even_via_missing_mail():
+    records = [
+        _mail("a", ts=0),
+        _mail("b", ts=DAY, reply_to="<fehlt>"),
+        _mail("c", ts=2 * DAY, refs="<fehlt> <b>"),
+        _mail("d", subject="Anderes Thema ganz", ts=DAY),
+    ]
+    assert _threads(records) == [[0], [1, 2], [3]]
+
+
+def test_mails_without_id_join_nearest_mail_within_window():
+    records = [
+        _mail("a", ts=0),
+        _mail(ts=2 * DAY),                 # ohne ID, 2 Tage nach a
+        _mail(ts=40 * DAY),                # ohne ID, außerhalb des Fensters
+        _mail(ts=41 * DAY),                # ohne ID, 1 Tag nach der vorigen
+        _mail(subject="Kurz", ts=DAY),     # Betreff zu kurz für den Fallback
+    ]
+    assert _threads(records, window_days=14) == [[0, 1], [2, 3], [4]]
+
+
+def test_fallback_scales_linearly():
+    n = 20_000
+    records = [_mail(ts=i * 60.0) for i in range(n)]
+    start = time.perf_counter()
+    threads = build_threads(records, normalize_id=normalize_message_id, parse_ids=parse_message_ids)
+    assert time.perf_counter() - start < 5
+    assert len(threads) == 1 and len(threads[0]) == n
+
+
+def test_thread_pair_cleans_support_turns_once(monkeypatch):
+    import wissen_analyse_parser
+    from wissen_analyse_parser import structure_pair
+
+    calls = []
+    real = wissen_analyse_parser.clean_reiseteam_answer
+
+    def counting(text):
+        calls.append(text)
+        return real(text)
+
+    monkeypatch.setattr(wissen_analyse_parser, "clean_reiseteam_answer", counting)
+    support = "reiseteam@usd.reisen"
+    thread = [
+        _mail("a", ts=0, body="Frage 1"),
+        _mail("b", ts=DAY, sender=support, body="Antwort 1\nBeste Grüße\nTel.: 0049 123"),
+        _mail("c", ts=2 * DAY, body="Frage 2"),
+        _mail("d", ts=3 * DAY, sender=support, body="Antwort 2"),
+    ]
+    pair = thread_pair(1, thread, lambda d: d["from"] == support)
+    assert len(calls) == 2  # eine Bereinigung pro Support-Nachricht
+    structured = structure_pair(pair)
+    assert len(calls) == 2  # structure_pair bereinigt nicht noch einmal
+    assert "Antwort 1" in structured["antwort_bereinigt"]
+    assert "Antwort 2" in structured["antwort_bereinigt"]
+
+
+def test_long_thread_keeps_every_turn_within_pair_limits():
+    from wissen_analyse_parser import PAAR_MAX_ANFRAGE, PAAR_MAX_ANTWORT, structure_pair
+
+    support = "reiseteam@usd.reisen"
+    thread = []
+    for k in range(6):
+        thread.append(_mail(f"q{k}", ts=2 * k * DAY, body=f"Frage {k} " + "x" * 3000))
+        thread.append(_mail(f"a{k}", ts=(2 * k + 1) * DAY, sender=support, body=f"Antwort {k} " + "y" * 3000))
+    thread.append(_mail("a6", ts=13 * DAY, sender=support, body="Letzte Antwort: Erstattung ist veranlasst."))
+    pair = thread_pair(1, thread, lambda d: d["from"] == support)
+    assert len(pair["anfrage"]) <= PAAR_MAX_ANFRAGE
+    assert len(pair["antwort"]) <= PAAR_MAX_ANTWORT
+
+    structured = structure_pair(pair)
+    for k in range(6):
+        assert f"Frage {k}" in structured["anfrage_roh"]
+        assert f"Antwort {k}" in structured["antwort_bereinigt"]
+    # Kurze Nachrichten bleiben ganz, nur die langen werden gekürzt
+    assert structured["antwort_bereinigt"].endswith("Letzte Antwort: Erstattung ist veranlasst.")
+    assert structured["anfrage_roh"].count("... (gekürzt)") == 6
+
+
+def test_short_thread_is_not_truncated():
+    support = "reiseteam@usd.reisen"
+    thread = [_mail("a", ts=0, body="Frage"), _mail("b", ts=DAY, sender=support, body="Antwort")]
+    pair = thread_pair(1, thread, lambda d: d["from"] == support)
+    assert pair["anfrage"].endswith("\nFrage")
+    assert pair["antwort"].endswith("\nAntwort")
+    assert "gekürzt" not in pair["anfrage"] + pair["antwort"]
@@ -0,0 +1,212 @@
+import re
+
+import pytest
+
+import gemini_extract
+from convert_to_png import Segment, iter_segments
+from gemini_extract import extract_from_pngs, extract_segments
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Gemini-Stub: Antwort = "extrahiert: <Quellen>", Aufrufe werden mitgeschrieben."""
+    seen = []
+
+    def generate(client, model, contents, est_tokens=0):
+        prompt = contents[-1]
+        sources = re.match(r"\[Quelle\(n\): (.*?)\]", prompt).group(1)
+        seen.append(sources)
+        return f"extrahiert: {sources}"
+
+    monkeypatch.setattr(gemini_extract, "_client", lambda api_key, model: (object(), model or "m"))
+    monkeypatch.setattr(gemini_extract, "_generate", generate)
+    return seen
+
+
+def _png() -> bytes:
+    from PIL import Image
+    import io
+
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), "white").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_mixed_segments_keep_segment_order(calls):
+    png = _png()
+    segments = [
+        Segment("a.txt", text="Text A"),
+        Segment("b.pdf (Seite 1/3)", png=png),
+        Segment("b.pdf (Seite 2/3)", pdf=b"%PDF-teil", pages=1),
+        Segment("b.pdf (Seite 3/3)", png=png),
+        Segment("c.txt", text="Text C"),
+    ]
+    out = extract_segments(segments)
+    assert [name for name, _ in out] == [s.label for s in segments]
+    assert out[0] == ("a.txt", "Text A")
+    assert out[1][1] == "extrahiert: b.pdf (Seite 1/3)"
+    # Text-Passthrough kostet keinen Call; Bilder vor und nach dem PDF-Teil nicht in einem Batch
+    assert sorted(calls) == ["b.pdf (Seite 1/3)", "b.pdf (Seite 2/3)", "b.pdf (Seite 3/3)"]
+
+
+def test_llm_text_mode_bundles_consecutive_texts(calls):
+    segments = [Segment("a.txt", text="A"), Segment("b.txt", text="B"), Segment("c.png", png=_png()),
+                Segment("d.txt", text="D")]
+    out = extract_segments(segments, text_mode="llm")
+    assert [name for name, _ in out] == ["a.txt | b.txt", "c.png", "d.txt"]
+
+
+def test_consecutive_pngs_are_batched(calls):
+    png = _png()
+    out = extract_from_pngs([("p1", png), ("p2", png)])
+    assert out == [("p1 | p2", "extrahiert: p1, p2")]
+
+
+def test_mixed_pdf_pages_in_page_order(calls, tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    import convert_to_png
+
+    monkeypatch.setattr(convert_to_png, "PDF_TEXT_LAYER", True)
+    monkeypatch.setattr(convert_to_png, "PDF_NATIVE", False)
+    doc = fitz.open()
+    for i in range(3):
+        page = doc.new_page()
+        if i != 1:
+            page.insert_text((72, 72), f"Textseite {i + 1}: " + "Inhalt mit genug Zeichen " * 5)
+    path = tmp_path / "gemischt.pdf"
+    doc.save(str(path))
+    doc.close()
+
+    out = extract_segments(iter_segments([path]))
+    assert [name for name, _ in out] == [
+        "gemischt.pdf (Seite 1/3)",
+        "gemischt.pdf (Seite 2/3)",
+        "gemischt.pdf (Seite 3/3)",
+    ]
+    assert out[0][1].startswith("Textseite 1")
+    assert out[1][1] == "extrahiert: gemischt.pdf (Seite 2/3)"
+
+
+
+def test_pdf_parts_are_streamed_not_collected(calls, monkeypatch):
+    produced = []
+    done = []
+    ahead = []
+
+    def segments():
+        for i in range(40):
+            # Erzeugte, aber noch nicht fertig extrahierte Teile liegen im Speicher
+            ahead.append(len(produced) - len(done))
+            produced.append(i)
+            yield Segment(f"s.pdf (Seite {i + 1}/40)", pdf=b"%PDF" + bytes(1024), pages=1)
+
+    real_generate = gemini_extract._generate
+
+    def generate(client, model, contents, est_tokens=0):
+        text = real_generate(client, model, contents, est_tokens)
+        done.append(1)
+        return text
+
+    monkeypatch.setattr(gemini_extract, "_generate", generate)
+    out = extract_segments(segments())
+    assert [name for name, _ in out] == [f"s.pdf (Seite {i + 1}/40)" for i in range(40)]
+    # Höchstens die Aufträge im Pool (+ der gerade gelesene) sind unterwegs, nicht alle 40
+    assert max(ahead) <= gemini_extract.GEMINI_CONCURRENCY + 1
+
+
+class _StubModels:
+    """generate_content-Stub: lehnt Requests mit mehr als max_parts Seiten als zu groß ab."""
+
+    def __init__(self, max_parts: int):
+        self.max_parts = max_parts
+        self.requests = []
+
+    def generate_content(self, model, contents):
+        prompt = contents[-1]
+        sources = re.match(r"\[Quelle\(n\): (.*?)\]", prompt).group(1)
+        parts = [c for c in contents if not isinstance(c, str)]
+        pages = sum(_pdf_pages(p) for p in parts) if any(_is_pdf(p) for p in parts) else len(parts)
+        self.requests.append((sources, pages))
+        if pages > self.max_parts:
+            raise RuntimeError("400 INVALID_ARGUMENT: Request payload size exceeds the limit")
+        if "<<<SEITE" in prompt:
+            text = "\n".join(f"<<<SEITE {i}>>>\nText {i} von {sources}" for i in range(1, pages + 1))
+        else:
+            text = f"extrahiert: {sources} ({pages} S.)"
+        return type("Response", (), {"text": text})()
+
+
+def _is_pdf(part) -> bool:
+    return part.inline_data.mime_type == "application/pdf"
+
+
+def _pdf_pages(part) -> int:
+    import fitz
+
+    with fitz.open(stream=part.inline_data.data, filetype="pdf") as doc:
+        return len(doc)
+
+
+@pytest.fixture
+def stub_models(monkeypatch):
+    """Echter _generate (inkl. Erkennung „zu groß“) gegen einen Stub-Client ohne Rate-Limit."""
+    models = _StubModels(max_parts=2)
+    client = type("Client", (), {"models": models})()
+    monkeypatch.setattr(gemini_extract, "_client", lambda api_key, model: (client, model or "m"))
+    monkeypatch.setattr(gemini_extract, "_request_bucket", gemini_extract.TokenBucket(1e9))
+    monkeypatch.setattr(gemini_extract, "_token_bucket", gemini_extract.TokenBucket(1e12))
+    return models
+
+
+def _pngs(n: int) -> list[bytes]:
+    from PIL import Image
+    import io
+
+    out = []
+    for i in range(n):
+        buf = io.BytesIO()
+        Image.new("RGB", (32, 32), (i * 40, 0, 0)).save(buf, format="PNG")
+        out.append(buf.getvalue())
+    return out
+
+
+def test_too_large_png_batch_is_halved_in_order(stub_models):
+    pages = [(f"p{i}", png) for i, png in enumerate(_pngs(4), 1)]
+    out = extract_from_pngs(pages)
+    assert stub_models.requests == [("p1, p2, p3, p4", 4), ("p1, p2", 2), ("p3, p4", 2)]
+    assert out == [("p1 | p2", "extrahiert: p1, p2 (2 S.)"), ("p3 | p4", "extrahiert: p3, p4 (2 S.)")]
+
+
+def test_halved_batch_keeps_per_page_output_and_cache(stub_models, tmp_path):
+    from page_cache import PageCache, page_key
+
+    cache = PageCache(tmp_path / "pages.sqlite3")
+    pngs = _pngs(4)
+    out = extract_segments([Segment(f"p{i}", png=png) for i, png in enumerate(pngs, 1)], model="m", cache=cache)
+    assert out == [
+        ("p1", "Text 1 von p1, p2"),
+        ("p2", "Text 2 von p1, p2"),
+        ("p3", "Text 1 von p3, p4"),
+        ("p4", "Text 2 von p3, p4"),
+    ]
+    assert cache.get(page_key(pngs[3], "m", gemini_extract.PROMPT)) == "Text 2 von p3, p4"
+
+
+def test_single_page_too_large_raises(stub_models):
+    stub_models.max_parts = 0
+    with pytest.raises(gemini_extract.BatchTooLarge):
+        extract_from_pngs([("p1", _pngs(1)[0])])
+
+
+def test_too_large_pdf_part_is_split_in_page_order(stub_models):
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    for _ in range(4):
+        doc.new_page()
+    data = doc.tobytes()
+    doc.close()
+
+    out = extract_segments([Segment("scan.pdf (Seite 1–4/4)", pdf=data, pages=4)])
+    assert [pages for _, pages in stub_models.requests] == [4, 2, 2]
+    assert out == [("scan.pdf (Seite 1–4/4)", "extrahiert: scan.pdf (Seite 1–4/4) (2 S.)\n\n"
+                                                "extrahiert: scan.pdf (Seite 1–4/4) (2 S.)")]
@@ -0,0 +1,98 @@
+import io
+import random
+
+import pytest
+
+from image_optimize import IMAGE_CROP_PADDING, optimize_image, optimize_png
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+
+def _png(im: "Image.Image") -> bytes:
+    buf = io.BytesIO()
+    im.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _open(png: bytes) -> "Image.Image":
+    return Image.open(io.BytesIO(png))
+
+
+def _content_box(im: "Image.Image") -> tuple[int, int, int, int] | None:
+    """Begrenzungsrahmen aller dunklen Pixel."""
+    return im.convert("L").point(lambda p: 255 if p < 128 else 0).getbbox()
+
+
+def _page() -> "Image.Image":
+    im = Image.new("RGB", (800, 1000), "white")
+    draw = ImageDraw.Draw(im)
+    draw.rectangle((200, 150, 499, 349), fill="black")
+    draw.text((210, 600), "Reisebestätigung", fill="black")
+    return im
+
+
+def test_crop_keeps_content_bounding_box():
+    page = _page()
+    left, top, right, bottom = _content_box(page)
+    out = _open(optimize_image(page))
+
+    p = IMAGE_CROP_PADDING
+    assert out.size == (right - left + 2 * p, bottom - top + 2 * p)
+    assert _content_box(out) == (p, p, right - left + p, bottom - top + p)
+    # Das Rechteck oben links im Inhalt liegt vollständig an der verschobenen Stelle
+    assert out.convert("L").crop((p, p, p + 300, p + 200)).getextrema()[1] < 64
+
+
+def test_crop_at_image_edge_is_clamped():
+    im = Image.new("L", (300, 200), 255)
+    ImageDraw.Draw(im).rectangle((0, 0, 49, 29), fill=0)
+    out = _open(optimize_image(im))
+    assert out.size == (50 + IMAGE_CROP_PADDING, 30 + IMAGE_CROP_PADDING)
+    assert _content_box(out) == (0, 0, 50, 30)
+
+
+def test_blank_page_is_not_cropped():
+    assert _open(optimize_image(Image.new("RGB", (300, 200), "white"))).size == (300, 200)
+
+
+def test_gray_page_becomes_small_palette():
+    out = _open(optimize_image(_page()))
+    assert out.mode == "P"
+    assert len(out.getcolors()) <= 16
+
+
+def test_falls_back_to_original_when_not_smaller():
+    rnd = random.Random(0)
+    noise = Image.new("RGB", (16, 16))
+    noise.putdata([(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(256)])
+    png = _png(noise)
+    # Palette mit 256 Einträgen ist hier größer als das RGB-Original
+    assert len(optimize_image(noise)) >= len(png)
+    assert optimize_png(png) is png
+    assert optimize_image(noise, original=png) is png
+
+
+def test_already_optimized_png_is_kept():
+    once = optimize_png(_png(_page()))
+    assert optimize_png(once) is once
+
+
+def test_smaller_result_replaces_original():
+    png = _png(_page())
+    out = optimize_png(png)
+    assert len(out) < len(png)
+    assert _open(out).mode == "P"
+
+
+def test_oversized_original_is_downscaled_even_if_larger():
+    rnd = random.Random(1)
+    noise = Image.new("RGB", (32, 32))
+    noise.putdata([(rnd.randrange(256),) * 3 for _ in range(32 * 32)])
+    png = _png(noise)
+    out = optimize_png(png, max_edge=16)
+    assert max(_open(out).size) <= 16
+
+
+def test_unreadable_png_is_returned_unchanged():
+    assert optimize_png(b"kein png") == b"kein png"
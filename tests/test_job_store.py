@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from job_store import RESTART_ERROR, JobStore, MemoryJobStore, SQLiteJobStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path) -> JobStore:
+    if request.param == "memory":
+        return MemoryJobStore()
+    return SQLiteJobStore(tmp_path / "jobs.sqlite3")
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+
+def test_create_get_update(store):
+    store.create("a", file_urls=["u"])
+    store.update("a", status="done", result_path="/x.pdf")
+    job = store.get("a")
+    assert job["status"] == "done"
+    assert job["result_path"] == "/x.pdf"
+    assert job["file_urls"] == ["u"]
+    assert store.get("missing") is None
+
+
+def test_set_stage_parallel_keeps_all_stages(store):
+    store.create("a")
+
+    def worker(n):
+        for i in range(25):
+            store.set_stage("a", f"s{n}_{i}", n=n)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stages = store.get("a")["progress"]["stages"]
+    assert len(stages) == 100
+
+
+def test_set_stage_unknown_job_is_noop(store):
+    store.set_stage("missing", "download")
+    assert store.get("missing") is None
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_sqlite_restart_marks_orphans_failed(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    store = SQLiteJobStore(path)
+    store.create("alive")
+    store.create("orphan")
+    store.create("finished")
+    store.update("finished", status="done")
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE jobs SET owner_pid = ? WHERE job_id = 'orphan'", (_dead_pid(),))
+        conn.execute("UPDATE jobs SET owner_pid = ? WHERE job_id = 'alive'", (os.getppid(),))
+    conn.close()
+
+    restarted = SQLiteJobStore(path)
+    assert restarted.get("orphan")["status"] == "failed"
+    assert restarted.get("orphan")["error"] == RESTART_ERROR
+    assert restarted.get("alive")["status"] == "pending"
+    assert restarted.get("finished")["status"] == "done"
+
+
+def test_sqlite_restart_with_same_pid_marks_own_rows_failed(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    SQLiteJobStore(path).create("a")
+    assert SQLiteJobStore(path).get("a")["status"] == "failed"
+
+
+def test_queue_position_fifo(store):
+    for job_id in ("a", "b", "c"):
+        store.create(job_id)
+    store.update("a", status="processing")
+    assert store.queue_position("a") is None
+    assert store.queue_position("b") == 1
+    assert store.queue_position("c") == 2
+
+
+def test_sqlite_queue_position_counts_only_same_process(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    store = SQLiteJobStore(path)
+    store.create("other")
+    store.create("own")
+    conn = sqlite3.connect(path)
+    with conn:
+        # Job eines anderen (laufenden) uvicorn-Workers
+        conn.execute("UPDATE jobs SET owner_pid = ? WHERE job_id = 'other'", (os.getppid(),))
+    conn.close()
+    assert store.queue_position("own") == 1
+    assert store.queue_position("other") == 1
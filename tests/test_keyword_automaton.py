@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from keyword_automaton import KeywordAutomaton
+
+
+def _naive_counts(groups: dict[str, list[str]], text: str) -> dict[str, int]:
+    """Referenz: jede Startposition einzeln prüfen (überlappende Treffer zählen mit)."""
+    text = text.lower()
+    out = {}
+    for group, keywords in groups.items():
+        n = sum(
+            text.startswith(kw, i)
+            for kw in dict.fromkeys(k.lower() for k in keywords if k)
+            for i in range(len(text))
+        )
+        if n:
+            out[group] = n
+    return out
+
+
+@pytest.mark.parametrize("min_keywords", [1, 10_000])
+def test_self_overlapping_keyword(min_keywords):
+    automat = KeywordAutomaton({"x": ["aa"]}, min_keywords=min_keywords)
+    assert automat.use_automaton is (min_keywords == 1)
+    assert automat.counts("aaaa") == {"x": 3}
+
+
+def test_nested_keywords_count_for_each_group():
+    groups = {"storno": ["rücktritt"], "versicherung": ["reiserücktritt"]}
+    for min_keywords in (1, 10_000):
+        counts = KeywordAutomaton(groups, min_keywords=min_keywords).counts("Reiserücktritt!")
+        assert counts == {"storno": 1, "versicherung": 1}
+
+
+def test_both_paths_match_naive_on_random_texts():
+    rnd = random.Random(0)
+    alphabet = "abr-ü "
+    for _ in range(200):
+        groups = {
+            f"g{g}": ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 4))) for _ in range(rnd.randint(1, 5))]
+            for g in range(rnd.randint(1, 4))
+        }
+        text = "".join(rnd.choice(alphabet + "AB") for _ in range(rnd.randint(0, 60)))
+        expected = _naive_counts(groups, text)
+        assert KeywordAutomaton(groups, min_keywords=1).counts(text) == expected, (groups, text)
+        assert KeywordAutomaton(groups, min_keywords=10_000).counts(text) == expected, (groups, text)
+
+
+def test_empty_keywords_are_ignored():
+    automat = KeywordAutomaton({"x": ["", "ab"], "y": []}, min_keywords=1)
+    assert automat.counts("abab") == {"x": 2}
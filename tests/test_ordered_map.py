@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from ordered_map import map_ordered
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_results_keep_input_order(processes):
+    items = range(1000)
+    out = list(map_ordered(_square, items, 4, processes=processes, chunk_size=7))
+    assert out == [x * x for x in items]
+
+
+def test_serial_below_min_items():
+    threads = set()
+
+    def fn(x):
+        threads.add(threading.current_thread().name)
+        return x
+
+    assert list(map_ordered(fn, range(10), 4, min_items=11, thread_name_prefix="pool")) == list(range(10))
+    assert threads == {threading.current_thread().name}
+    list(map_ordered(fn, range(10), 4, min_items=10, thread_name_prefix="pool"))
+    assert any(name.startswith("pool") for name in threads)
+
+
+def test_reads_items_lazily():
+    read = []
+
+    def items():
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    stream = map_ordered(_square, items(), 2, in_flight=3)
+    assert next(stream) == 0
+    assert len(read) <= 4
+    assert list(stream) == [x * x for x in range(1, 100)]
@@ -0,0 +1,75 @@
+import pytest
+
+import page_cache
+from page_cache import PageCache, get_page_cache, page_key
+
+
+class _Clock:
+    """Ersatz für das time-Modul in page_cache: jede Abfrage eine Sekunde später."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "time", _Clock())
+    return PageCache(tmp_path / "pages.sqlite3", max_bytes=30)
+
+
+def _keys(cache: PageCache) -> set[str]:
+    return {k for (k,) in cache._conn().execute("SELECT key FROM pages")}
+
+
+def test_page_key_covers_png_model_and_prompt():
+    key = page_key(b"png", "m", "prompt")
+    assert key != page_key(b"png2", "m", "prompt")
+    assert key != page_key(b"png", "m2", "prompt")
+    assert key != page_key(b"png", "m", "prompt2")
+
+
+def test_hit_and_miss(cache):
+    assert cache.get("a") is None
+    cache.put("a", "# Seite ä")
+    assert cache.get("a") == "# Seite ä"
+    assert cache.get("b") is None
+
+
+def test_evicts_least_recently_used(cache):
+    for key in "abc":
+        cache.put(key, "x" * 9)  # je 10 Byte, zusammen genau max_bytes
+    cache.evict()
+    assert _keys(cache) == {"a", "b", "c"}
+
+    assert cache.get("a") == "x" * 9  # a ist jetzt jünger als b und c
+    cache.put("d", "x" * 9)
+    cache.evict()
+    assert _keys(cache) == {"a", "c", "d"}
+
+
+def test_evicts_until_size_fits(cache):
+    cache.put("a", "x" * 9)
+    cache.put("b", "x" * 9)
+    cache.put("c", "x" * 29)  # allein 30 Byte: beide älteren Einträge müssen weichen
+    cache.evict()
+    assert _keys(cache) == {"c"}
+
+
+def test_put_evicts_every_n_writes(cache, monkeypatch):
+    monkeypatch.setattr(page_cache, "EVICT_EVERY", 4)
+    for key in "abc":
+        cache.put(key, "x" * 9)
+    cache.put("d", "x" * 9)  # vierter Schreibvorgang räumt auf
+    assert _keys(cache) == {"b", "c", "d"}
+
+
+def test_cache_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("PAGE_CACHE_PATH", str(tmp_path / "pages.sqlite3"))
+    monkeypatch.setenv("PAGE_CACHE", "0")
+    assert get_page_cache() is None
+    monkeypatch.setenv("PAGE_CACHE", "1")
+    assert isinstance(get_page_cache(), PageCache)
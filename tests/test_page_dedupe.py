@@ -0,0 +1,96 @@
+import importlib
+import io
+
+import pytest
+
+import page_dedupe
+from page_dedupe import PageDeduper, dhash
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+ImageFont = pytest.importorskip("PIL.ImageFont")
+
+POSITIONEN = [f"Position {i}: Reise nach Mallorca, {i + 2} Nächte, {120 + i * 7} EUR" for i in range(12)]
+REGELN = [f"Regel {i}: Stornierung bis {30 - i} Tage vor Abreise kostenfrei" for i in range(12)]
+
+
+def _page(lines: list[str]) -> Image.Image:
+    """A4-artige Seite: gleicher Briefkopf und Fuß, Inhalt aus lines."""
+    im = Image.new("RGB", (850, 1100), "white")
+    draw = ImageDraw.Draw(im)
+    font = ImageFont.load_default(size=18)
+    draw.rectangle((40, 30, 810, 120), fill=(20, 60, 140))
+    draw.text((60, 60), "Urlaubs Service Deutschland – Rechnung", fill="white", font=font)
+    for i, line in enumerate(lines):
+        draw.text((60, 160 + 26 * i), line, fill="black", font=font)
+    draw.text((60, 1040), "Sitz und Registergericht Oldenburg HRA 205897", fill="gray", font=font)
+    return im
+
+
+def _png(im: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    im.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _recompressed(im: Image.Image) -> bytes:
+    """Dieselbe Seite nach JPEG-Umweg (neu komprimierter Scan)."""
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=40)
+    return _png(Image.open(io.BytesIO(buf.getvalue())))
+
+
+def test_same_template_different_text_is_kept():
+    rechnung, regeln = _png(_page(POSITIONEN)), _png(_page(REGELN))
+    # Der grobe Hash allein hält die Seiten für gleich
+    (h1, _), (h2, _) = dhash(rechnung), dhash(regeln)
+    assert (h1 ^ h2).bit_count() <= page_dedupe.PAGE_DEDUPE_MAX_DISTANCE
+
+    deduper = PageDeduper()
+    kept = list(deduper.filter([("a.pdf#1", rechnung), ("a.pdf#2", regeln)]))
+    assert [label for label, _ in kept] == ["a.pdf#1", "a.pdf#2"]
+    assert deduper.folded == 0
+
+
+def test_single_changed_line_is_kept():
+    geaendert = list(POSITIONEN)
+    geaendert[5] = "Position 5: Reise nach Kreta, 9 Nächte, 999 EUR"
+    deduper = PageDeduper()
+    assert deduper.keep("a", _png(_page(POSITIONEN)))
+    assert deduper.keep("b", _png(_page(geaendert)))
+
+
+def test_exact_and_recompressed_duplicates_are_folded():
+    im = _page(POSITIONEN)
+    deduper = PageDeduper()
+    pages = [("a.pdf#1", _png(im)), ("b.pdf#1", _png(im)), ("scan.png", _recompressed(im))]
+    kept = list(deduper.filter(pages))
+    assert [label for label, _ in kept] == ["a.pdf#1"]
+    assert deduper.clusters == {"a.pdf#1": ["b.pdf#1", "scan.png"]}
+    assert deduper.stats() == {"pages": 3, "folded": 2}
+    assert "  = scan.png" in deduper.report()
+
+
+def test_different_aspect_is_kept():
+    im = _page(POSITIONEN)
+    deduper = PageDeduper()
+    assert deduper.keep("hoch", _png(im))
+    assert deduper.keep("quer", _png(im.resize((1100, 850))))
+
+
+def test_unreadable_pages_fold_only_when_identical():
+    deduper = PageDeduper()
+    assert deduper.keep("a", b"kein png")
+    assert not deduper.keep("b", b"kein png")
+    assert deduper.keep("c", b"auch kein png")
+
+
+def test_dedupe_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("PAGE_DEDUPE", raising=False)
+    try:
+        assert importlib.reload(page_dedupe).PAGE_DEDUPE is False
+        monkeypatch.setenv("PAGE_DEDUPE", "1")
+        assert importlib.reload(page_dedupe).PAGE_DEDUPE is True
+    finally:
+        monkeypatch.undo()
+        importlib.reload(page_dedupe)
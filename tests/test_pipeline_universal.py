@@ -0,0 +1,49 @@
+import importlib
+
+import pytest
+
+from pipeline_universal import TRUNCATED_MARKER, build_corpus, prompt_version
+
+
+def test_small_corpus_unchanged():
+    extracted = [("a.pdf", "Inhalt A"), ("b.txt", "Inhalt B")]
+    assert build_corpus(extracted) == "## Dokument: a.pdf\n\nInhalt A\n\n## Dokument: b.txt\n\nInhalt B"
+
+
+def test_large_passthrough_text_cannot_push_out_extracted_content():
+    extracted = [
+        ("scan.pdf (Seite 1/2)", "Regel 1 " * 100),
+        ("export.csv", "zeile;wert\n" * 50_000),
+        ("scan.pdf (Seite 2/2)", "Regel 2 " * 100),
+    ]
+    corpus = build_corpus(extracted, max_chars=10_000)
+    assert len(corpus) <= 10_000
+    # Reihenfolge wie eingereicht, extrahierte Seiten vollständig
+    assert corpus.index("scan.pdf (Seite 1/2)") < corpus.index("export.csv") < corpus.index("scan.pdf (Seite 2/2)")
+    assert extracted[0][1] in corpus
+    assert extracted[2][1] in corpus
+    assert corpus.count(TRUNCATED_MARKER) == 1
+
+
+def test_all_long_documents_share_budget_evenly():
+    extracted = [(f"d{i}", str(i) * 50_000) for i in range(3)]
+    corpus = build_corpus(extracted, max_chars=30_000)
+    assert len(corpus) <= 30_000
+    shares = [corpus.count(str(i)) for i in range(3)]
+    assert max(shares) - min(shares) < 100
+
+
+@pytest.mark.parametrize("module, name, value", [
+    ("convert_to_png", "PDF_NATIVE", True),
+    ("convert_to_png", "PDF_TEXT_LAYER", False),
+    ("image_optimize", "IMAGE_OPTIMIZE", False),
+    ("page_dedupe", "PAGE_DEDUPE", True),
+    ("page_dedupe", "PAGE_DEDUPE_MAX_DISTANCE", 8),
+])
+def test_modes_that_change_model_input_change_cache_key(monkeypatch, module, name, value):
+    mod = importlib.import_module(module)
+    before = prompt_version()
+    if getattr(mod, name) == value:
+        value = not value if isinstance(value, bool) else value + 1
+    monkeypatch.setattr(mod, name, value)
+    assert prompt_version() != before
@@ -0,0 +1,34 @@
+import shutil
+
+from result_cache import RESULT_PDF_NAME, ResultCache, cache_key
+
+
+def _result(tmp_path):
+    src = tmp_path / "job"
+    src.mkdir()
+    (src / RESULT_PDF_NAME).write_bytes(b"%PDF-1.4 test")
+    (src / "Wissenstext.txt").write_text("Wissen", encoding="utf-8")
+    return [src / RESULT_PDF_NAME, src / "Wissenstext.txt"]
+
+
+def test_cache_key_ignores_file_order():
+    a = cache_key(["aa", "bb"], gemini_model="g", openai_model="o", prompt_version="p")
+    b = cache_key(["BB", "aa"], gemini_model="g", openai_model="o", prompt_version="p")
+    assert a == b
+
+
+def test_restore_survives_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    cache.put("k", _result(tmp_path))
+    dest = tmp_path / "out"
+    pdf = cache.restore("k", dest)
+    assert pdf == dest / RESULT_PDF_NAME
+    assert (dest / "Wissenstext.txt").read_text(encoding="utf-8") == "Wissen"
+
+    shutil.rmtree(cache.root / "k")
+    assert pdf.read_bytes() == b"%PDF-1.4 test"
+    assert cache.restore("k", tmp_path / "other") is None
+
+
+def test_restore_miss(tmp_path):
+    assert ResultCache(tmp_path / "cache").restore("nope", tmp_path / "out") is None
@@ -0,0 +1,14 @@
+from text_budget import fair_caps, truncate
+
+
+def test_fair_caps_gives_unused_share_to_longer_texts():
+    assert fair_caps([10, 1000, 1000], 610) == [10, 300, 300]
+    assert fair_caps([10, 20], 100) == [10, 20]
+    assert fair_caps([5, 5], -3) == [0, 0]
+    assert fair_caps([], 100) == []
+
+
+def test_truncate_keeps_marker_within_cap():
+    assert truncate("kurz", 10, " …") == "kurz"
+    assert truncate("abcdefghij", 6, " …") == "abcd …"
+    assert truncate("abcdefghij", 1, " …") == "a"
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+import gemini_extract
+from gemini_extract import TokenBucket
+
+
+class _Clock:
+    """Ersatz für das time-Modul in gemini_extract: sleep() lässt die Uhr vorlaufen."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(gemini_extract, "time", fake)
+    return fake
+
+
+def test_starts_full_and_does_not_block(clock):
+    bucket = TokenBucket(60)
+    for _ in range(60):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+
+def test_blocks_until_refilled(clock):
+    bucket = TokenBucket(60)  # 1 pro Sekunde
+    bucket.acquire(60)
+    bucket.acquire(3)
+    assert clock.sleeps == [pytest.approx(3.0)]
+    assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(120)  # 2 pro Sekunde
+    bucket.acquire(120)
+    clock.now += 3600
+    bucket.acquire(1)
+    assert bucket.tokens == pytest.approx(119.0)
+    bucket.acquire(10)
+    assert clock.sleeps == []
+
+
+def test_request_above_capacity_is_capped(clock):
+    bucket = TokenBucket(10)
+    bucket.acquire(1_000_000)
+    assert clock.sleeps == []
+    assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_threads_share_the_budget():
+    bucket = TokenBucket(6000)  # 100 pro Sekunde, 6000 sofort verfügbar
+    done = []
+    start = time.monotonic()
+
+    def worker():
+        for _ in range(1000):
+            bucket.acquire()
+        done.append(True)
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert len(done) == 6
+    # Keine Einheit doppelt vergeben: übrig ist höchstens, was in der Laufzeit nachgeflossen ist
+    assert bucket.tokens <= 100 * (time.monotonic() - start) + 1e-6
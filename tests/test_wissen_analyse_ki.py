@@ -0,0 +1,63 @@
+import copy
+
+from reference_impl import old_analyse, old_themen_zuordnung
+from wissen_analyse_ki import (
+    THEMEN_KEYWORDS,
+    _synthetic_paare,
+    analyse,
+    themen_aus_treffer,
+    themen_treffer,
+    themen_zuordnung,
+)
+from wissen_analyse_parser import parse_paare_file
+
+
+def test_themen_zuordnung_matches_old_on_sample(sample_paare_txt):
+    paare = parse_paare_file(sample_paare_txt)
+    assert len(paare) == 141
+    for p in paare:
+        assert themen_zuordnung(p) == old_themen_zuordnung(p, THEMEN_KEYWORDS), p["id"]
+
+
+def test_themen_aus_treffer_threshold():
+    treffer = {"Versicherung": 2, "Zahlung_Rückerstattung": 1}
+    assert themen_aus_treffer(treffer) == ["Versicherung", "Zahlung_Rückerstattung"]
+    assert themen_aus_treffer(treffer, min_treffer=2) == ["Versicherung"]
+    assert themen_aus_treffer({}) == ["Sonstiges"]
+
+
+def test_themen_treffer_counts_overlapping_keywords():
+    paar = {"betreff": "rechtssicherechtssicher", "antwort_bereinigt": ""}
+    assert themen_treffer(paar)["Stornierung_Rücktritt"] == 2
+
+
+def _assert_analyse_matches_old(paare: list[dict]) -> None:
+    new = analyse(copy.deepcopy(paare))
+    old = old_analyse(copy.deepcopy(paare))
+    assert new[2] == old[2]
+    assert new[1] == old[1]
+    assert new[0] == old[0]
+
+
+def test_analyse_matches_old_on_sample(sample_paare_txt):
+    paare = parse_paare_file(sample_paare_txt)
+    _assert_analyse_matches_old(paare)
+    _, kandidaten, _ = analyse(copy.deepcopy(paare))
+    assert kandidaten
+
+
+def test_analyse_matches_old_on_synthetic_corpus():
+    # Viele Paare pro Satzgruppe und mehrere Themen pro Paar: hier unterscheiden sich die
+    # Aggregationswege am ehesten (Reihenfolge gleich häufiger Sätze, Zählung pro Gruppe)
+    _assert_analyse_matches_old(_synthetic_paare(400, seed=1))
+
+
+def test_analyse_counts_duplicate_sentences_once_per_pair():
+    satz = "Wir erstatten die Anzahlung innerhalb von vierzehn Tagen auf Ihr Konto zurück."
+    paare = [
+        {"id": 1, "betreff": "Rückerstattung", "antwort_bereinigt": f"{satz}\n{satz}"},
+        {"id": 2, "betreff": "Rückerstattung", "antwort_bereinigt": satz},
+    ]
+    _assert_analyse_matches_old(paare)
+    _, kandidaten, _ = analyse(paare)
+    assert [k["vorkommen"] for k in kandidaten["Zahlung_Rückerstattung"]] == [2]
@@ -0,0 +1,138 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from reference_impl import old_clean_reiseteam_answer, old_parse_fields
+from wissen_analyse_parser import (
+    CLEAN_HEADER_LINE_MAX,
+    _iter_blocks,
+    _parse_block,
+    clean_reiseteam_answer,
+    load_paare,
+    parse_paare_file,
+    write_paare,
+)
+
+FIELDS = ("betreff", "datum_eingang", "von_kunde", "datum_antwort", "anfrage", "antwort")
+# Im Beispielkorpus ist die Betreff-Zeile dieser Paare leer; der alte Parser las dann die
+# folgende "Datum (Eingang): …"-Zeile als Betreff (\s* lief über den Zeilenumbruch)
+EMPTY_BETREFF = {60, 75, 81, 141}
+
+PAARE_TXT = """WISSENSBASIS – KUNDENDIENST-PAARE
+================================================================================
+
+--- Paar 1 ---
+Betreff: Umbuchung Flug
+Datum (Eingang): 2025-01-02 10:00 | Von: kunde@example.com
+Datum (Antwort): 2025-01-02 12:00
+
+[ Anfrage / Kunde ]
+Kann ich umbuchen?
+
+[ Antwort / Reiseteam ]
+Ja, gegen Gebühr.
+
+--- Paar 2 ---
+Betreff:
+Datum (Eingang): 2025-01-03 09:00 | Von: zwei@example.com
+Datum (Antwort): 2025-01-03 11:00
+
+[ Anfrage / Kunde ]
+Ohne Betreff.
+
+[ Antwort / Reiseteam ]
+Antwort zwei.
+"""
+
+
+def _parse_fields(path: Path) -> list[dict]:
+    return [_parse_block(num, block) for num, block in _iter_blocks(path)]
+
+
+def test_sample_corpus_matches_old_parser(sample_paare_txt):
+    old = old_parse_fields(sample_paare_txt)
+    new = _parse_fields(sample_paare_txt)
+    assert len(new) == len(old) == 141
+    for o, n in zip(old, new):
+        assert n["id"] == o["id"]
+        for key in FIELDS:
+            if key == "betreff" and o["id"] in EMPTY_BETREFF:
+                assert n["betreff"] == ""
+                assert o["betreff"].startswith("Datum (Eingang)")
+                continue
+            assert n[key].strip() == o[key].strip(), (o["id"], key)
+
+
+def test_empty_betreff_line(tmp_path):
+    path = tmp_path / "paare.txt"
+    path.write_text(PAARE_TXT, encoding="utf-8")
+    paare = parse_paare_file(path)
+    assert [p["betreff"] for p in paare] == ["Umbuchung Flug", ""]
+    assert paare[1]["datum_eingang"] == "2025-01-03 09:00"
+    assert paare[1]["von_kunde"] == "zwei@example.com"
+    assert paare[1]["antwort_bereinigt"] == "Antwort zwei."
+
+
+def test_crlf_file_parses_like_lf(tmp_path):
+    lf = tmp_path / "lf.txt"
+    crlf = tmp_path / "crlf.txt"
+    lf.write_bytes(PAARE_TXT.encode("utf-8"))
+    crlf.write_bytes(PAARE_TXT.replace("\n", "\r\n").encode("utf-8"))
+    assert parse_paare_file(crlf) == parse_paare_file(lf)
+    assert len(parse_paare_file(crlf)) == 2
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_write_and_load_roundtrip(tmp_path, suffix):
+    src = tmp_path / "paare.txt"
+    src.write_text(PAARE_TXT, encoding="utf-8")
+    paare = parse_paare_file(src)
+    out = tmp_path / f"paare{suffix}"
+    assert write_paare(paare, out) == 2
+    assert load_paare(out) == paare
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "leer.txt"
+    path.write_bytes(b"")
+    assert parse_paare_file(path) == []
+
+
+def test_cleaning_matches_old_on_sample_answers(sample_paare_txt):
+    answers = [p["antwort"] for p in old_parse_fields(sample_paare_txt)]
+    assert len(answers) == 141
+    for i, raw in enumerate(answers, 1):
+        assert clean_reiseteam_answer(raw) == old_clean_reiseteam_answer(raw), i
+
+
+def test_cleaning_strips_long_recipient_list():
+    recipients = ", ".join(f"Mitarbeiter {i} <mitarbeiter{i}@usd.reisen>" for i in range(22))
+    assert 900 < len(recipients) < CLEAN_HEADER_LINE_MAX
+    raw = (
+        "Gerne buchen wir um.\n\n"
+        f"Von: Kunde <kunde@example.com>\nAn: {recipients}\nDatum: 02.01.2025\nBetreff: Umbuchung\n\n"
+        "Kann ich umbuchen?"
+    )
+    assert clean_reiseteam_answer(raw) == old_clean_reiseteam_answer(raw)
+    assert clean_reiseteam_answer(raw) == "Gerne buchen wir um.\n\nKann ich umbuchen?"
+
+
+def test_cleaning_strips_quote_header():
+    raw = "Ja, das geht.\n\nMax <kunde@example.com> hat am 01.02.2025 um 10 Uhr geschrieben:\n> Geht das?"
+    assert clean_reiseteam_answer(raw) == "Ja, das geht."
+
+
+@pytest.mark.parametrize("unit", [
+    "Name <kunde@example.com> hat am 01.02.2025 um 10 Uhr ",
+    "Von: Max Mustermann ",
+    "Von: Max Mustermann\nAn: Reiseteam ",
+    "x <kunde@example.com ",
+    " " * 64 + "\n" * 8 + "x",
+])
+def test_cleaning_time_limit_on_near_misses(unit):
+    # Unbegrenzte Muster brauchen hier quadratisch lange (alt: ~1 s bei 20 000 Zeichen, Minuten bei 200 000)
+    text = "Antwort\n" + unit * (200_000 // len(unit))
+    t0 = time.perf_counter()
+    clean_reiseteam_answer(text)
+    assert time.perf_counter() - t0 < 5.0
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Zeichenbudget fair auf mehrere Texte verteilen – gemeinsam genutzt von
+pipeline_universal.build_corpus (Dokumente im Merge-Corpus) und email_analyse.thread_pair
+(Nachrichten einer Konversation).
+
+Jeder Text bekommt einen gleichen Anteil; was kürzere nicht brauchen, geht an die längeren.
+Gekürzt wird nur das Ende zu langer Texte, kein Text verdrängt die übrigen.
+"""
+
+from __future__ import annotations
+
+
+def fair_caps(lengths: list[int], budget: int) -> list[int]:
+    """Höchstlänge pro Text, zusammen höchstens budget (Water-Filling, aufsteigend nach Länge)."""
+    budget = max(0, budget)
+    caps = [0] * len(lengths)
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    for n_left, i in zip(range(len(order), 0, -1), order):
+        caps[i] = min(lengths[i], budget // n_left)
+        budget -= caps[i]
+    return caps
+
+
+def truncate(text: str, cap: int, marker: str) -> str:
+    """text auf cap Zeichen kürzen, Kürzung mit marker kenntlich (marker zählt mit)."""
+    if len(text) <= cap:
+        return text
+    keep = cap - len(marker)
+    return text[:keep].rstrip() + marker if keep > 0 else text[:cap]
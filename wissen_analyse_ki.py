@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Schritt 2 der systematischen KI-Analyse:
-- Themen-Zuordnung pro Paar (keyword-basiert)
+- Themen-Zuordnung pro Paar (keyword-basiert, ein Durchlauf pro Text: keyword_automaton.py)
 - Extraktion wissensrelevanter Sätze aus den Reiseteam-Antworten
 - Häufigkeitsanalyse: welche Aussagen wiederholen sich
 - Ausgabe: Analyse-Report (Markdown) + Kandidaten pro Thema für den Wissenstext
@@ -12,6 +12,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+from keyword_automaton import KeywordAutomaton
+
 BASE = Path(__file__).resolve().parent
 INPUT_JSON = BASE / "paare_141_strukturiert.json"
 OUTPUT_REPORT = BASE / "Analyse_Report_KI_Wissen.md"
@@ -54,6 +56,12 @@ THEMEN_KEYWORDS = {
 }
 
 
+# Alle Keywords einmal kompiliert: ein Durchlauf pro Text, Treffer pro Thema
+THEMEN_AUTOMAT = KeywordAutomaton(THEMEN_KEYWORDS)
+# Mindestanzahl Keyword-Treffer, ab der ein Paar einem Thema zugeordnet wird
+THEMEN_MIN_TREFFER = 1
+
+
 def normalize_fuer_vergleich(text: str) -> str:
     """Normalisiert Text für Phrasen-Vergleich (Kleinbuchstaben, Satzzeichen reduziert)."""
     if not text:
@@ -86,8 +94,8 @@ def satz_split(text: str) -> list[str]:
     return saetze
 
 
-def themen_zuordnung(paar: dict) -> list[str]:
-    """Weist ein Paar anhand von Betreff + Anfrage + Antwort den Themen zu."""
+def themen_treffer(paar: dict, automat: KeywordAutomaton = THEMEN_AUTOMAT) -> dict[str, int]:
+    """Keyword-Treffer pro Thema in Betreff + Anfrage + Antwort (nur Themen mit Treffern)."""
     text = (
         (paar.get("betreff") or "")
         + " "
@@ -96,14 +104,18 @@ def themen_zuordnung(paar: dict) -> list[str]:
         + (paar.get("antwort_bereinigt") or "")
         + " "
         + (paar.get("antwort_roh") or "")[:2000]
-    ).lower()
-    zuordnung = []
-    for thema, keywords in THEMEN_KEYWORDS.items():
-        if any(kw.lower() in text for kw in keywords):
-            zuordnung.append(thema)
-    if not zuordnung:
-        zuordnung.append("Sonstiges")
-    return zuordnung
+    )
+    return automat.counts(text)
+
+
+def themen_aus_treffer(treffer: dict[str, int], min_treffer: int = THEMEN_MIN_TREFFER) -> list[str]:
+    """Themen mit mindestens min_treffer Keyword-Treffern, sonst ["Sonstiges"]."""
+    return [thema for thema, n in treffer.items() if n >= min_treffer] or ["Sonstiges"]
+
+
+def themen_zuordnung(paar: dict, min_treffer: int = THEMEN_MIN_TREFFER) -> list[str]:
+    """Weist ein Paar anhand von Betreff + Anfrage + Antwort den Themen zu."""
+    return themen_aus_treffer(themen_treffer(paar), min_treffer)
 
 
 def ist_wissens_relevant(satz: str) -> bool:
@@ -135,8 +147,11 @@ def ist_wissens_relevant(satz: str) -> bool:
     return False
 
 
-def main():
-    paare = json.loads(INPUT_JSON.read_text(encoding="utf-8"))
+def analyse(paare: list[dict]) -> tuple[list[str], dict, dict]:
+    """
+    Themen, wiederkehrende Aussagen und Wissens-Kandidaten pro Thema.
+    Returns: (Report-Zeilen, Kandidaten pro Thema für JSON, Themen-Verteilung)
+    """
     # Fallback: wo antwort_bereinigt leer ist, antwort_roh nutzen (gekürzt)
     for p in paare:
         if not (p.get("antwort_bereinigt") or "").strip():
@@ -148,11 +163,14 @@ def main():
     # 1) Themen pro Paar
     themen_pro_paar = {}
     themen_haeufigkeit = defaultdict(int)
+    themen_treffer_summe = defaultdict(int)  # Keyword-Treffer gesamt pro Thema
     for p in paare:
-        themen = themen_zuordnung(p)
+        treffer = themen_treffer(p)
+        themen = themen_aus_treffer(treffer)
         themen_pro_paar[p["id"]] = themen
         for t in themen:
             themen_haeufigkeit[t] += 1
+            themen_treffer_summe[t] += treffer.get(t, 0)
 
     # 2) Sätze extrahieren, normalisieren, zählen (über alle Paare)
     alle_saetze_normalized = defaultdict(list)  # normalized_satz -> [(paar_id, original_satz), ...]
@@ -167,29 +185,19 @@ def main():
             alle_saetze_normalized[norm].append((p["id"], satz))
 
     # 3) Phrasen gruppieren: sehr ähnliche Sätze zusammenfassen (exakte Normalform = Gruppe)
-    # Dann: pro Thema die Sätze sammeln (über themen_pro_paar)
-    themen_saetze = defaultdict(list)  # thema -> [(satz, anzahl_paare), ...]
+    # Dann: pro Thema die Sätze sammeln (über themen_pro_paar) – Normalform ist schon der
+    # Dedup-Schlüssel, pro Thema zählt jede Gruppe einmal (ein Durchlauf, linear in den Vorkommen)
+    themen_saetze = defaultdict(dict)  # thema -> {normalized_satz: (satz, anzahl_paare)}
     for norm, vorkommen in alle_saetze_normalized.items():
-        if len(vorkommen) < 1:
-            continue
         # Repräsentant (längster Original-Satz)
         rep = max(vorkommen, key=lambda x: len(x[1]))[1]
-        paar_ids = list({pid for pid, _ in vorkommen})
-        for p in paare:
-            if p["id"] not in paar_ids:
-                continue
-            for t in themen_pro_paar[p["id"]]:
-                themen_saetze[t].append((rep, len(paar_ids)))
-
-    # Deduplizieren pro Thema: gleicher Satz (normalized) nur einmal, mit max count
-    themen_saetze_dedup = {}
-    for thema, lst in themen_saetze.items():
-        by_norm = {}
-        for satz, count in lst:
-            norm = normalize_fuer_vergleich(satz)
-            if norm not in by_norm or by_norm[norm][1] < count:
-                by_norm[norm] = (satz, count)
-        themen_saetze_dedup[thema] = sorted(by_norm.values(), key=lambda x: -x[1])
+        paar_ids = dict.fromkeys(pid for pid, _ in vorkommen)  # Reihenfolge wie in paare
+        for pid in paar_ids:
+            for t in themen_pro_paar[pid]:
+                themen_saetze[t].setdefault(norm, (rep, len(paar_ids)))
+    themen_saetze_dedup = {
+        thema: sorted(by_norm.values(), key=lambda x: -x[1]) for thema, by_norm in themen_saetze.items()
+    }
 
     # 4) Top-Wiederholungen global (für Report)
     wiederholungen = [(norm, len(v)) for norm, v in alle_saetze_normalized.items() if len(v) >= 2]
@@ -202,11 +210,11 @@ def main():
         "",
         "## 1. Themen-Verteilung (Keyword-Zuordnung)",
         "",
-        "| Thema | Anzahl Paare |",
-        "|-------|--------------|",
+        "| Thema | Anzahl Paare | Keyword-Treffer |",
+        "|-------|--------------|-----------------|",
     ]
     for thema in sorted(themen_haeufigkeit.keys(), key=lambda t: -themen_haeufigkeit[t]):
-        lines.append(f"| {thema} | {themen_haeufigkeit[thema]} |")
+        lines.append(f"| {thema} | {themen_haeufigkeit[thema]} | {themen_treffer_summe[thema]} |")
     lines.extend([
         "",
         "---",
@@ -234,12 +242,62 @@ def main():
             lines.append(f"- ({count}×) {satz[:200]}{'…' if len(satz)>200 else ''}")
         lines.append("")
 
+    return lines, kandidaten_export, dict(themen_haeufigkeit)
+
+
+def main():
+    paare = json.loads(INPUT_JSON.read_text(encoding="utf-8"))
+    lines, kandidaten_export, themen_haeufigkeit = analyse(paare)
     OUTPUT_REPORT.write_text("\n".join(lines), encoding="utf-8")
     OUTPUT_KANDIDATEN_JSON.write_text(json.dumps(kandidaten_export, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"Report: {OUTPUT_REPORT}")
     print(f"Kandidaten JSON: {OUTPUT_KANDIDATEN_JSON}")
-    print("Themen-Verteilung:", dict(themen_haeufigkeit))
+    print("Themen-Verteilung:", themen_haeufigkeit)
+
+
+def _synthetic_paare(n: int, seed: int = 0) -> list[dict]:
+    """Künstlicher Korpus: wiederkehrende Regel-Sätze (viele Paare je Gruppe) + ein Einzelfall-Satz pro Paar."""
+    import random
+
+    rnd = random.Random(seed)
+    themen = ["Stornierung", "Gutschein", "Zahlung per Überweisung", "Versicherung", "Werbung", "Reiseunterlagen", "Telefon", "Adresse"]
+    regeln = [
+        f"Wir sind gemäß den AGB verpflichtet, die {t} innerhalb von {tage} Tagen zu bearbeiten und bitten um Geduld."
+        for t in themen for tage in range(3, 40)
+    ]
+    paare = []
+    for i in range(1, n + 1):
+        saetze = [rnd.choice(regeln) for _ in range(3)]
+        saetze.append(
+            f"Die Reise mit der Buchungsnummer {rnd.randrange(10 ** 6)} wurde für Sie vorgemerkt und bestätigt, vielen Dank für Ihre Geduld."
+        )
+        text = "\n".join(saetze)
+        paare.append({
+            "id": i,
+            "betreff": f"Frage zu {rnd.choice(themen)}",
+            "anfrage_roh": f"Hallo, ich habe eine Frage zur {rnd.choice(themen).lower()}.",
+            "antwort_bereinigt": text,
+            "antwort_roh": text,
+        })
+    return paare
+
+
+def _benchmark(sizes: tuple[int, ...] = (5_000, 10_000, 25_000, 50_000)) -> None:
+    """Laufzeit von analyse() auf synthetischen Korpora; linear heißt: konstante Zeit pro Paar."""
+    import time
+
+    for n in sizes:
+        paare = _synthetic_paare(n)
+        t0 = time.perf_counter()
+        _, kandidaten, _ = analyse(paare)
+        elapsed = time.perf_counter() - t0
+        print(f"{n:>7} Paare: {elapsed:.2f} s ({1e6 * elapsed / n:.0f} µs/Paar, {len(kandidaten)} Themen)")
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    if "--benchmark" in sys.argv[1:]:
+        _benchmark()
+    else:
+        main()
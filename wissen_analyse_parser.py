@@ -3,15 +3,66 @@
 Schritt 1 der systematischen KI-Analyse: Parst die 141-Paare-Datei,
 extrahiert strukturierte Daten und bereinigt die Reiseteam-Antworten
 (Entfernung von Zitaten und Signaturblöcken) für die spätere Analyse.
+Kommen die Paare direkt aus email_analyse.collect_pairs, entfällt das Parsen (run_with_pairs).
+
+Große Dateien (Hunderte MB) werden per mmap blockweise gelesen (iter_paare_file); mit
+--output *.jsonl werden die Paare im Strom geschrieben, der Speicherbedarf bleibt konstant.
+Ab PARSER_PARALLEL_MIN_PAIRS Paaren laufen Parsen und Bereinigung in PARSER_WORKERS Prozessen.
+
+Worst-Case-Benchmark der Bereinigung: python wissen_analyse_parser.py --benchmark
 """
 
 import re
 import json
+import mmap
+import os
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from ordered_map import map_ordered
 
 BASE = Path(__file__).resolve().parent
 INPUT_FILE = BASE / "Wissensbasis_Reiseteam_141_Paare.txt"
 OUTPUT_JSON = BASE / "paare_141_strukturiert.json"
+# Prozesse für Blockparsing + Bereinigung; erst ab PARSER_PARALLEL_MIN_PAIRS Paaren
+PARSER_WORKERS = int(os.environ.get("PARSER_WORKERS", str(os.cpu_count() or 1)))
+PARSER_PARALLEL_MIN_PAIRS = 2000
+# Paare pro Auftrag an einen Worker (IPC-Overhead klein halten)
+PARSER_CHUNK_PAIRS = 500
+# Längen im JSON pro Paar (Thread-Modus: email_analyse.thread_pair verteilt sie auf die Nachrichten)
+PAAR_MAX_ANFRAGE = 5000
+PAAR_MAX_ANTWORT_ROH = 8000
+PAAR_MAX_ANTWORT = 6000
+
+# Bereinigungsregeln, einmal kompiliert. Alle Wiederholungen sind begrenzt, damit ein Versuch
+# an einer Stelle nur konstant viel Arbeit kostet (kein Backtracking über den ganzen Text).
+# Die Grenzen (CLEAN_*_MAX) decken echte Kopfzeilen ab; was darüber liegt, bleibt stehen –
+# siehe clean_reiseteam_answer.
+CLEAN_SENDER_MAX = 256  # Absender-Token und <Adresse> (RFC 5321: Adresse ≤ 254 Zeichen)
+CLEAN_QUOTE_GAP_MAX = 500  # Zeichen zwischen Datum und "geschrieben:" (Uhrzeit, Wochentag …)
+CLEAN_HEADER_LINE_MAX = 1000  # Von:/An:-Zeile (Empfängerlisten mit ~40 Adressen)
+CLEAN_SPACE_MAX = 10  # Whitespace zwischen den Teilen einer Kopfzeile
+# Zitat: "Name <mail> hat am 15.03.2025 ... geschrieben:" (bis zum ersten Doppelpunkt)
+CLEAN_QUOTE_HEADER_RE = re.compile(
+    rf"\s[^\s]{{1,{CLEAN_SENDER_MAX}}}(?:\s{{1,{CLEAN_SPACE_MAX}}}<[^>\n]{{1,{CLEAN_SENDER_MAX}}}>)?"
+    rf"\s{{1,{CLEAN_SPACE_MAX}}}hat am\s{{1,{CLEAN_SPACE_MAX}}}\d{{1,2}}\.\d{{1,2}}\.\d{{2,4}}"
+    rf"[^:]{{0,{CLEAN_QUOTE_GAP_MAX}}}geschrieben:",
+    re.IGNORECASE,
+)
+CLEAN_ORIGINAL_MESSAGE_RE = re.compile(r"-{10}\s{0,10}Ursprüngliche Nachricht\s{0,10}-{10}", re.IGNORECASE)
+# Forward-Header "Von: … An: … Datum:"
+CLEAN_FORWARD_HEADER_RE = re.compile(
+    rf"Von:\s{{0,{CLEAN_SPACE_MAX}}}[^\n]{{1,{CLEAN_HEADER_LINE_MAX}}}\s{{1,{CLEAN_SPACE_MAX}}}"
+    rf"An:\s{{0,{CLEAN_SPACE_MAX}}}[^\n]{{1,{CLEAN_HEADER_LINE_MAX}}}\s{{1,{CLEAN_SPACE_MAX}}}Datum:",
+    re.IGNORECASE,
+)
+CLEAN_SIGNATURE_RE = re.compile(
+    r"(Beste Grüße|Mit freundlichen Grüßen|Guten Tag,?)\s*,?\s*(Ihr )?Reiseteam (vom )?Urlaubs Service Deutschland\s*(Tel\.?:|ACHTUNG|Internet:)",
+    re.IGNORECASE,
+)
+CLEAN_BLANK_LINES_RE = re.compile(r"\n{3,}")
+CLEAN_SPACES_RE = re.compile(r"[ \t]+")
+CLEAN_LINE_EDGE_RE = re.compile(r" ?\n ?")
 
 
 def clean_reiseteam_answer(raw: str) -> str:
@@ -20,6 +71,16 @@ def clean_reiseteam_answer(raw: str) -> str:
     - Entfernt zitierte Kundenmail (ab " hat am ... geschrieben:" oder "Ursprüngliche Nachricht")
     - Entfernt Signaturblock am Ende (Tel., Internet, Sitz und Registergericht etc.)
     - Normalisiert Whitespace
+    Regeln: vorkompilierte CLEAN_*-Muster mit begrenzten Wiederholungen (linear in der Textlänge).
+
+    Grenzen gegenüber den früheren unbegrenzten Mustern – darüber wird nicht mehr bereinigt:
+    - Zitat: Absender-Token und <Adresse> je höchstens CLEAN_SENDER_MAX (256) Zeichen,
+      zwischen Datum und "geschrieben:" höchstens CLEAN_QUOTE_GAP_MAX (500) Zeichen.
+    - Forward-Header: Von:- und An:-Zeile je höchstens CLEAN_HEADER_LINE_MAX (1000) Zeichen.
+    - Whitespace zwischen den Teilen höchstens CLEAN_SPACE_MAX (10) Zeichen.
+    Auf den Beispielpaaren ist das Ergebnis identisch (tests/test_wissen_analyse_parser.py). Kosten im
+    schlimmsten Fall (viele "Von:" ohne "An:" in einer Zeile): ~3 s pro MB; E-Mail-Bodies sind
+    auf 8 000 Zeichen begrenzt (email_analyse._body_text).
     """
     if not raw or not raw.strip():
         return ""
@@ -27,24 +88,18 @@ def clean_reiseteam_answer(raw: str) -> str:
     text = raw.strip()
 
     # 1) Zitat/Kopie der Kundenmail entfernen: ab " hat am DD.MM.YYYY ... geschrieben:" oder "---------- Ursprüngliche"
-    # Pattern: etwas wie "Name <email> hat am 15.03.2025 15:14 CET geschrieben:" oder " hat am ... geschrieben:"
-    text = re.sub(
-        r"\s+[^\s]+(\s+<[^>]+>)?\s+hat am\s+\d{1,2}\.\d{1,2}\.\d{2,4}[^:]*geschrieben:.*",
-        "",
-        text,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
-    text = re.sub(r"\s*----------\s*Ursprüngliche Nachricht\s*----------.*", "", text, flags=re.DOTALL | re.IGNORECASE)
-    # Noch: "Von: ... An: ... Datum: ... Betreff: ..." Blöcke (Forward-Header)
-    text = re.sub(r"\s*Von:\s*[^\n]+\s+An:\s*[^\n]+\s+Datum:.*?(?=\n\n|\Z)", "", text, flags=re.DOTALL | re.IGNORECASE)
+    m = CLEAN_QUOTE_HEADER_RE.search(text)
+    if m:
+        text = text[: m.start()].rstrip()
+    m = CLEAN_ORIGINAL_MESSAGE_RE.search(text)
+    if m:
+        text = text[: m.start()].rstrip()
+    # Noch: "Von: ... An: ... Datum: ... Betreff: ..." Blöcke (Forward-Header) bis zur nächsten Leerzeile
+    text = _strip_forward_headers(text)
 
     # 2) Signaturblock am Ende entfernen (wiederholter Block mit Tel., Internet, Sitz und Registergericht)
     # Typisch: "Beste Grüße, Ihr Reiseteam ... Tel.: 0049 ... Internet: www.usd.reisen ... Sitz und Registergericht ... DE318355174"
-    signature_start = re.search(
-        r"(Beste Grüße|Mit freundlichen Grüßen|Guten Tag,?)\s*,?\s*(Ihr )?Reiseteam (vom )?Urlaubs Service Deutschland\s*(Tel\.?:|ACHTUNG|Internet:)",
-        text,
-        flags=re.IGNORECASE,
-    )
+    signature_start = CLEAN_SIGNATURE_RE.search(text)
     if signature_start:
         text = text[: signature_start.start()].strip()
 
@@ -62,92 +117,178 @@ def clean_reiseteam_answer(raw: str) -> str:
             text = text[:last_content].strip()
 
     # 3) Mehrfache Leerzeilen und übermäßige Leerzeichen
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r" ?\n ?", "\n", text)
+    text = CLEAN_BLANK_LINES_RE.sub("\n\n", text)
+    text = CLEAN_SPACES_RE.sub(" ", text)
+    text = CLEAN_LINE_EDGE_RE.sub("\n", text)
     return text.strip()
 
 
+def _strip_forward_headers(text: str) -> str:
+    """Forward-Header-Blöcke (CLEAN_FORWARD_HEADER_RE) samt Whitespace davor bis vor die nächste Leerzeile entfernen."""
+    parts = []
+    pos = 0
+    while True:
+        m = CLEAN_FORWARD_HEADER_RE.search(text, pos)
+        if not m:
+            break
+        parts.append(text[pos: m.start()].rstrip())
+        end = text.find("\n\n", m.end())
+        pos = len(text) if end < 0 else end
+    if not parts:
+        return text
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+# Blockgrenze "--- Paar N ---" (auf Bytes, direkt über der gemappten Datei; CRLF erlaubt)
+PAAR_BOUNDARY_RE = re.compile(rb"\n---[ \t]*Paar[ \t]+(\d+)[ \t]*---\r?\n", re.IGNORECASE)
+# Kopfzeilen eines Blocks in einem Durchlauf (statt einer Suche pro Feld)
+PAAR_HEADER_RE = re.compile(
+    r"Betreff:[ \t]*(?P<betreff>[^\n]*)"
+    r"|Datum\s*\(Eingang\):[ \t]*(?P<datum_eingang>[^\n|]*)"
+    r"|Von:[ \t]*(?P<von_kunde>[^\n]*)"
+    r"|Datum\s*\(Antwort\):[ \t]*(?P<datum_antwort>[^\n]*)",
+    re.IGNORECASE,
+)
+ANFRAGE_MARK_RE = re.compile(r"\[\s*Anfrage\s*/\s*Kunde\s*\]\s*\n", re.IGNORECASE)
+ANTWORT_MARK_RE = re.compile(r"\n?\[\s*Antwort\s*/\s*Reiseteam\s*\]\s*\n", re.IGNORECASE)
+
+
+def _parse_block(num: int, block: str) -> dict:
+    """Ein Block (Text nach "--- Paar N ---") → Felder wie email_analyse.collect_pairs."""
+    anfrage_mark = ANFRAGE_MARK_RE.search(block)
+    head = block[: anfrage_mark.start()] if anfrage_mark else block
+    pair = {"id": num, "betreff": "", "datum_eingang": "", "von_kunde": "", "datum_antwort": "", "anfrage": "", "antwort": ""}
+    for m in PAAR_HEADER_RE.finditer(head):
+        key = m.lastgroup
+        if not pair[key]:
+            pair[key] = m.group(key)
+    antwort_mark = ANTWORT_MARK_RE.search(block, anfrage_mark.end() if anfrage_mark else 0)
+    if antwort_mark:
+        pair["antwort"] = block[antwort_mark.end():]
+        if anfrage_mark:
+            pair["anfrage"] = block[anfrage_mark.end(): antwort_mark.start()]
+    return pair
+
+
+def _iter_blocks(path: Path) -> Iterator[tuple[int, str]]:
+    """
+    (Nummer, Blocktext) für jeden "--- Paar N ---"-Block. Die Datei wird per mmap eingeblendet;
+    Blockgrenzen werden fortlaufend gesucht und nur der jeweils aktuelle Block dekodiert –
+    der Speicherbedarf hängt nicht von der Dateigröße ab.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            prev = None  # (Nummer, Blockanfang)
+            for m in PAAR_BOUNDARY_RE.finditer(mm):
+                if prev is not None:
+                    yield prev[0], _decode_block(mm[prev[1]: m.start()])
+                prev = (int(m.group(1)), m.end())
+            if prev is not None:
+                yield prev[0], _decode_block(mm[prev[1]:])
+
+
+def _decode_block(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def _structure_block(item: tuple[int, str]) -> dict:
+    return structure_pair(_parse_block(*item))
+
+
+def _map_pairs(fn, items: Iterable, workers: int = PARSER_WORKERS) -> Iterator:
+    """
+    fn auf items anwenden (ordered_map.map_ordered): unter PARSER_PARALLEL_MIN_PAIRS Elementen
+    seriell, sonst in workers Prozessen (je PARSER_CHUNK_PAIRS pro Auftrag, höchstens 2·workers
+    Aufträge unterwegs → Speicher begrenzt).
+    """
+    return map_ordered(
+        fn, items, workers,
+        processes=True,
+        min_items=PARSER_PARALLEL_MIN_PAIRS,
+        chunk_size=PARSER_CHUNK_PAIRS,
+        in_flight=2 * workers,
+    )
+
+
+def iter_paare_file(path: Path, workers: int = PARSER_WORKERS) -> Iterator[dict]:
+    """Liest die Wissensbasis-Datei blockweise und liefert strukturierte Paare einzeln (in Dateireihenfolge)."""
+    return _map_pairs(_structure_block, _iter_blocks(path), workers)
+
+
 def parse_paare_file(path: Path) -> list[dict]:
     """Liest die Wissensbasis-Datei und gibt eine Liste von Paar-Dicts zurück."""
-    content = path.read_text(encoding="utf-8")
-
-    # Blöcke nach "--- Paar N ---" trennen (ohne Header-Zeilen)
-    block_pattern = re.compile(
-        r"---\s*Paar\s+(\d+)\s*---\s*\n"
-        r"(Betreff:\s*(.+?)\n)?"
-        r"(Datum \(Eingang\):\s*(.+?)\n)?"
-        r"(.*?Von:\s*(.+?)\n)?"
-        r"Datum \(Antwort\):\s*(.+?)\n\n"
-        r"\[\s*Anfrage\s*/\s*Kunde\s*\]\s*\n(.*?)\n\[\s*Antwort\s*/\s*Reiseteam\s*\]\s*\n(.*?)"
-        r"(?=\n---\s*Paar\s+|\Z)",
-        re.DOTALL | re.IGNORECASE,
-    )
+    return list(iter_paare_file(path))
 
-    # Einfacheres Vorgehen: nach "--- Paar N ---" splitten, dann pro Block regex für Betreff/Datum/Von und die beiden Body-Abschnitte
-    blocks = re.split(r"\n---\s*Paar\s+(\d+)\s*---\n", content)[1:]  # [num, text, num, text, ...]
-    if len(blocks) % 2 != 0:
-        blocks = re.split(r"\n---\s*Paar\s+\d+\s*---\n", content)
-        blocks = [b for b in blocks if b.strip() and not b.strip().startswith("WISSENSBASIS") and "Antwort" in b]
 
-    paare = []
-    for i in range(0, len(blocks), 2):
-        if i + 1 >= len(blocks):
-            break
-        num_str, block = blocks[i], blocks[i + 1]
-        try:
-            num = int(num_str)
-        except ValueError:
-            continue
-
-        # Betreff
-        betr = re.search(r"Betreff:\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
-        subject = betr.group(1).strip() if betr else ""
-
-        # Datum Eingang
-        dat_in = re.search(r"Datum\s*\(Eingang\):\s*([^\n|]+)", block, re.IGNORECASE)
-        date_in = dat_in.group(1).strip() if dat_in else ""
-
-        # Von
-        von = re.search(r"Von:\s*(.+?)(?:\n|$)", block, re.IGNORECASE)
-        from_customer = von.group(1).strip() if von else ""
-
-        # Datum Antwort
-        dat_out = re.search(r"Datum\s*\(Antwort\):\s*([^\n]+)", block, re.IGNORECASE)
-        date_out = dat_out.group(1).strip() if dat_out else ""
-
-        # [ Anfrage / Kunde ] ... [ Antwort / Reiseteam ]
-        anfrage_match = re.search(r"\[\s*Anfrage\s*/\s*Kunde\s*\]\s*\n(.*?)(?=\n\[\s*Antwort\s*/\s*Reiseteam\s*\])", block, re.DOTALL | re.IGNORECASE)
-        antwort_match = re.search(r"\[\s*Antwort\s*/\s*Reiseteam\s*\]\s*\n(.*)", block, re.DOTALL | re.IGNORECASE)
-
-        body_customer = anfrage_match.group(1).strip() if anfrage_match else ""
-        body_reiseteam_raw = antwort_match.group(1).strip() if antwort_match else ""
-
-        body_reiseteam_clean = clean_reiseteam_answer(body_reiseteam_raw)
-
-        paare.append({
-            "id": num,
-            "betreff": subject,
-            "datum_eingang": date_in,
-            "datum_antwort": date_out,
-            "von_kunde": from_customer,
-            "anfrage_roh": body_customer[:5000],
-            "antwort_roh": body_reiseteam_raw[:8000],
-            "antwort_bereinigt": body_reiseteam_clean[:6000],
-        })
-    return paare
+def structure_pair(pair: dict) -> dict:
+    """
+    Ein Paar (aus parse_paare_file oder direkt aus email_analyse.collect_pairs) in das
+    JSON-Format bringen: Felder getrimmt, Reiseteam-Antwort bereinigt, Längen begrenzt.
+    Bringt das Paar schon antwort_bereinigt mit (Thread-Modus: pro Nachricht bereinigt),
+    wird diese übernommen statt ein zweites Mal bereinigt.
+    """
+    body_customer = (pair.get("anfrage") or "").strip()
+    body_reiseteam_raw = (pair.get("antwort") or "").strip()
+    bereinigt = pair.get("antwort_bereinigt")
+    if bereinigt is None:
+        bereinigt = clean_reiseteam_answer(body_reiseteam_raw)
+    return {
+        "id": pair["id"],
+        "betreff": (pair.get("betreff") or "").strip(),
+        "datum_eingang": (pair.get("datum_eingang") or "").strip(),
+        "datum_antwort": (pair.get("datum_antwort") or "").strip(),
+        "von_kunde": (pair.get("von_kunde") or "").strip(),
+        "anfrage_roh": body_customer[:PAAR_MAX_ANFRAGE],
+        "antwort_roh": body_reiseteam_raw[:PAAR_MAX_ANTWORT_ROH],
+        "antwort_bereinigt": bereinigt.strip()[:PAAR_MAX_ANTWORT],
+    }
+
+
+def write_paare(paare: Iterable[dict], output: Path) -> int:
+    """
+    Paare schreiben: *.jsonl zeilenweise im Strom (Reihenfolge wie geliefert, konstanter
+    Speicher), sonst ein nach id sortiertes JSON-Array. Gibt die Anzahl zurück.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if output.suffix.lower() == ".jsonl":
+        n = 0
+        with open(output, "w", encoding="utf-8") as f:
+            for p in paare:
+                f.write(json.dumps(p, ensure_ascii=False) + "\n")
+                n += 1
+        return n
+    paare = sorted(paare, key=lambda x: x["id"])
+    output.write_text(json.dumps(paare, ensure_ascii=False, indent=2), encoding="utf-8")
+    return len(paare)
+
+
+def load_paare(path: Path) -> list[dict]:
+    """paare_strukturiert.json oder .jsonl (write_paare) einlesen."""
+    if path.suffix.lower() == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    return json.loads(path.read_text(encoding="utf-8"))
 
 
 def run_with_paths(input_txt: Path, output_json: Path) -> int:
-    """Liest paare.txt, schreibt paare_strukturiert.json. Gibt Anzahl Paare zurück."""
+    """
+    Liest paare.txt, schreibt paare_strukturiert.json (bzw. .jsonl im Strom). Gibt Anzahl Paare zurück.
+    """
     if not input_txt.exists():
         raise FileNotFoundError(f"Datei nicht gefunden: {input_txt}")
-    paare = parse_paare_file(input_txt)
-    paare.sort(key=lambda x: x["id"])
-    output_json.parent.mkdir(parents=True, exist_ok=True)
-    output_json.write_text(json.dumps(paare, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Parser: {len(paare)} Paare → {output_json}")
-    return len(paare)
+    n = write_paare(iter_paare_file(input_txt), output_json)
+    print(f"Parser: {n} Paare → {output_json}")
+    return n
+
+
+def run_with_pairs(pairs: list[dict], output_json: Path) -> int:
+    """Strukturierte Paare aus email_analyse.collect_pairs → paare_strukturiert.json (ohne paare.txt)."""
+    n = write_paare(_map_pairs(structure_pair, pairs), output_json)
+    print(f"Parser: {n} Paare → {output_json}")
+    return n
 
 
 def main():
@@ -164,12 +305,43 @@ def main():
     print(f"Antwort bereinigt: Ø {sum(lens)//len(lens) if lens else 0} Zeichen, min={min(lens) if lens else 0}, max={max(lens) if lens else 0}")
 
 
+def _benchmark(sizes: tuple[int, ...] = (10_000, 100_000, 1_000_000)) -> None:
+    """
+    Laufzeit von clean_reiseteam_answer auf bösartigen Eingaben (viele Beinahe-Treffer der
+    Zitat-/Forward-Regeln, lange Whitespace-Läufe). Linear heißt: 10× Text ≈ 10× Zeit.
+    """
+    import time
+
+    worst_cases = {
+        "hat am ohne geschrieben": "Name <kunde@example.com> hat am 01.02.2025 um 10 Uhr ",
+        "Von: ohne An:": "Von: Max Mustermann ",
+        "Von:/An: ohne Datum:": "Von: Max Mustermann\nAn: Reiseteam ",
+        "Whitespace-Läufe": " " * 64 + "\n" * 8 + "x",
+        "spitze Klammer offen": "x <kunde@example.com ",
+        "Trennstriche": "-" * 9 + " Ursprüngliche Nachricht ",
+    }
+    for name, unit in worst_cases.items():
+        times = []
+        for size in sizes:
+            text = "Antwort\n" + unit * (size // len(unit))
+            t0 = time.perf_counter()
+            clean_reiseteam_answer(text)
+            times.append(time.perf_counter() - t0)
+        steps = " | ".join(f"{size // 1000}k: {1000 * t:.1f} ms" for size, t in zip(sizes, times))
+        growth = times[-1] / max(times[0], 1e-9) / (sizes[-1] / sizes[0])
+        print(f"{name:26} {steps} | Wachstum relativ zu linear: {growth:.1f}×")
+
+
 if __name__ == "__main__":
     import argparse
     p = argparse.ArgumentParser(description="Paare-TXT → strukturiertes JSON")
     p.add_argument("--input", type=Path, default=INPUT_FILE, help="paare.txt")
-    p.add_argument("--output", type=Path, default=OUTPUT_JSON, help="paare_strukturiert.json")
+    p.add_argument("--output", type=Path, default=OUTPUT_JSON, help="paare_strukturiert.json (oder .jsonl)")
+    p.add_argument("--benchmark", action="store_true", help="Worst-Case-Laufzeiten der Antwort-Bereinigung messen")
     args = p.parse_args()
+    if args.benchmark:
+        _benchmark()
+        raise SystemExit(0)
     if args.input != INPUT_FILE or args.output != OUTPUT_JSON:
         run_with_paths(args.input, args.output)
     else: